@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.core.config import settings
 from app.models.user import User
-from app.crud.user import get_user_by_email
+from app.crud.user import get_token_version_cached, get_user_by_email_cached
 from app.schemas.token import TokenData
 
 # Define que o token deve ser enviado no header "Authorization: Bearer <token>"
@@ -25,12 +25,9 @@ def get_db() -> Generator:
         db.close()
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
+def get_token_data(token: str = Depends(oauth2_scheme)) -> TokenData:
     """
-    Valida o token JWT e retorna o utilizador atual.
-    Lança exceção se o token for inválido ou o utilizador não existir.
+    Valida o token JWT e devolve as claims, sem aceder à base de dados.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -42,17 +39,74 @@ async def get_current_user(
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
 
-    # Buscar utilizador na BD
-    user = get_user_by_email(db, email=token_data.email)
+    email: str = payload.get("sub")
+    # Tokens de confirmação de email / reset de password não dão acesso à API
+    if email is None or payload.get("type") is not None:
+        raise credentials_exception
+    # Tokens emitidos sem claims de autorização (versão anterior) obrigam a novo login
+    if "ver" not in payload:
+        raise credentials_exception
+
+    return TokenData(
+        email=email,
+        role=payload.get("role"),
+        is_superuser=bool(payload.get("su", False)),
+        is_active=bool(payload.get("act", False)),
+        version=payload.get("ver", 0),
+    )
+
+
+def _session_expired() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Sessão expirada. Inicia sessão novamente.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def get_verified_claims(
+    token_data: TokenData = Depends(get_token_data), db: Session = Depends(get_db)
+) -> TokenData:
+    """
+    Claims do token, depois de confirmar que a versão ainda é a atual (as
+    permissões não mudaram desde a emissão). A versão vem da cache de
+    identidade: o utilizador não é carregado.
+    """
+    version = get_token_version_cached(db, email=token_data.email)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Credenciais inválidas",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if token_data.version != version:
+        raise _session_expired()
+    return token_data
+
+
+async def get_current_user(
+    token_data: TokenData = Depends(get_token_data), db: Session = Depends(get_db)
+) -> User:
+    """
+    Valida o token JWT e retorna o utilizador atual.
+    Lança exceção se o token for inválido, o utilizador não existir ou o token
+    tiver sido emitido antes de uma alteração de permissões (versão antiga).
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Credenciais inválidas",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    # Buscar utilizador (cache de identidade, ou BD se não estiver em cache)
+    user = get_user_by_email_cached(db, email=token_data.email)
     if user is None:
         raise credentials_exception
+    if token_data.version != (user.token_version or 0):
+        raise _session_expired()
     return user
 
 
@@ -68,29 +122,35 @@ async def get_current_active_user(
 
 
 async def get_current_active_superuser(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+    claims: TokenData = Depends(get_verified_claims),
+) -> TokenData:
     """
-    Verifica se o utilizador é um superuser (Admin).
+    Verifica se o utilizador é um superuser (Admin), só pelas claims do token
+    (o utilizador não é carregado). Devolve as claims verificadas.
     """
-    if not current_user.is_superuser:
+    if not claims.is_active:
+        raise HTTPException(status_code=400, detail="Utilizador inativo")
+    if not claims.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="O utilizador não tem privilégios suficientes",
         )
-    return current_user
+    return claims
 
 
 async def get_current_admin_or_secretaria(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+    claims: TokenData = Depends(get_verified_claims),
+) -> TokenData:
     """
-    Verifica se o utilizador é Admin ou Secretaria.
-    Usado para funcionalidades de pesquisa.
+    Verifica se o utilizador é Admin ou Secretaria, só pelas claims do token
+    (o utilizador não é carregado). Usado para funcionalidades de pesquisa.
+    Devolve as claims verificadas.
     """
-    if current_user.is_superuser or current_user.role == "secretaria":
-        return current_user
-    raise HTTPException(
-        status_code=status.HTTP_403_FORBIDDEN,
-        detail="Acesso restrito a Admin e Secretaria",
-    )
+    if not claims.is_active:
+        raise HTTPException(status_code=400, detail="Utilizador inativo")
+    if not (claims.is_superuser or claims.role == "secretaria"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso restrito a Admin e Secretaria",
+        )
+    return claims
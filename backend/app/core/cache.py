@@ -0,0 +1,124 @@
+"""
+Cache em Memória
+----------------
+Utilitários de cache partilhados pelos serviços da API:
+
+- Contadores de geração ("generations"): cada tipo de entidade tem um contador
+  que é incrementado sempre que é confirmada (commit) uma escrita
+  (insert/update/delete) nessa tabela. Os resultados em cache guardam a
+  geração com que foram calculados e deixam de ser válidos assim que a
+  geração muda.
+- TTLCache: cache LRU limitada em tamanho, com expiração opcional (TTL)
+  e métricas de utilização (hits/misses).
+
+Nota: a cache é local a cada processo (worker do uvicorn).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from app.db.events import run_after_commit
+
+_generations: Dict[str, int] = {}
+_generations_lock = threading.Lock()
+
+
+def get_generation(name: str) -> int:
+    """Devolve a geração atual de uma entidade."""
+    return _generations.get(name, 0)
+
+
+def bump_generation(name: str) -> int:
+    """Incrementa a geração de uma entidade (invalida caches dependentes)."""
+    with _generations_lock:
+        _generations[name] = _generations.get(name, 0) + 1
+        return _generations[name]
+
+
+def track_writes(model, name: str) -> None:
+    """
+    Regista listeners do SQLAlchemy que incrementam a geração `name`
+    sempre que um registo de `model` é criado, alterado ou removido.
+
+    A geração só muda depois do commit: antes disso, um leitor poderia guardar
+    dados antigos na cache com a nova geração (e uma transação revertida não
+    invalida nada).
+    """
+
+    def _bump(mapper, connection, target):
+        run_after_commit(object_session(target), lambda: bump_generation(name))
+
+    for event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, event_name, _bump)
+
+
+class TTLCache:
+    """
+    Cache LRU com expiração por tempo.
+
+    Args:
+        maxsize: Nº máximo de entradas (as menos usadas são descartadas)
+        ttl: Tempo de vida de cada entrada em segundos (None = sem expiração)
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Obtém um valor (ou `default` se não existir ou tiver expirado)."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Guarda um valor, descartando a entrada menos usada se necessário."""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove uma entrada."""
+        with self._lock:
+            item = self._data.pop(key, None)
+        return item[1] if item is not None else default
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas de utilização da cache."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 
 # Procurar .env na raiz do projeto (pasta pai de /backend)
@@ -21,16 +22,65 @@ class Settings:
     PROJECT_NAME: str = "ATEC Gestão Escolar"
     PROJECT_VERSION: str = "1.0.0"
 
+    # URL do Frontend (links nos emails e redirecionamento do login Google)
+    FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:5173")
+
     # Chave secreta para assinar tokens JWT (JSON Web Tokens)
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = "HS256"
     # Tempo de expiração do token de acesso em minutos
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Validade dos refresh tokens (renovação do token de acesso sem password)
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+
+    # Hashing de passwords (Argon2) fora do event loop:
+    # nº de hashes em simultâneo e nº máximo de pedidos em espera (acima -> 503)
+    PASSWORD_HASH_CONCURRENCY: int = int(
+        os.getenv("PASSWORD_HASH_CONCURRENCY", str(min(4, os.cpu_count() or 1)))
+    )
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+    # Custo do Argon2: perfil ("low", "default", "high") e, opcionalmente,
+    # valores que se sobrepõem ao perfil. Calibrar com scripts/calibrate_argon2.py.
+    # Hashes com parâmetros diferentes são atualizados no login seguinte.
+    ARGON2_PROFILE: str = os.getenv("ARGON2_PROFILE", "default")
+    ARGON2_TIME_COST: Optional[int] = (
+        int(os.getenv("ARGON2_TIME_COST")) if os.getenv("ARGON2_TIME_COST") else None
+    )
+    ARGON2_MEMORY_COST: Optional[int] = (
+        int(os.getenv("ARGON2_MEMORY_COST"))
+        if os.getenv("ARGON2_MEMORY_COST")
+        else None
+    )
+    ARGON2_PARALLELISM: Optional[int] = (
+        int(os.getenv("ARGON2_PARALLELISM"))
+        if os.getenv("ARGON2_PARALLELISM")
+        else None
+    )
+
+    # Limitação de tentativas em login, 2FA e recuperação de password:
+    # máximo por IP, por (IP, email) e por email numa janela deslizante (acima -> 429).
+    # Backend "memory" (por processo) ou "database" (partilhado entre processos)
+    RATE_LIMIT_ENABLED: bool = (
+        os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    )
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_WINDOW_SECONDS: int = int(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "300"))
+    RATE_LIMIT_PER_IP: int = int(os.getenv("RATE_LIMIT_PER_IP", "30"))
+    RATE_LIMIT_PER_EMAIL: int = int(os.getenv("RATE_LIMIT_PER_EMAIL", "5"))
+    # Limite por email somando todos os IPs (credential stuffing distribuído)
+    RATE_LIMIT_PER_ACCOUNT: int = int(os.getenv("RATE_LIMIT_PER_ACCOUNT", "20"))
 
     # Configuração da Base de Dados (SQLite)
     # Em Docker usa /app/data, localmente usa o caminho relativo
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
 
+    # Tamanho máximo de cada ficheiro enviado (upload), em MB
+    MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE_MB", "25")) * 1024 * 1024
+
+    # Hora (0-23) a partir da qual o scheduler recalcula os snapshots do Dashboard
+    DASHBOARD_PRECOMPUTE_HOUR: int = int(os.getenv("DASHBOARD_PRECOMPUTE_HOUR", "3"))
+
     # Configuração de Email
     MAIL_USERNAME: str = os.getenv("MAIL_USERNAME")
     MAIL_PASSWORD: str = os.getenv("MAIL_PASSWORD")
@@ -38,6 +88,16 @@ class Settings:
     MAIL_PORT: int = int(os.getenv("MAIL_PORT", "587"))
     MAIL_SERVER: str = os.getenv("MAIL_SERVER")
     MAIL_FROM_NAME: str = "ATEC Gestão Escolar"
+    MAIL_STARTTLS: bool = os.getenv("MAIL_STARTTLS", "true").lower() == "true"
+    MAIL_SSL_TLS: bool = os.getenv("MAIL_SSL_TLS", "false").lower() == "true"
+
+    # Caixa de saída de email (worker em background):
+    # emails por lote/ligação SMTP, intervalo de verificação e nº de tentativas
+    EMAIL_OUTBOX_BATCH_SIZE: int = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+    EMAIL_OUTBOX_POLL_SECONDS: float = float(
+        os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "5")
+    )
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
 
     # Google OAuth
     GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID")
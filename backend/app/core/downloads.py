@@ -0,0 +1,130 @@
+"""
+Downloads de Ficheiros
+----------------------
+Respostas para servir ficheiros do disco (ficheiros de utilizadores e a pasta
+estática /uploads) com suporte a:
+
+- Pedidos parciais (Range -> 206), para retomar downloads interrompidos e
+  permitir "seek" em PDFs e vídeos (tratado pelo FileResponse do Starlette,
+  incluindo If-Range).
+- Pedidos condicionais (If-None-Match / If-Modified-Since -> 304), para não
+  reenviar ficheiros que o cliente já tem em cache.
+- Envio direto do ficheiro pelo servidor ("http.response.pathsend") quando o
+  servidor ASGI o suporta; caso contrário, o ficheiro é lido em blocos de
+  DOWNLOAD_CHUNK_SIZE (maiores do que os 64 KiB por omissão do Starlette).
+
+Os conteúdos guardados por checksum (ver app.services.file_storage) usam o
+SHA-256 como ETag: não mudam nunca, pelo que a validação é exata.
+"""
+
+import os
+from email.utils import parsedate
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+# Tamanho de cada bloco enviado (quando o servidor não suporta pathsend)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Ficheiros de utilizadores: podem ficar em cache, mas revalidados a cada uso
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+# Conteúdos endereçados por checksum nunca mudam
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+class DownloadResponse(FileResponse):
+    """FileResponse com blocos de envio maiores."""
+
+    chunk_size = DOWNLOAD_CHUNK_SIZE
+
+
+def is_not_modified(response_headers: Headers, request_headers: Headers) -> bool:
+    """
+    True se o cliente já tem esta versão do ficheiro (pode receber 304).
+    If-None-Match tem prioridade sobre If-Modified-Since (RFC 9110).
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match:
+        if if_none_match.strip() == "*":
+            return True
+        etags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return response_headers["etag"] in etags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        since = parsedate(if_modified_since)
+        last_modified = parsedate(response_headers["last-modified"])
+        return (
+            since is not None and last_modified is not None and since >= last_modified
+        )
+    return False
+
+
+def file_download(
+    request: Request,
+    path: str,
+    *,
+    filename: Optional[str] = None,
+    media_type: Optional[str] = None,
+    checksum: Optional[str] = None,
+) -> Response:
+    """
+    Resposta de download de `path` (caminho absoluto), com Range e 304.
+    Lança 404 se o ficheiro não existir no disco.
+
+    Com `checksum` (SHA-256 do conteúdo), o ETag é o próprio checksum; sem
+    ele, é derivado da data de modificação e do tamanho.
+    """
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=404, detail="Ficheiro não encontrado no servidor"
+        )
+
+    headers = {"cache-control": PRIVATE_CACHE_CONTROL}
+    if checksum:
+        headers["etag"] = f'"{checksum}"'
+    response = DownloadResponse(
+        path,
+        headers=headers,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result,
+    )
+    if is_not_modified(response.headers, request.headers):
+        return NotModifiedResponse(response.headers)
+    return response
+
+
+class UploadsStaticFiles(StaticFiles):
+    """
+    Pasta estática /uploads: como StaticFiles (Range e 304 incluídos), com
+    blocos de envio maiores e cache permanente para os conteúdos por checksum.
+    """
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        blobs_dir = os.path.realpath(os.path.join(str(self.directory), "blobs"))
+        immutable = os.path.realpath(full_path).startswith(blobs_dir + os.sep)
+        response = DownloadResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers={
+                "cache-control": (
+                    IMMUTABLE_CACHE_CONTROL if immutable else PRIVATE_CACHE_CONTROL
+                )
+            },
+        )
+        if is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -1,98 +1,77 @@
-from typing import List
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from app.core.config import settings
+"""
+Envio de Emails
+---------------
+Os emails não são enviados diretamente: são colocados na caixa de saída
+(tabela email_outbox) e enviados pelo worker em background, em lotes e numa
+única ligação SMTP, com novas tentativas em caso de falha
+(ver app.services.email_outbox).
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=False,
-)
+Os corpos e assuntos vêm dos templates em app/templates/email/
+(ver app.core.email_templates).
+"""
 
+from typing import Iterable, Tuple
+from sqlalchemy.orm import Session
+from app.core.email_templates import render_email
+from app.db.session import SessionLocal
+from app.models.email_outbox import EmailOutbox
+from app.services.email_outbox import wake_outbox_worker
 
-async def send_verification_email(email_to: str, token: str):
+
+def enqueue_emails(db: Session, messages: Iterable[Tuple[str, str, str]]) -> int:
     """
-    Envia email de verificação de conta.
+    Coloca vários emails (destinatário, assunto, HTML) na caixa de saída,
+    num único commit. Devolve o nº de emails.
+    """
+    rows = [
+        EmailOutbox(recipient=recipient, subject=subject, body=body)
+        for recipient, subject, body in messages
+    ]
+    if rows:
+        db.add_all(rows)
+        db.commit()
+        wake_outbox_worker()
+    return len(rows)
+
+
+def enqueue_email(db: Session, email_to: str, subject: str, html: str) -> None:
     """
-    html = f"""
-    <h3>Bem-vindo à ATEC!</h3>
-    <p>Por favor, confirma a tua conta clicando no link abaixo:</p>
-    <a href="http://localhost:5173/verify-email?token={token}">Confirmar Email</a>
-    <p>Este link expira em 24 horas.</p>
-    <br>
-    <p>Se não pediste este registo, ignora este email.</p>
+    Coloca um email na caixa de saída.
     """
+    enqueue_emails(db, [(email_to, subject, html)])
 
-    message = MessageSchema(
-        subject="Confirmação de Registo - ATEC",
-        recipients=[email_to],
-        body=html,
-        subtype=MessageType.html,
-    )
 
-    fm = FastMail(conf)
+def queue_email(email_to: str, subject: str, html: str) -> None:
+    """
+    Coloca um email na caixa de saída numa sessão própria
+    (para usar em BackgroundTasks, fora da sessão do pedido).
+    """
+    db = SessionLocal()
     try:
-        await fm.send_message(message)
-    except Exception as e:
-        print(f"ERRO ao enviar email: {e}")
+        enqueue_email(db, email_to, subject, html)
+    finally:
+        db.close()
 
 
-async def send_reset_password_email(email_to: str, token: str):
-    """
-    Envia email para redefinição de password.
+def send_verification_email(email_to: str, token: str):
     """
-    html = f"""
-    <h3>Recuperação de Password - ATEC</h3>
-    <p>Recebemos um pedido para redefinir a tua password.</p>
-    <p>Clica no link abaixo para criar uma nova password:</p>
-    <a href="http://localhost:5173/reset-password?token={token}">Redefinir Password</a>
-    <p>Este link expira em 1 hora.</p>
-    <br>
-    <p>Se não pediste esta alteração, ignora este email.</p>
+    Envia email de verificação de conta.
     """
+    subject, html = render_email("verification.html", token=token)
+    queue_email(email_to, subject, html)
 
-    message = MessageSchema(
-        subject="Recuperação de Password - ATEC",
-        recipients=[email_to],
-        body=html,
-        subtype=MessageType.html,
-    )
 
-    fm = FastMail(conf)
-    try:
-        await fm.send_message(message)
-    except Exception as e:
-        print(f"ERRO ao enviar email de reset: {e}")
+def send_reset_password_email(email_to: str, token: str):
+    """
+    Envia email para redefinição de password.
+    """
+    subject, html = render_email("reset_password.html", token=token)
+    queue_email(email_to, subject, html)
 
 
-async def send_2fa_email(email_to: str, code: str):
+def send_2fa_email(email_to: str, code: str):
     """
     Envia email com código de autenticação (2FA).
     """
-    html = f"""
-    <h3>Código de Autenticação - ATEC</h3>
-    <p>O teu código de verificação é:</p>
-    <h2 style="background-color: #f3f4f6; padding: 10px; display: inline-block; letter-spacing: 5px;">{code}</h2>
-    <p>Este código expira em 5 minutos.</p>
-    <br>
-    <p>Se não tentaste fazer login, altera a tua password imediatamente.</p>
-    """
-
-    message = MessageSchema(
-        subject="Código de Verificação 2FA - ATEC",
-        recipients=[email_to],
-        body=html,
-        subtype=MessageType.html,
-    )
-
-    fm = FastMail(conf)
-    try:
-        await fm.send_message(message)
-    except Exception as e:
-        print(f"ERRO ao enviar email 2FA: {e}")
+    subject, html = render_email("two_factor.html", code=code)
+    queue_email(email_to, subject, html)
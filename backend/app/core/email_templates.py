@@ -0,0 +1,78 @@
+"""
+Templates de Email
+------------------
+Os corpos dos emails são templates Jinja2 em app/templates/email/ (HTML com
+escape automático). Cada template estende base.html e define os blocos
+"subject" (assunto) e "content" (corpo).
+
+Os templates são carregados e compilados uma única vez (no arranque da
+aplicação ou na primeira utilização) e ficam em memória: cada email é apenas
+a execução do template já compilado com os dados do destinatário, pelo que
+um envio em massa renderiza milhares de emails personalizados rapidamente.
+
+Os links usam settings.FRONTEND_URL (disponível em todos os templates como
+"frontend_url").
+"""
+
+import os
+import threading
+from typing import Any, Dict, Tuple
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+from markupsafe import Markup
+
+from app.core.config import settings
+
+TEMPLATES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "email"
+)
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html"]),
+    # Templates compilados ficam em memória (sem verificar alterações no disco)
+    auto_reload=False,
+    cache_size=-1,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+_env.globals.update(
+    project_name=settings.PROJECT_NAME,
+    frontend_url=settings.FRONTEND_URL.rstrip("/"),
+)
+
+_templates: Dict[str, Template] = {}
+_templates_lock = threading.Lock()
+
+
+def load_email_templates() -> int:
+    """
+    Carrega e compila todos os templates de email. Devolve o nº de templates.
+    """
+    compiled = {name: _env.get_template(name) for name in _env.list_templates()}
+    with _templates_lock:
+        _templates.clear()
+        _templates.update(compiled)
+    return len(compiled)
+
+
+def get_template(name: str) -> Template:
+    """Template compilado (carrega todos os templates na primeira utilização)."""
+    if not _templates:
+        load_email_templates()
+    try:
+        return _templates[name]
+    except KeyError:
+        raise ValueError(f"Template de email inexistente: '{name}'")
+
+
+def render_email(template_name: str, /, **context: Any) -> Tuple[str, str]:
+    """
+    Renderiza um template de email. Devolve (assunto, HTML).
+    """
+    template = get_template(template_name)
+    ctx = template.new_context(context)
+    # O assunto não é HTML: desfazer o escape automático (ex: "&amp;" -> "&")
+    subject = Markup("".join(template.blocks["subject"](ctx)).strip()).unescape()
+    html = "".join(template.root_render_func(template.new_context(context)))
+    return subject, html
@@ -0,0 +1,190 @@
+"""
+Limitação de Pedidos (Rate Limiting)
+------------------------------------
+Limitador de janela deslizante para os endpoints sensíveis de autenticação
+(login, 2FA e recuperação de password), por IP, por par (IP, email) e por
+email (conta).
+
+A verificação é feita no início de cada endpoint, antes de qualquer hashing
+Argon2 ou envio de email: uma rajada de tentativas (ex: credential stuffing)
+recebe 429 sem consumir CPU nem a caixa de correio.
+
+Backends (RATE_LIMIT_BACKEND):
+- "memory" (omissão): registo das tentativas em memória, local a cada
+  processo (worker do uvicorn).
+- "database": registo na tabela rate_limit_hits, partilhado por todos os
+  processos que usam a mesma base de dados.
+
+O limite por IP conta todos os pedidos. Os limites por email contam só as
+tentativas falhadas (ver record_attempt):
+- por (IP, email) (RATE_LIMIT_PER_EMAIL): limite baixo, trava a adivinhação
+  de passwords de uma conta a partir de um IP;
+- por email (RATE_LIMIT_PER_ACCOUNT): limite mais alto, comum a todos os IPs,
+  trava o credential stuffing distribuído contra uma conta. Por ser mais alto,
+  tentativas de terceiros demoram mais a bloquear o dono da conta.
+
+Nota: a verificação e o registo não são atómicos; pedidos em simultâneo
+podem exceder o limite em poucas tentativas.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.rate_limit_hit import RateLimitHit
+
+
+class MemoryBackend:
+    """Registo das tentativas em memória (deque de instantes por chave)."""
+
+    # Acima deste nº de chaves, as chaves sem tentativas na janela são removidas
+    MAX_KEYS = 10000
+
+    def __init__(self):
+        self._hits: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def retry_after(self, key: str, limit: int, window: int) -> float:
+        """Segundos até haver margem na janela (0 se ainda houver)."""
+        cutoff = time.time() - window
+        with self._lock:
+            hits = self._hits.get(key)
+            if not hits:
+                return 0.0
+            while hits and hits[0] <= cutoff:
+                hits.popleft()
+            if not hits:
+                # Sem tentativas na janela: a chave deixa de ser necessária
+                del self._hits[key]
+                return 0.0
+            if len(hits) < limit:
+                return 0.0
+            return hits[0] - cutoff
+
+    def add(self, key: str, window: int) -> None:
+        """Regista uma tentativa."""
+        now = time.time()
+        with self._lock:
+            self._hits.setdefault(key, deque()).append(now)
+            if len(self._hits) > self.MAX_KEYS:
+                self._prune(now - window)
+
+    def _prune(self, cutoff: float) -> None:
+        stale = [k for k, hits in self._hits.items() if not hits or hits[-1] <= cutoff]
+        for key in stale:
+            del self._hits[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hits.clear()
+
+
+class DatabaseBackend:
+    """Registo das tentativas na base de dados (partilhado entre processos)."""
+
+    def retry_after(self, key: str, limit: int, window: int) -> float:
+        cutoff = time.time() - window
+        db = SessionLocal()
+        try:
+            query = db.query(RateLimitHit.created_at).filter(
+                RateLimitHit.key == key, RateLimitHit.created_at > cutoff
+            )
+            if query.count() < limit:
+                return 0.0
+            oldest = query.order_by(RateLimitHit.created_at).limit(1).scalar()
+            return oldest - cutoff
+        finally:
+            db.close()
+
+    def add(self, key: str, window: int) -> None:
+        now = time.time()
+        db = SessionLocal()
+        try:
+            # Apagar tentativas fora da janela (de todas as chaves)
+            db.query(RateLimitHit).filter(
+                RateLimitHit.created_at <= now - window
+            ).delete(synchronize_session=False)
+            db.add(RateLimitHit(key=key, created_at=now))
+            db.commit()
+        finally:
+            db.close()
+
+    def clear(self) -> None:
+        db = SessionLocal()
+        try:
+            db.query(RateLimitHit).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+_BACKENDS = {"memory": MemoryBackend, "database": DatabaseBackend}
+backend = _BACKENDS.get(settings.RATE_LIMIT_BACKEND, MemoryBackend)()
+
+
+def client_ip(request: Request) -> str:
+    """IP do cliente (ligação direta; cabeçalhos de proxy não são confiáveis)."""
+    return request.client.host if request.client else "unknown"
+
+
+def _ip_key(scope: str, request: Request) -> str:
+    return f"{scope}:ip:{client_ip(request)}"
+
+
+def _email_keys(scope: str, request: Request, email: str) -> List[Tuple[str, int]]:
+    """Chaves e limites por email: por (IP, email) e por conta (todos os IPs)."""
+    email = email.strip().lower()
+    return [
+        (f"{scope}:email:{client_ip(request)}:{email}", settings.RATE_LIMIT_PER_EMAIL),
+        (f"{scope}:account:{email}", settings.RATE_LIMIT_PER_ACCOUNT),
+    ]
+
+
+def check_rate_limit(scope: str, request: Request, email: Optional[str] = None) -> None:
+    """
+    Verifica os limites de `scope` (ex: "login") para o IP do pedido e, se
+    indicado, para o email (por IP e no total). Lança 429 (com Retry-After) se algum
+    dos limites da janela (RATE_LIMIT_WINDOW_SECONDS) tiver sido atingido.
+
+    Todos os limites são verificados antes de registar a tentativa; um pedido
+    recusado não conta. Só o limite por IP é registado aqui: os limites por
+    email contam apenas as tentativas registadas com record_attempt.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    window = settings.RATE_LIMIT_WINDOW_SECONDS
+    checks = [(_ip_key(scope, request), settings.RATE_LIMIT_PER_IP)]
+    if email:
+        checks.extend(_email_keys(scope, request, email))
+
+    retry_after = max(backend.retry_after(key, limit, window) for key, limit in checks)
+    if retry_after > 0:
+        retry_after = max(1, math.ceil(retry_after))
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=(
+                "Demasiadas tentativas. "
+                f"Tenta novamente dentro de {retry_after} segundos."
+            ),
+            headers={"Retry-After": str(retry_after)},
+        )
+    backend.add(checks[0][0], window)
+
+
+def record_attempt(scope: str, request: Request, email: str) -> None:
+    """
+    Regista uma tentativa nos limites por email de `scope`: um login ou
+    código 2FA errado, ou um pedido de recuperação de password (envia email).
+    Tentativas bem-sucedidas de login não contam.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    for key, _ in _email_keys(scope, request, email):
+        backend.add(key, settings.RATE_LIMIT_WINDOW_SECONDS)
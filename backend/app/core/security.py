@@ -1,12 +1,68 @@
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
+from typing import Dict, Optional, Tuple, Union, Any
+from anyio import CapacityLimiter, to_thread
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
+from passlib.hash import argon2
 from app.core.config import settings
 
+# Perfis de custo do Argon2 (time_cost = iterações, memory_cost em KiB).
+# "default" corresponde aos valores por omissão do passlib (hashes existentes).
+ARGON2_PROFILES: Dict[str, Dict[str, int]] = {
+    # Mínimo recomendado pela OWASP: login rápido, menos resistente a ataques
+    "low": {"time_cost": 2, "memory_cost": 19456, "parallelism": 1},
+    "default": {"time_cost": 3, "memory_cost": 65536, "parallelism": 4},
+    # Mais lento e com mais memória (ajustar PASSWORD_HASH_CONCURRENCY em conformidade)
+    "high": {"time_cost": 4, "memory_cost": 131072, "parallelism": 4},
+}
+
+
+def argon2_params() -> Dict[str, int]:
+    """
+    Parâmetros do Argon2 em uso: o perfil ARGON2_PROFILE com os valores
+    ARGON2_TIME_COST / ARGON2_MEMORY_COST / ARGON2_PARALLELISM, se definidos.
+    """
+    if settings.ARGON2_PROFILE not in ARGON2_PROFILES:
+        raise ValueError(
+            f"ARGON2_PROFILE inválido: '{settings.ARGON2_PROFILE}' "
+            f"(opções: {', '.join(ARGON2_PROFILES)})"
+        )
+    params = dict(ARGON2_PROFILES[settings.ARGON2_PROFILE])
+    overrides = {
+        "time_cost": settings.ARGON2_TIME_COST,
+        "memory_cost": settings.ARGON2_MEMORY_COST,
+        "parallelism": settings.ARGON2_PARALLELISM,
+    }
+    params.update({key: value for key, value in overrides.items() if value})
+    return params
+
+
+def build_pwd_context(params: Dict[str, int]) -> CryptContext:
+    """
+    Cria o contexto do Passlib com os parâmetros indicados. O nº de iterações
+    é fixado (mínimo = máximo) para que hashes mais fracos ou mais fortes do
+    que o configurado sejam marcados para atualização.
+    """
+    return CryptContext(
+        schemes=["argon2"],
+        deprecated="auto",
+        argon2__rounds=params["time_cost"],
+        argon2__min_rounds=params["time_cost"],
+        argon2__max_rounds=params["time_cost"],
+        argon2__memory_cost=params["memory_cost"],
+        argon2__parallelism=params["parallelism"],
+    )
+
+
 # Configuração do Passlib para hashing de passwords
 # Passamos a usar Argon2 para evitar incompatibilidade do Bcrypt (limite 72 bytes)
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+ARGON2_PARAMS = argon2_params()
+pwd_context = build_pwd_context(ARGON2_PARAMS)
+
+# Limita os hashes em simultâneo nas threads (o Argon2 liberta o GIL, mas é
+# pesado em CPU e memória). Criado na primeira utilização, dentro do event loop.
+_hash_limiter: Optional[CapacityLimiter] = None
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -23,6 +79,79 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Indica se a hash foi gerada com parâmetros diferentes dos configurados
+    (o passlib não compara o paralelismo, pelo que é verificado aqui).
+    """
+    if pwd_context.needs_update(hashed_password):
+        return True
+    try:
+        parsed = argon2.from_string(hashed_password)
+    except ValueError:
+        return True
+    return parsed.parallelism != ARGON2_PARAMS["parallelism"]
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a password e, se a hash estiver desatualizada (perfil de custo
+    alterado), devolve também uma nova hash para guardar: (válida, nova_hash).
+    """
+    # Contas sem password (ex: Google ou importadas sem password)
+    if not hashed_password or not verify_password(plain_password, hashed_password):
+        return False, None
+    if password_needs_rehash(hashed_password):
+        return True, get_password_hash(plain_password)
+    return True, None
+
+
+async def _run_hashing(func, *args):
+    """
+    Executa uma função de hashing numa thread, sem bloquear o event loop.
+    Se já houver demasiados pedidos em espera, responde 503 de imediato
+    (back-pressure) em vez de acumular trabalho.
+    """
+    global _hash_limiter
+    if _hash_limiter is None:
+        _hash_limiter = CapacityLimiter(settings.PASSWORD_HASH_CONCURRENCY)
+
+    if _hash_limiter.statistics().tasks_waiting >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado. Tenta novamente dentro de instantes.",
+            headers={"Retry-After": "1"},
+        )
+    return await to_thread.run_sync(func, *args, limiter=_hash_limiter)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Versão assíncrona de verify_password (para endpoints async def).
+    """
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Versão assíncrona de verify_and_update_password (para endpoints async def).
+    """
+    return await _run_hashing(
+        verify_and_update_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Versão assíncrona de get_password_hash (para endpoints async def).
+    """
+    return await _run_hashing(get_password_hash, password)
+
+
 def create_access_token(
     subject: Union[str, Any],
     expires_delta: Optional[timedelta] = None,
@@ -46,3 +175,24 @@ def create_access_token(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
     return encoded_jwt
+
+
+def create_user_access_token(user, expires_delta: Optional[timedelta] = None) -> str:
+    """
+    Cria o token de acesso de um utilizador, com as claims de autorização
+    (role, superuser, ativo) e a versão do token.
+
+    As claims permitem recusar pedidos sem ir à base de dados; a versão
+    (user.token_version) invalida os tokens antigos quando as permissões mudam.
+    """
+    role = user.role.value if hasattr(user.role, "value") else user.role
+    return create_access_token(
+        subject=user.email,
+        expires_delta=expires_delta,
+        data={
+            "role": role,
+            "su": bool(user.is_superuser),
+            "act": bool(user.is_active),
+            "ver": user.token_version or 0,
+        },
+    )
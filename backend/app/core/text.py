@@ -0,0 +1,55 @@
+"""
+Normalização de Texto para Pesquisa
+-----------------------------------
+Funções para gerar chaves de pesquisa independentes de maiúsculas e acentos
+("Gonçalo João" -> "goncalo joao") e trigramas para pesquisa aproximada
+(tolerante a erros ortográficos).
+"""
+
+import re
+import unicodedata
+from typing import Optional, Set
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """
+    Normaliza um texto para pesquisa: remove acentos, converte para
+    minúsculas e substitui pontuação por espaços.
+    """
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", without_accents.casefold()).strip()
+
+
+def trigrams(normalized: str) -> Set[str]:
+    """
+    Conjunto de trigramas de um texto já normalizado.
+    Como no pg_trgm, cada palavra é delimitada por espaços ("  joao ") para que
+    o início e o fim das palavras também contem na comparação.
+    """
+    result = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            result.add(padded[i : i + 3])
+    return result
+
+
+def trigram_similarity(query: str, target: str) -> float:
+    """
+    Semelhança entre um termo pesquisado e um texto (ambos normalizados),
+    entre 0 (nada em comum) e 1 (iguais).
+
+    É a média entre o índice de Jaccard dos trigramas (penaliza textos muito
+    diferentes em tamanho) e a fração dos trigramas do termo presentes no texto
+    (permite encontrar "silva" em "joao da silva rodrigues").
+    """
+    tq, tt = trigrams(query), trigrams(target)
+    if not tq or not tt:
+        return 0.0
+    shared = len(tq & tt)
+    return (shared / len(tq | tt) + shared / len(tq)) / 2
@@ -26,6 +26,7 @@ from app.crud.module_grade import module_grade
 from app.crud.trainer_availability import trainer_availability
 from app.crud.user_file import user_file
 from app.crud.chat_log import chat_log
+from app.crud.dashboard_snapshot import dashboard_snapshot
 
 # User CRUD mantém a API original (funções, não classe)
 # Para consistência futura, pode ser migrado para o padrão de classe
@@ -42,5 +43,6 @@ __all__ = [
     "trainer_availability",
     "user_file",
     "chat_log",
+    "dashboard_snapshot",
     "user",
 ]
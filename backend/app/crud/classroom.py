@@ -4,6 +4,7 @@ CRUD para Sala (Classroom)
 Operações de base de dados para a entidade Classroom.
 """
 
+from app.core.cache import track_writes
 from app.crud.base import CRUDBase
 from app.models.classroom import Classroom
 from app.schemas.classroom import ClassroomCreate, ClassroomUpdate
@@ -21,3 +22,6 @@ class CRUDClassroom(CRUDBase[Classroom, ClassroomCreate, ClassroomUpdate]):
 
 # Instância singleton para uso nos routers
 classroom = CRUDClassroom(Classroom)
+
+# Invalida caches dependentes dos salas a cada escrita
+track_writes(Classroom, "classrooms")
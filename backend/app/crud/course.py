@@ -7,6 +7,7 @@ Operações de base de dados para a entidade Course.
 from typing import List, Optional
 from sqlalchemy.orm import Session
 
+from app.core.cache import track_writes
 from app.crud.base import CRUDBase
 from app.models.course import Course, CourseStatus
 from app.schemas.course import CourseCreate, CourseUpdate
@@ -41,3 +42,6 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
 
 # Instância singleton para uso nos routers
 course = CRUDCourse(Course)
+
+# Invalida caches dependentes dos cursos a cada escrita
+track_writes(Course, "courses")
@@ -0,0 +1,84 @@
+"""
+CRUD para Snapshot do Dashboard (DashboardSnapshot)
+---------------------------------------------------
+Operações de base de dados para os agregados pré-calculados do Dashboard.
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.models.dashboard_snapshot import DashboardSnapshot
+from app.schemas.dashboard_snapshot import (
+    DashboardSnapshotCreate,
+    DashboardSnapshotUpdate,
+)
+
+# INSERT com suporte a ON CONFLICT, por dialeto
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+class CRUDDashboardSnapshot(
+    CRUDBase[DashboardSnapshot, DashboardSnapshotCreate, DashboardSnapshotUpdate]
+):
+    """
+    CRUD para DashboardSnapshot.
+    """
+
+    def get_by_panel(self, db: Session, *, panel: str) -> Optional[DashboardSnapshot]:
+        """
+        Obtém o snapshot de um painel.
+        """
+        return db.query(self.model).filter(self.model.panel == panel).first()
+
+    def get_by_panels(
+        self, db: Session, *, panels: List[str]
+    ) -> List[DashboardSnapshot]:
+        """
+        Obtém os snapshots de vários painéis numa só query.
+        """
+        return db.query(self.model).filter(self.model.panel.in_(panels)).all()
+
+    def save(
+        self,
+        db: Session,
+        *,
+        panel: str,
+        data: Any,
+        computed_at: datetime,
+        commit: bool = True
+    ) -> None:
+        """
+        Cria ou substitui o snapshot de um painel.
+        Em SQLite/PostgreSQL é um único INSERT ... ON CONFLICT DO UPDATE, pelo
+        que dois cálculos em simultâneo não falham na restrição de unicidade.
+        """
+        insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if insert is not None:
+            stmt = insert(self.model).values(
+                panel=panel, data=data, computed_at=computed_at
+            )
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[self.model.panel],
+                    set_={
+                        "data": stmt.excluded.data,
+                        "computed_at": stmt.excluded.computed_at,
+                    },
+                )
+            )
+        else:
+            db_obj = self.get_by_panel(db, panel=panel)
+            if db_obj is None:
+                db_obj = self.model(panel=panel)
+            db_obj.data = data
+            db_obj.computed_at = computed_at
+            db.add(db_obj)
+        if commit:
+            db.commit()
+
+
+# Instância singleton para uso nos routers
+dashboard_snapshot = CRUDDashboardSnapshot(DashboardSnapshot)
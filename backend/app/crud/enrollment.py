@@ -4,10 +4,14 @@ CRUD para Inscrição (Enrollment)
 Operações de base de dados para a entidade Enrollment.
 """
 
-from typing import List, Optional
+from datetime import date
+from typing import Any, List, Optional, Union
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
+from app.core.cache import track_writes
 from app.crud.base import CRUDBase
+from app.models.course import Course
 from app.models.enrollment import Enrollment, EnrollmentStatus
 from app.schemas.enrollment import EnrollmentCreate, EnrollmentUpdate
 
@@ -18,6 +22,40 @@ class CRUDEnrollment(CRUDBase[Enrollment, EnrollmentCreate, EnrollmentUpdate]):
     Herda operações básicas e adiciona métodos específicos.
     """
 
+    def create(self, db: Session, *, obj_in: EnrollmentCreate) -> Enrollment:
+        """
+        Cria uma inscrição, registando a data de desistência se aplicável.
+        """
+        if obj_in.status == EnrollmentStatus.dropped and obj_in.dropped_at is None:
+            obj_in = obj_in.model_copy(update={"dropped_at": date.today()})
+        return super().create(db, obj_in=obj_in)
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Enrollment,
+        obj_in: Union[EnrollmentUpdate, dict[str, Any]]
+    ) -> Enrollment:
+        """
+        Atualiza uma inscrição.
+        Ao passar para 'dropped' regista a data de desistência (hoje, se não for
+        indicada); ao sair de 'dropped' a data é limpa.
+        """
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+
+        new_status = update_data.get("status")
+        if new_status is not None and new_status != db_obj.status:
+            if new_status == EnrollmentStatus.dropped:
+                update_data.setdefault("dropped_at", date.today())
+            else:
+                update_data["dropped_at"] = None
+
+        return super().update(db, db_obj=db_obj, obj_in=update_data)
+
     def get_by_user(
         self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100
     ) -> List[Enrollment]:
@@ -80,6 +118,64 @@ class CRUDEnrollment(CRUDBase[Enrollment, EnrollmentCreate, EnrollmentUpdate]):
             query = query.filter(self.model.user_id == user_id)
         return query.offset(skip).limit(limit).all()
 
+    def get_funnel_rows(self, db: Session) -> List[Any]:
+        """
+        Agrega as inscrições por curso numa única query agrupada:
+        contagens por estado, somas para médias de nota final e
+        dias até à desistência (relativos a Course.start_date).
+        """
+        status = self.model.status
+        # Dias entre o início do curso e a desistência (negativo = antes do início)
+        dropout_days = func.julianday(self.model.dropped_at) - func.julianday(
+            Course.start_date
+        )
+        is_dropped_with_date = (status == EnrollmentStatus.dropped) & (
+            self.model.dropped_at.isnot(None)
+        )
+
+        def count_if(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+        return (
+            db.query(
+                Course.id.label("course_id"),
+                Course.name.label("course_name"),
+                Course.area.label("area"),
+                Course.start_date.label("start_date"),
+                func.count(self.model.id).label("enrolled"),
+                count_if(status == EnrollmentStatus.active).label("active"),
+                count_if(status == EnrollmentStatus.completed).label("completed"),
+                count_if(status == EnrollmentStatus.dropped).label("dropped"),
+                func.count(self.model.final_grade).label("graded"),
+                func.coalesce(func.sum(self.model.final_grade), 0).label(
+                    "final_grade_sum"
+                ),
+                count_if(is_dropped_with_date).label("dropout_dated"),
+                func.coalesce(
+                    func.sum(case((is_dropped_with_date, dropout_days), else_=0)), 0
+                ).label("dropout_days_sum"),
+                count_if(is_dropped_with_date & (dropout_days < 0)).label(
+                    "dropped_before_start"
+                ),
+                count_if(
+                    is_dropped_with_date & (dropout_days >= 0) & (dropout_days <= 30)
+                ).label("dropped_first_30_days"),
+                count_if(
+                    is_dropped_with_date & (dropout_days > 30) & (dropout_days <= 90)
+                ).label("dropped_31_90_days"),
+                count_if(is_dropped_with_date & (dropout_days > 90)).label(
+                    "dropped_after_90_days"
+                ),
+            )
+            .join(Course, self.model.course_id == Course.id)
+            .group_by(Course.id, Course.name, Course.area, Course.start_date)
+            .order_by(Course.area, Course.start_date)
+            .all()
+        )
+
 
 # Instância singleton para uso nos routers
 enrollment = CRUDEnrollment(Enrollment)
+
+# Invalida caches dependentes (ex: funil de inscrições) a cada escrita
+track_writes(Enrollment, "enrollments")
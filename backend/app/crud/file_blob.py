@@ -0,0 +1,72 @@
+"""
+CRUD para Conteúdo de Ficheiro (FileBlob)
+-----------------------------------------
+Contagem de referências dos conteúdos guardados (ver app.models.file_blob).
+Nota: a gestão dos ficheiros físicos fica em app.services.file_storage.
+"""
+
+from typing import Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.file_blob import FileBlob
+from app.models.user_files import UserFile
+
+
+def acquire(db: Session, *, checksum: str, size: int, file_path: str) -> FileBlob:
+    """
+    Regista uma nova referência ao conteúdo (cria o registo na primeira).
+    Não faz commit: é confirmado juntamente com o UserFile.
+    """
+    blob = db.get(FileBlob, checksum)
+    if blob is None:
+        blob = FileBlob(checksum=checksum, size=size, file_path=file_path, ref_count=0)
+        db.add(blob)
+    blob.ref_count += 1
+    return blob
+
+
+def release(db: Session, *, checksum: str) -> Optional[FileBlob]:
+    """
+    Remove uma referência ao conteúdo. Se for a última, apaga o registo e
+    devolve-o (o ficheiro físico deve então ser apagado). Não faz commit.
+    """
+    blob = db.get(FileBlob, checksum)
+    if blob is None:
+        return None
+    blob.ref_count -= 1
+    if blob.ref_count > 0:
+        return None
+    db.delete(blob)
+    return blob
+
+
+def get_storage_report(db: Session) -> Dict:
+    """
+    Espaço ocupado pelos ficheiros: tamanho total dos ficheiros (como se cada
+    upload fosse guardado à parte) vs espaço real ocupado pelos conteúdos.
+    """
+    files, logical_bytes = db.query(
+        func.count(UserFile.id), func.coalesce(func.sum(UserFile.size), 0)
+    ).one()
+    blobs, stored_bytes = db.query(
+        func.count(FileBlob.checksum), func.coalesce(func.sum(FileBlob.size), 0)
+    ).one()
+    # Ficheiros anteriores ao armazenamento por conteúdo (guardados à parte)
+    legacy_files, legacy_bytes = (
+        db.query(func.count(UserFile.id), func.coalesce(func.sum(UserFile.size), 0))
+        .outerjoin(FileBlob, FileBlob.checksum == UserFile.checksum)
+        .filter(FileBlob.checksum.is_(None))
+        .one()
+    )
+    stored_bytes += legacy_bytes
+    saved_bytes = logical_bytes - stored_bytes
+    return {
+        "files": files,
+        "unique_contents": blobs,
+        "legacy_files": legacy_files,
+        "logical_bytes": logical_bytes,
+        "stored_bytes": stored_bytes,
+        "saved_bytes": saved_bytes,
+        "saved_ratio": round(saved_bytes / logical_bytes, 4) if logical_bytes else 0.0,
+    }
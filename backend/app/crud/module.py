@@ -4,6 +4,7 @@ CRUD para Módulo (Module)
 Operações de base de dados para a entidade Module.
 """
 
+from app.core.cache import track_writes
 from app.crud.base import CRUDBase
 from app.models.module import Module
 from app.schemas.module import ModuleCreate, ModuleUpdate
@@ -21,3 +22,6 @@ class CRUDModule(CRUDBase[Module, ModuleCreate, ModuleUpdate]):
 
 # Instância singleton para uso nos routers
 module = CRUDModule(Module)
+
+# Invalida caches dependentes dos módulos a cada escrita
+track_writes(Module, "modules")
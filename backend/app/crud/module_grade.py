@@ -4,7 +4,7 @@ CRUD para Nota de Módulo (ModuleGrade)
 Operações de base de dados para a entidade ModuleGrade.
 """
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
@@ -93,6 +93,40 @@ class CRUDModuleGrade(CRUDBase[ModuleGrade, ModuleGradeCreate, ModuleGradeUpdate
             .all()
         )
 
+    def get_grade_columns(
+        self,
+        db: Session,
+        *,
+        course_id: Optional[int] = None,
+        course_module_id: Optional[int] = None
+    ) -> List[Tuple[int, str, int, str, float]]:
+        """
+        Obtém apenas as colunas necessárias para análise estatística
+        (curso, módulo do curso, nota) numa única query, ordenada por
+        curso e módulo para permitir o agrupamento vetorizado.
+        """
+        from app.models.course import Course
+        from app.models.course_module import CourseModule
+        from app.models.module import Module
+
+        query = (
+            db.query(
+                Course.id,
+                Course.name,
+                CourseModule.id,
+                Module.name,
+                self.model.grade,
+            )
+            .join(CourseModule, self.model.course_module_id == CourseModule.id)
+            .join(Course, CourseModule.course_id == Course.id)
+            .join(Module, CourseModule.module_id == Module.id)
+        )
+        if course_id:
+            query = query.filter(Course.id == course_id)
+        if course_module_id:
+            query = query.filter(CourseModule.id == course_module_id)
+        return query.order_by(Course.id, CourseModule.order, CourseModule.id).all()
+
 
 # Instância singleton para uso nos routers
 module_grade = CRUDModuleGrade(ModuleGrade)
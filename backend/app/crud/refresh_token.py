@@ -0,0 +1,188 @@
+"""
+CRUD de Refresh Tokens
+----------------------
+Emissão, rotação e revogação dos refresh tokens (ver app.models.refresh_token).
+
+Os tokens são strings aleatórias opacas; na BD só fica o hash SHA-256, pelo
+que renovar uma sessão custa uma pesquisa por hash (índice único) em vez de
+uma verificação Argon2.
+
+Os hashes das famílias revogadas (logout, reutilização detetada, reset de
+password), ainda não expirados, são mantidos num conjunto em memória: esses
+tokens são recusados sem ir à BD. Um token apenas rodado não entra no
+conjunto: a sua reutilização tem de chegar à BD para revogar a família. A BD
+continua a ser a fonte de verdade (o conjunto é local a cada processo).
+"""
+
+import hashlib
+import secrets
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+# hash -> data de expiração dos tokens revogados (ainda não expirados)
+_revoked: Dict[str, datetime] = {}
+_revoked_lock = threading.Lock()
+# Acima deste tamanho, as entradas expiradas são removidas ao revogar
+_REVOKED_PRUNE_SIZE = 10000
+
+
+def hash_token(token: str) -> str:
+    """Hash SHA-256 (hex) de um refresh token."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def is_revoked(token_hash: str) -> bool:
+    """Teste rápido (em memória): True se a família do token foi revogada."""
+    return token_hash in _revoked
+
+
+def _mark_revoked(items) -> None:
+    """Adiciona (hash, expiração) ao conjunto de revogados."""
+    now = datetime.utcnow()
+    with _revoked_lock:
+        for token_hash, expires_at in items:
+            if expires_at > now:
+                _revoked[token_hash] = expires_at
+        if len(_revoked) > _REVOKED_PRUNE_SIZE:
+            for token_hash in [h for h, exp in _revoked.items() if exp <= now]:
+                del _revoked[token_hash]
+
+
+def load_revoked_tokens(db: Session) -> int:
+    """
+    Carrega os tokens revogados ainda não expirados para memória (no arranque)
+    e apaga da BD os tokens já expirados. Devolve o nº de tokens carregados.
+
+    Ficam de fora os tokens rodados de famílias ainda ativas (com um token
+    por revogar), para que a sua reutilização continue a revogar a família.
+    """
+    now = datetime.utcnow()
+    db.query(RefreshToken).filter(RefreshToken.expires_at <= now).delete(
+        synchronize_session=False
+    )
+    db.commit()
+    active_families = db.query(RefreshToken.family_id).filter(
+        RefreshToken.revoked.is_(False)
+    )
+    rows = (
+        db.query(RefreshToken.token_hash, RefreshToken.expires_at)
+        .filter(
+            RefreshToken.revoked.is_(True),
+            RefreshToken.family_id.not_in(active_families),
+        )
+        .all()
+    )
+    with _revoked_lock:
+        _revoked.clear()
+    _mark_revoked(rows)
+    return len(rows)
+
+
+def create_refresh_token(
+    db: Session, user: User, family_id: Optional[str] = None
+) -> str:
+    """
+    Emite um novo refresh token para o utilizador (numa nova família, por
+    omissão) e devolve o token em claro (só é conhecido pelo cliente).
+    """
+    token = secrets.token_urlsafe(32)
+    db.add(
+        RefreshToken(
+            user_id=user.id,
+            token_hash=hash_token(token),
+            family_id=family_id or secrets.token_hex(16),
+            expires_at=datetime.utcnow()
+            + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    db.commit()
+    return token
+
+
+def revoke_family(db: Session, family_id: str) -> None:
+    """Revoga todos os tokens de uma família (logout ou reutilização detetada)."""
+    rows = (
+        db.query(RefreshToken)
+        .filter(RefreshToken.family_id == family_id, RefreshToken.revoked.is_(False))
+        .all()
+    )
+    for row in rows:
+        row.revoked = True
+    db.commit()
+    _mark_revoked((row.token_hash, row.expires_at) for row in rows)
+
+
+def revoke_user_tokens(db: Session, user_id: int) -> None:
+    """Revoga todos os refresh tokens de um utilizador (ex: reset de password)."""
+    rows = (
+        db.query(RefreshToken)
+        .filter(RefreshToken.user_id == user_id, RefreshToken.revoked.is_(False))
+        .all()
+    )
+    for row in rows:
+        row.revoked = True
+    db.commit()
+    _mark_revoked((row.token_hash, row.expires_at) for row in rows)
+
+
+def rotate_refresh_token(db: Session, token: str) -> Optional[Tuple[User, str]]:
+    """
+    Troca um refresh token válido por um novo (da mesma família).
+
+    Devolve (utilizador, novo token), ou None se o token for inválido,
+    expirado ou já usado. Reutilizar um token já rodado revoga a família
+    inteira (o token pode ter sido roubado).
+    """
+    token_hash = hash_token(token)
+    if is_revoked(token_hash):
+        # Família já revogada: recusado sem ir à BD
+        return None
+    row = db.query(RefreshToken).filter(RefreshToken.token_hash == token_hash).first()
+    if row is None:
+        return None
+    if row.revoked:
+        # Token já usado (rodado neste ou noutro processo): reutilização
+        revoke_family(db, row.family_id)
+        return None
+    if row.expires_at <= datetime.utcnow():
+        return None
+
+    user = row.user
+    if user is None or not user.is_active:
+        return None
+
+    # Reserva atómica: de dois pedidos com o mesmo token, só um o consegue
+    # marcar como revogado; o outro é tratado como reutilização.
+    claimed = (
+        db.query(RefreshToken)
+        .filter(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked.is_(False),
+            RefreshToken.expires_at > datetime.utcnow(),
+        )
+        .update({RefreshToken.revoked: True}, synchronize_session=False)
+    )
+    if claimed == 0:
+        db.rollback()
+        revoke_family(db, row.family_id)
+        return None
+
+    # O novo token é gravado na mesma transação da reserva
+    new_token = create_refresh_token(db, user, family_id=row.family_id)
+    return user, new_token
+
+
+def get_family(db: Session, token: str) -> Optional[str]:
+    """Família de um refresh token (ou None se não existir)."""
+    return (
+        db.query(RefreshToken.family_id)
+        .filter(RefreshToken.token_hash == hash_token(token))
+        .scalar()
+    )
@@ -1,8 +1,17 @@
-from sqlalchemy.orm import Session
-from app.models.user import User
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash
-from typing import Union
+from typing import Optional, Union
+
+from app.core.cache import TTLCache, track_writes
+from app.db.events import run_after_commit
+
+# Cache de identidade (email -> colunas do utilizador) usada na autenticação.
+# TTL curto: limita o tempo de vida de dados alterados fora da aplicação.
+USER_IDENTITY_TTL = 30
+_identity_cache = TTLCache(maxsize=1024, ttl=USER_IDENTITY_TTL)
 
 
 def get_user_by_email(db: Session, email: str):
@@ -12,12 +21,57 @@ def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
 
-def create_user(db: Session, user: UserCreate):
+def get_user_by_email_cached(db: Session, email: str):
+    """
+    Como get_user_by_email, mas reutiliza os dados do utilizador durante
+    USER_IDENTITY_TTL segundos (evita uma query por pedido autenticado).
+
+    O utilizador em cache é associado à sessão `db` sem ir à base de dados,
+    pelo que pode ser alterado e guardado normalmente.
+    """
+    values = _identity_cache.get(email)
+    if values is None:
+        user = get_user_by_email(db, email=email)
+        if user is not None:
+            columns = inspect(User).column_attrs
+            _identity_cache.set(
+                email, {attr.key: getattr(user, attr.key) for attr in columns}
+            )
+        return user
+
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+def get_token_version_cached(db: Session, email: str) -> Optional[int]:
+    """
+    Versão atual dos tokens do utilizador (None se não existir), lida da cache
+    de identidade sem criar o objeto User (ver deps.get_verified_claims).
+    """
+    values = _identity_cache.get(email)
+    if values is None:
+        user = get_user_by_email_cached(db, email=email)
+        return None if user is None else user.token_version or 0
+    return values["token_version"] or 0
+
+
+def invalidate_user_identity(*emails: str) -> None:
+    """Remove utilizadores da cache de identidade."""
+    for email in emails:
+        _identity_cache.pop(email)
+
+
+def create_user(
+    db: Session, user: UserCreate, hashed_password: Optional[str] = None
+):
     """
     Cria um novo utilizador na base de dados.
-    A password é automaticamente encriptada antes de ser guardada.
+    A password é automaticamente encriptada antes de ser guardada
+    (exceto se o hash já for fornecido em `hashed_password`).
     """
-    hashed_password = get_password_hash(user.password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -36,8 +90,25 @@ def get_user(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).offset(skip).limit(limit).all()
+def get_users(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+):
+    """
+    Lista utilizadores, opcionalmente filtrados por role e estado.
+    Com role, a listagem é servida pelo índice (role, search_name), por nome.
+    """
+    query = db.query(User)
+    if role is not None:
+        query = query.filter(User.role == role).order_by(User.search_name, User.id)
+    else:
+        query = query.order_by(User.id)
+    if is_active is not None:
+        query = query.filter(User.is_active == is_active)
+    return query.offset(skip).limit(limit).all()
 
 
 def update_user(db: Session, db_user: User, user_in: Union[UserCreate, UserUpdate]):
@@ -60,9 +131,54 @@ def update_user(db: Session, db_user: User, user_in: Union[UserCreate, UserUpdat
     return db_user
 
 
+def update_password_hash(db: Session, db_user: User, hashed_password: str) -> User:
+    """Substitui a hash da password (ex: atualização do custo do Argon2 no login)."""
+    db_user.hashed_password = hashed_password
+    db.add(db_user)
+    db.commit()
+    return db_user
+
+
 def delete_user(db: Session, user_id: int):
     user = db.query(User).filter(User.id == user_id).first()
     if user:
         db.delete(user)
         db.commit()
     return user
+
+
+# Invalida caches dependentes dos utilizadores a cada escrita
+track_writes(User, "users")
+
+
+def _invalidate_identity(mapper, connection, target):
+    """
+    Invalida a cache de identidade a cada alteração/remoção de um utilizador
+    (incluindo o email anterior, se tiver mudado).
+
+    A invalidação é repetida depois do commit: um pedido entre o flush e o
+    commit podia voltar a guardar na cache os dados anteriores.
+    """
+    history = inspect(target).attrs.email.history
+    emails = (target.email, *(history.deleted or ()))
+    invalidate_user_identity(*emails)
+    run_after_commit(object_session(target), lambda: invalidate_user_identity(*emails))
+
+
+# Campos cuja alteração invalida os tokens de acesso já emitidos
+_PERMISSION_FIELDS = ("role", "is_superuser", "is_active")
+
+
+def _bump_token_version(mapper, connection, target):
+    """
+    Incrementa a versão dos tokens quando as permissões do utilizador mudam:
+    os tokens emitidos antes deixam de ser aceites (ver deps.get_verified_claims).
+    """
+    attrs = inspect(target).attrs
+    if any(attrs[field].history.has_changes() for field in _PERMISSION_FIELDS):
+        target.token_version = (target.token_version or 0) + 1
+
+
+event.listen(User, "before_update", _bump_token_version)
+event.listen(User, "after_update", _invalidate_identity)
+event.listen(User, "after_delete", _invalidate_identity)
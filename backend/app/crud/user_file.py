@@ -2,7 +2,7 @@
 CRUD para Ficheiro de Utilizador (UserFile)
 -------------------------------------------
 Operações de base de dados para a entidade UserFile.
-Nota: A lógica de upload/download de ficheiros físicos fica no router.
+Nota: A lógica dos ficheiros físicos fica em app.services.file_storage.
 """
 
 from typing import List, Optional
@@ -59,7 +59,9 @@ class CRUDUserFile(CRUDBase[UserFile, UserFileCreate, UserFileUpdate]):
         user_id: int,
         filename: str,
         file_path: str,
-        file_type: Optional[str] = None
+        file_type: Optional[str] = None,
+        size: Optional[int] = None,
+        checksum: Optional[str] = None
     ) -> UserFile:
         """
         Cria um registo de ficheiro para um utilizador.
@@ -69,6 +71,8 @@ class CRUDUserFile(CRUDBase[UserFile, UserFileCreate, UserFileUpdate]):
             filename=filename,
             file_path=file_path,
             file_type=file_type,
+            size=size,
+            checksum=checksum,
         )
         db.add(db_obj)
         db.commit()
@@ -0,0 +1,47 @@
+"""
+Ações Após Commit
+-----------------
+Os eventos de mapper do SQLAlchemy (after_insert/after_update/after_delete)
+disparam no flush, antes de a transação ser confirmada: usados diretamente,
+uma escrita que acaba em rollback já teria alterado caches e índices em
+memória.
+
+run_after_commit regista uma ação na sessão; as ações pendentes são
+executadas, por ordem, depois do commit e descartadas no rollback.
+"""
+
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Chave das ações pendentes em Session.info
+_PENDING_KEY = "after_commit_actions"
+
+
+def run_after_commit(session: Optional[Session], action: Callable[[], None]) -> None:
+    """
+    Executa `action` depois do próximo commit de `session` (nada acontece se
+    a transação for revertida). Sem sessão, a ação é executada de imediato.
+    """
+    if session is None:
+        action()
+        return
+    session.info.setdefault(_PENDING_KEY, []).append(action)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_pending_actions(session: Session) -> None:
+    for action in session.info.pop(_PENDING_KEY, []):
+        try:
+            action()
+        except Exception:
+            logger.exception("Erro numa ação após commit")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_actions(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,157 @@
+"""
+Atualização do Esquema da Base de Dados
+---------------------------------------
+O Base.metadata.create_all cria as tabelas em falta, mas não altera tabelas
+que já existem. Este módulo acrescenta às tabelas existentes as colunas e
+índices adicionados depois da sua criação e converte os dados antigos.
+
+Todos os passos são idempotentes: verificam o estado atual antes de alterar
+alguma coisa, pelo que upgrade_schema pode (e deve) correr em cada arranque,
+depois do create_all.
+"""
+
+import logging
+from typing import Callable, List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.text import normalize_text
+from app.db.base import Base
+from app.models.user import UserRole
+
+logger = logging.getLogger(__name__)
+
+# Colunas acrescentadas a tabelas existentes: (tabela, coluna, definição SQL)
+ADDED_COLUMNS: List[Tuple[str, str, str]] = [
+    ("enrollments", "dropped_at", "DATE"),
+    ("users", "search_name", "VARCHAR"),
+    ("courses", "search_name", "VARCHAR"),
+    ("users", "token_version", "INTEGER NOT NULL DEFAULT 0"),
+    ("user_files", "size", "INTEGER"),
+    ("user_files", "checksum", "VARCHAR(64)"),
+]
+
+
+def _backfill_search_names(conn: Connection) -> None:
+    """
+    Preenche a coluna search_name de registos antigos (criados antes de existir).
+    A normalização é feita em Python (o SQLite não remove acentos).
+    """
+    for table, source_column in (("users", "full_name"), ("courses", "name")):
+        rows = conn.execute(
+            text(f"SELECT id, {source_column} FROM {table} WHERE search_name IS NULL")
+        ).all()
+        if rows:
+            conn.execute(
+                text(f"UPDATE {table} SET search_name = :search_name WHERE id = :id"),
+                [{"id": row[0], "search_name": normalize_text(row[1])} for row in rows],
+            )
+
+
+# Valores antigos de users.role (texto livre) com equivalente em UserRole
+_ROLE_ALIASES = {
+    "aluno": UserRole.estudante,
+    "formando": UserRole.estudante,
+    "student": UserRole.estudante,
+    "formador": UserRole.professor,
+    "trainer": UserRole.professor,
+    "teacher": UserRole.professor,
+    "secretary": UserRole.secretaria,
+    "administrador": UserRole.admin,
+    "administrator": UserRole.admin,
+}
+
+
+def _normalize_roles(conn: Connection) -> None:
+    """
+    Converte roles antigas (texto livre, ex: 'Professor', 'aluno') para os
+    valores de UserRole. Valores sem equivalente passam a 'estudante' (a role
+    com menos permissões), com um aviso no log.
+    """
+    valid = {role.value for role in UserRole}
+    rows = conn.execute(
+        text("SELECT id, role FROM users WHERE role IS NOT NULL")
+    ).all()
+    for user_id, role in rows:
+        if role in valid:
+            continue
+        key = normalize_text(role)
+        new_role = UserRole(key) if key in valid else _ROLE_ALIASES.get(key)
+        if new_role is None:
+            new_role = UserRole.estudante
+            logger.warning(
+                f"Utilizador {user_id}: role desconhecida '{role}', "
+                f"convertida para '{new_role.value}'"
+            )
+        conn.execute(
+            text("UPDATE users SET role = :role WHERE id = :id"),
+            {"id": user_id, "role": new_role.value},
+        )
+
+
+def _constrain_roles(conn: Connection) -> None:
+    """
+    Tabelas criadas antes do Enum(create_constraint=True) não têm o CHECK da
+    role (o SQLite não permite acrescentá-lo): triggers com a mesma regra.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    allowed = ", ".join(f"'{role.value}'" for role in UserRole)
+    for operation in ("INSERT", "UPDATE OF role"):
+        suffix = operation.split()[0].lower()
+        conn.execute(text(f"DROP TRIGGER IF EXISTS users_role_check_{suffix}"))
+        conn.execute(
+            text(
+                f"CREATE TRIGGER users_role_check_{suffix} "
+                f"BEFORE {operation} ON users "
+                f"WHEN NEW.role IS NOT NULL AND NEW.role NOT IN ({allowed}) "
+                f"BEGIN SELECT RAISE(ABORT, 'Role inválida'); END"
+            )
+        )
+
+
+# Passos de conversão de dados, executados depois de acrescentar as colunas
+DATA_STEPS: List[Callable[[Connection], None]] = [
+    _backfill_search_names,
+    _normalize_roles,
+    _constrain_roles,
+]
+
+
+def _add_missing_columns(conn: Connection) -> None:
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    for table, column, definition in ADDED_COLUMNS:
+        if table not in tables:
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table)}
+        if column not in existing:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+            logger.info(f"Coluna {table}.{column} adicionada")
+
+
+def _create_missing_indexes(conn: Connection) -> None:
+    """Cria os índices dos modelos em falta (ex: ix_users_role_search_name)."""
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            # Índices sobre colunas que (ainda) não existem ficam de fora
+            if {column.name for column in index.columns} <= existing:
+                index.create(conn, checkfirst=True)
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """
+    Acrescenta as colunas e índices em falta e executa os passos de conversão
+    de dados, numa única transação. Chamado no arranque, depois do create_all.
+    """
+    with engine.begin() as conn:
+        _add_missing_columns(conn)
+        _create_missing_indexes(conn)
+        for step in DATA_STEPS:
+            step(conn)
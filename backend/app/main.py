@@ -2,9 +2,11 @@ from contextlib import asynccontextmanager
 import asyncio
 import logging
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from app.db.base import Base
 from app.db.session import engine, SessionLocal
+from app.db.upgrade import upgrade_schema
 from app import (
     models,
 )  # Importar todos os modelos para garantir que são criados (via __init__.py)
@@ -24,9 +26,10 @@ from app.routers import (
     lessons,
     search,
     chatbot,
+    exports,
 )
 
-from fastapi.staticfiles import StaticFiles
+from app.core.downloads import UploadsStaticFiles
 import os
 
 from fastapi.middleware.cors import CORSMiddleware
@@ -34,10 +37,26 @@ from starlette.middleware.sessions import SessionMiddleware
 from app.core.config import settings
 
 # Serviço de atualização automática de status dos cursos
-from app.services.course_status_updater import (
-    update_course_statuses,
-    course_status_scheduler,
-)
+from app.services.course_status_updater import update_course_statuses
+
+# Scheduler em background (status dos cursos + snapshots do Dashboard)
+from app.services.scheduler import background_scheduler
+
+# Índice de pesquisa full-text
+from app.services.search_index import ensure_search_index
+
+# Índice de autocomplete em memória
+from app.services.autocomplete import load_autocomplete_index
+
+# Refresh tokens revogados (teste de revogação em memória)
+from app.crud.refresh_token import load_revoked_tokens
+
+# Worker da caixa de saída de email
+from app.services.email_outbox import email_outbox_worker
+from app.core.email_templates import load_email_templates
+
+# Limite de tamanho dos uploads
+from app.services import file_storage
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -47,13 +66,23 @@ logger = logging.getLogger(__name__)
 # Em produção, usaremos Alembic para migrações, mas aqui o create_all serve
 Base.metadata.create_all(bind=engine)
 
+# Acrescenta às tabelas existentes as colunas adicionadas depois da sua criação
+upgrade_schema(engine)
+
+# Índice de pesquisa full-text (SQLite FTS5) mantido por triggers
+ensure_search_index(engine)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Lifespan context manager para inicialização e limpeza da aplicação.
-    - Startup: Atualiza status dos cursos e inicia scheduler
-    - Shutdown: Cancela o scheduler
+    - Startup: Atualiza status dos cursos, carrega o índice de autocomplete
+      e os refresh tokens revogados, compila os templates de email e inicia
+      scheduler
+      (status dos cursos a cada ciclo + snapshots noturnos do Dashboard)
+      e o worker de envio de emails (caixa de saída)
+    - Shutdown: Cancela o scheduler e o worker de emails
     """
     # === STARTUP ===
     logger.info("A iniciar aplicação...")
@@ -67,21 +96,34 @@ async def lifespan(app: FastAPI):
                 f"Status de cursos atualizado no startup: "
                 f"{result['to_active']} -> active, {result['to_finished']} -> finished"
             )
+
+        # Carregar nomes de utilizadores e cursos para o autocomplete
+        load_autocomplete_index(db)
+
+        # Carregar refresh tokens revogados (e limpar os expirados)
+        load_revoked_tokens(db)
+
+        # Compilar os templates de email (uma única vez)
+        load_email_templates()
     finally:
         db.close()
 
     # Iniciar scheduler em background (verifica a cada 60 minutos)
-    scheduler_task = asyncio.create_task(course_status_scheduler(interval_minutes=60))
+    scheduler_task = asyncio.create_task(background_scheduler(interval_minutes=60))
+
+    # Iniciar worker de envio de emails (caixa de saída)
+    email_task = asyncio.create_task(email_outbox_worker())
 
     yield  # Aplicação a correr
 
     # === SHUTDOWN ===
     logger.info("A encerrar aplicação...")
-    scheduler_task.cancel()
-    try:
-        await scheduler_task
-    except asyncio.CancelledError:
-        pass
+    for task in (scheduler_task, email_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
 
 
 app = FastAPI(
@@ -112,6 +154,32 @@ app.add_middleware(
 )
 
 
+# Multipart (uploads) maior do que o limite -> 413 antes de ler o corpo do pedido
+# (margem de 1 MB para os cabeçalhos e restantes campos do formulário)
+MAX_MULTIPART_SIZE = settings.MAX_UPLOAD_SIZE + 1024 * 1024
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """
+    Recusa uploads cujo Content-Length excede o limite, sem os receber.
+    O limite também é verificado durante a cópia (ver services/file_storage).
+    """
+    content_type = request.headers.get("content-type", "")
+    content_length = request.headers.get("content-length")
+    if (
+        content_type.startswith("multipart/form-data")
+        and content_length
+        and content_length.isdigit()
+        and int(content_length) > MAX_MULTIPART_SIZE
+    ):
+        return JSONResponse(
+            status_code=413,
+            content={"detail": file_storage.upload_too_large().detail},
+        )
+    return await call_next(request)
+
+
 @app.get("/")
 def read_root():
     """
@@ -137,8 +205,10 @@ app.include_router(user_files.router, prefix="/users", tags=["user_files"])
 app.include_router(lessons.router, prefix="/lessons", tags=["lessons"])
 app.include_router(search.router, prefix="/search", tags=["search"])
 app.include_router(chatbot.router, prefix="/chatbot", tags=["chatbot"])
+app.include_router(exports.router, prefix="/exports", tags=["exports"])
 
 # Montar pasta de uploads como estática (backend/uploads/)
 uploads_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads")
 os.makedirs(uploads_path, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=uploads_path), name="uploads")
+# (com Range e respostas 304, ver app.core.downloads)
+app.mount("/uploads", UploadsStaticFiles(directory=uploads_path), name="uploads")
@@ -9,3 +9,8 @@ from .user_files import UserFile
 from .trainer_availability import TrainerAvailability
 from .module_grade import ModuleGrade
 from .chat_log import ChatLog
+from .dashboard_snapshot import DashboardSnapshot
+from .refresh_token import RefreshToken
+from .rate_limit_hit import RateLimitHit
+from .email_outbox import EmailOutbox
+from .file_blob import FileBlob
@@ -11,7 +11,8 @@ Funcionalidades:
 """
 
 from sqlalchemy import Column, Integer, String, Date, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
+from app.core.text import normalize_text
 from app.db.base import Base
 import enum
 
@@ -33,6 +34,11 @@ class Course(Base):
     # Identificação
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False, doc="Nome da edição do curso")
+    search_name = Column(
+        String,
+        nullable=True,
+        doc="Nome normalizado para pesquisa (sem acentos, minúsculas)",
+    )
     description = Column(
         String, nullable=True, doc="Descrição detalhada ou observações"
     )
@@ -49,6 +55,12 @@ class Course(Base):
         Enum(CourseStatus), default=CourseStatus.planned, doc="Estado atual do curso"
     )
 
+    @validates("name")
+    def _update_search_name(self, key, value):
+        """Mantém a chave de pesquisa sincronizada com o nome."""
+        self.search_name = normalize_text(value)
+        return value
+
     # RELACIONAMENTOS
 
     # 1. Módulos do curso (tabela de ligação CourseModule)
@@ -0,0 +1,36 @@
+"""
+Modelo de Snapshot do Dashboard (DashboardSnapshot)
+---------------------------------------------------
+Guarda o resultado pré-calculado dos agregados mais pesados do Dashboard
+(horas por professor, cursos por área, cursos a iniciar, ocupação de salas).
+
+Os snapshots são materializados todas as noites pelo scheduler em background,
+pelo que durante o dia a leitura do Dashboard é uma simples consulta.
+
+Funcionalidades:
+- Um registo por painel (substituído em cada cálculo).
+- Dados em JSON, prontos a devolver ao frontend.
+- Data/hora do cálculo (permite mostrar a "idade" dos dados).
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from app.db.base import Base
+
+
+class DashboardSnapshot(Base):
+
+    __tablename__ = "dashboard_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    panel = Column(
+        String,
+        unique=True,
+        index=True,
+        nullable=False,
+        doc="Identificador do painel (ex: 'top_trainers')",
+    )
+    data = Column(JSON, nullable=False, doc="Resultado do agregado (JSON)")
+    computed_at = Column(
+        DateTime, nullable=False, doc="Data/hora em que o agregado foi calculado"
+    )
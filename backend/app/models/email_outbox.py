@@ -0,0 +1,58 @@
+"""
+Modelo da Caixa de Saída de Email (EmailOutbox)
+-----------------------------------------------
+Emails a enviar, guardados na base de dados antes do envio: um reinício do
+processo ou uma falha do servidor SMTP não faz perder mensagens.
+
+O envio é feito pelo worker em background (app.services.email_outbox), em
+lotes e numa única ligação SMTP, com novas tentativas e backoff exponencial.
+
+Funcionalidades:
+- Estado de cada email (pendente, a enviar, enviado, falhado).
+- Nº de tentativas, próxima tentativa e último erro.
+- Reserva ("claim") dos emails pelo worker (vários processos não enviam o mesmo).
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+import enum
+
+
+class EmailStatus(str, enum.Enum):
+    pending = "pending"  # À espera de envio (ou de nova tentativa)
+    sending = "sending"  # Reservado por um worker
+    sent = "sent"  # Enviado
+    failed = "failed"  # Desistência (erro permanente ou tentativas esgotadas)
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Próximos emails a enviar
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Mensagem
+    recipient = Column(String, nullable=False, doc="Email do destinatário")
+    subject = Column(String, nullable=False, doc="Assunto")
+    body = Column(Text, nullable=False, doc="Corpo da mensagem (HTML)")
+
+    # Estado do envio
+    status = Column(
+        Enum(EmailStatus), default=EmailStatus.pending, nullable=False, doc="Estado"
+    )
+    attempts = Column(Integer, default=0, nullable=False, doc="Nº de tentativas")
+    next_attempt_at = Column(
+        DateTime, default=func.now(), nullable=False, doc="Data da próxima tentativa"
+    )
+    last_error = Column(Text, nullable=True, doc="Último erro de envio")
+    claim_token = Column(
+        String, nullable=True, index=True, doc="Reserva do worker que está a enviar"
+    )
+    claimed_at = Column(DateTime, nullable=True, doc="Data da reserva")
+
+    created_at = Column(DateTime, default=func.now(), doc="Data de criação")
+    sent_at = Column(DateTime, nullable=True, doc="Data de envio")
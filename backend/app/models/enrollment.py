@@ -5,7 +5,7 @@ Representa a matrícula de um aluno numa edição específica de um curso.
 Gere o ciclo de vida do aluno no curso (Ativo -> Concluído/Desistente).
 
 Funcionalidades:
-- Estado da matrícula.
+- Estado da matrícula (e data de desistência).
 - Nota final global.
 - Ligação ao Certificado final.
 """
@@ -43,6 +43,9 @@ class Enrollment(Base):
     status = Column(
         Enum(EnrollmentStatus), default=EnrollmentStatus.active, doc="Estado atual"
     )
+    dropped_at = Column(
+        Date, nullable=True, doc="Data da desistência (apenas se status='dropped')"
+    )
 
     # Avaliação Final
     final_grade = Column(Integer, nullable=True, doc="Nota final do curso (0-20)")
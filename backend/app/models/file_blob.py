@@ -0,0 +1,39 @@
+"""
+Modelo de Conteúdo de Ficheiro (FileBlob)
+-----------------------------------------
+Armazenamento endereçado por conteúdo dos uploads: cada conteúdo distinto é
+guardado uma única vez em uploads/blobs/<2 primeiros carateres>/<sha256>,
+independentemente de quantos utilizadores/ficheiros o referenciam.
+
+Funcionalidades:
+- Checksum SHA-256 como identificador (chave primária).
+- Contagem de referências (nº de UserFile que apontam para o conteúdo):
+  o ficheiro físico só é apagado quando a última referência é removida.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class FileBlob(Base):
+
+    __tablename__ = "file_blobs"
+
+    checksum = Column(
+        String(64), primary_key=True, doc="Checksum SHA-256 (hex) do conteúdo"
+    )
+    size = Column(Integer, nullable=False, doc="Tamanho em bytes")
+    file_path = Column(
+        String, nullable=False, doc="Caminho relativo (ex: 'uploads/blobs/ab/ab12...')"
+    )
+    ref_count = Column(
+        Integer, default=0, nullable=False, doc="Nº de ficheiros que usam este conteúdo"
+    )
+    created_at = Column(DateTime, default=func.now(), doc="Data do primeiro upload")
+
+    # RELACIONAMENTOS
+
+    # 1. Ficheiros de utilizadores com este conteúdo
+    files = relationship("UserFile", back_populates="blob")
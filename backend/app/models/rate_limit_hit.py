@@ -0,0 +1,31 @@
+"""
+Modelo de Tentativa Limitada (RateLimitHit)
+-------------------------------------------
+Registo das tentativas aceites pelo limitador de pedidos (rate limiting) quando
+é usada a base de dados como armazenamento partilhado entre processos
+(RATE_LIMIT_BACKEND=database). Ver app.core.rate_limit.
+
+Funcionalidades:
+- Uma linha por tentativa (chave + instante).
+- Linhas fora da janela deslizante são apagadas automaticamente.
+"""
+
+from sqlalchemy import Column, Integer, String, Float
+from app.db.base import Base
+
+
+class RateLimitHit(Base):
+
+    __tablename__ = "rate_limit_hits"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    key = Column(
+        String,
+        index=True,
+        nullable=False,
+        doc="Chave limitada (ex: 'login:email:joao@atec.pt')",
+    )
+    created_at = Column(
+        Float, index=True, nullable=False, doc="Instante da tentativa (epoch, segundos)"
+    )
@@ -0,0 +1,48 @@
+"""
+Modelo de Refresh Token (RefreshToken)
+--------------------------------------
+Tokens de longa duração que permitem renovar o token de acesso (JWT) sem
+voltar a pedir a password.
+
+Funcionalidades:
+- Apenas o hash SHA-256 do token é guardado (o token nunca fica na BD).
+- Rotação: cada renovação revoga o token usado e emite um novo da mesma família.
+- Deteção de reutilização: usar um token já revogado revoga toda a família.
+"""
+
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id"), nullable=False, index=True, doc="Dono do token"
+    )
+
+    token_hash = Column(
+        String(64),
+        unique=True,
+        index=True,
+        nullable=False,
+        doc="Hash SHA-256 (hex) do token",
+    )
+    family_id = Column(
+        String,
+        index=True,
+        nullable=False,
+        doc="Família de rotação (todos os tokens que descendem do mesmo login)",
+    )
+
+    expires_at = Column(DateTime, nullable=False, doc="Data de expiração")
+    revoked = Column(Boolean, default=False, nullable=False, doc="Token revogado")
+    created_at = Column(DateTime, default=func.now(), doc="Data de emissão")
+
+    # RELACIONAMENTOS
+
+    # 1. Utilizador proprietário
+    user = relationship("User")
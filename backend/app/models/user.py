@@ -11,14 +11,27 @@ Funcionalidades principais:
 - Perfil (Nome, Avatar, Telemóvel)
 """
 
-from sqlalchemy import Boolean, Column, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Enum, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
+from app.core.text import normalize_text
 from app.db.base import Base
+import enum
+
+
+class UserRole(str, enum.Enum):
+    estudante = "estudante"  # Aluno
+    professor = "professor"  # Formador
+    secretaria = "secretaria"  # Funcionário da secretaria
+    admin = "admin"  # Administrador
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Listagens/pesquisas filtradas por role e ordenadas por nome
+        Index("ix_users_role_search_name", "role", "search_name"),
+    )
 
     # Chave Primária
     id = Column(Integer, primary_key=True, index=True)
@@ -35,6 +48,11 @@ class User(Base):
 
     # Informações Pessoais
     full_name = Column(String, nullable=True, doc="Nome completo do utilizador")
+    search_name = Column(
+        String,
+        nullable=True,
+        doc="Nome normalizado para pesquisa (sem acentos, minúsculas)",
+    )
     phone_number = Column(
         String, nullable=True, doc="Número de telemóvel para contacto rápido"
     )
@@ -57,10 +75,17 @@ class User(Base):
         doc="Se True, tem acesso total ao sistema (Admin supremo)",
     )
     role = Column(
-        String,
-        default="estudante",
+        # CHECK na base de dados + validação de strings ao gravar
+        Enum(UserRole, create_constraint=True, validate_strings=True),
+        default=UserRole.estudante,
         doc="Papel do utilizador: 'estudante', 'professor', 'secretaria', 'admin'",
     )
+    token_version = Column(
+        Integer,
+        default=0,
+        nullable=False,
+        doc="Versão dos tokens de acesso (incrementa quando as permissões mudam)",
+    )
 
     # Social Login (Google, Facebook, etc.)
     auth_provider = Column(
@@ -88,6 +113,12 @@ class User(Base):
         DateTime, default=func.now(), doc="Data de registo do utilizador"
     )
 
+    @validates("full_name")
+    def _update_search_name(self, key, value):
+        """Mantém a chave de pesquisa sincronizada com o nome."""
+        self.search_name = normalize_text(value)
+        return value
+
     # RELACIONAMENTOS (Ligações com outras tabelas)
 
     # 1. Ficheiros anexados ao utilizador (CVs, Fichas de inscrição, etc.)
@@ -5,8 +5,8 @@ Permite associar ficheiros arbitrários a um utilizador.
 Útil para guardar Curriculums, Fichas de Inscrição, Fotos, Comprovativos, etc.
 
 Funcionalidades:
-- Registo do caminho físico do ficheiro.
-- Metadados (tipo, nome original).
+- Registo do caminho físico do ficheiro (conteúdo deduplicado, ver FileBlob).
+- Metadados (tipo, nome original, tamanho, checksum SHA-256).
 """
 
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
@@ -34,6 +34,14 @@ class UserFile(Base):
     file_type = Column(
         String, nullable=True, doc="Extensão ou tipo MIME (ex: 'pdf', 'image/png')"
     )
+    size = Column(Integer, nullable=True, doc="Tamanho do ficheiro em bytes")
+    checksum = Column(
+        String(64),
+        ForeignKey("file_blobs.checksum"),
+        nullable=True,
+        index=True,
+        doc="Checksum SHA-256 (hex) do conteúdo (conteúdo guardado em FileBlob)",
+    )
 
     uploaded_at = Column(DateTime, default=func.now(), doc="Data de upload")
 
@@ -41,3 +49,6 @@ class UserFile(Base):
 
     # 1. Utilizador proprietário
     user = relationship("User", back_populates="files")
+
+    # 2. Conteúdo (partilhado por todos os ficheiros com o mesmo checksum)
+    blob = relationship("FileBlob", back_populates="files")
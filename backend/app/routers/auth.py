@@ -1,20 +1,41 @@
 from datetime import timedelta
+from urllib.parse import urlencode
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request
 from fastapi.responses import RedirectResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.concurrency import run_in_threadpool
 from authlib.integrations.starlette_client import OAuth
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from app.core import security, email
+from app.core.rate_limit import check_rate_limit, record_attempt
 from app.core.config import settings
 from app.api import deps
 from app.schemas import user as user_schema, token as token_schema
-from app.crud import user as user_crud
+from app.crud import user as user_crud, refresh_token as refresh_token_crud
 from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _issue_tokens(db: Session, user, family_id: str = None) -> dict:
+    """
+    Cria o token de acesso (JWT) e um refresh token para o utilizador.
+    """
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = security.create_user_access_token(
+        user, expires_delta=access_token_expires
+    )
+    refresh_token = refresh_token_crud.create_refresh_token(
+        db, user, family_id=family_id
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
 @router.post("/register", response_model=user_schema.User)
 async def register_user(
     user_in: user_schema.UserCreate,
@@ -25,14 +46,20 @@ async def register_user(
     Registo de novo utilizador. Envia email de verificação.
     """
     # Verificar se email existe
-    user = user_crud.get_user_by_email(db, email=user_in.email)
+    # (acessos à BD numa thread: num endpoint async bloqueariam o event loop)
+    user = await run_in_threadpool(
+        user_crud.get_user_by_email, db, email=user_in.email
+    )
     if user:
         raise HTTPException(
             status_code=400, detail="Este email já se encontra registado."
         )
 
-    # Criar utilizador
-    user = user_crud.create_user(db, user=user_in)
+    # Criar utilizador (hash da password numa thread, fora do event loop)
+    hashed_password = await security.get_password_hash_async(user_in.password)
+    user = await run_in_threadpool(
+        user_crud.create_user, db, user=user_in, hashed_password=hashed_password
+    )
 
     # Gerar token de verificação (válido por 24h)
     verification_token = security.create_access_token(
@@ -84,6 +111,7 @@ def verify_email(token: str, db: Session = Depends(deps.get_db)):
 
 @router.post("/login", response_model=token_schema.Token)
 async def login_for_access_token(
+    request: Request,
     background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(deps.get_db),
@@ -91,17 +119,30 @@ async def login_for_access_token(
     """
     Login para obter token de acesso (OAuth2).
     """
-    # Autenticar utilizador
-    user = user_crud.get_user_by_email(db, email=form_data.username)
-    if not user or not security.verify_password(
-        form_data.password, user.hashed_password
-    ):
+    # Limitar tentativas (por IP e email) antes de qualquer verificação Argon2
+    await run_in_threadpool(check_rate_limit, "login", request, form_data.username)
+
+    # Autenticar utilizador (BD e verificação Argon2 em threads, fora do event loop)
+    user = await run_in_threadpool(
+        user_crud.get_user_by_email, db, email=form_data.username
+    )
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await security.verify_and_update_password_async(
+            form_data.password, user.hashed_password
+        )
+    if not valid:
+        await run_in_threadpool(record_attempt, "login", request, form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou password incorretos",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Hash gerada com outro perfil de custo do Argon2: guardar a nova
+    if new_hash:
+        await run_in_threadpool(user_crud.update_password_hash, db, user, new_hash)
+
     # Verificar 2FA
     if user.is_2fa_enabled:
         # Gerar código de 6 dígitos
@@ -134,12 +175,8 @@ async def login_for_access_token(
             },
         )
 
-    # Criar Token JWT (Login normal)
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        subject=user.email, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    # Criar Token JWT + refresh token (Login normal)
+    return await run_in_threadpool(_issue_tokens, db, user)
 
 
 class Login2FARequest(user_schema.BaseModel):
@@ -148,23 +185,31 @@ class Login2FARequest(user_schema.BaseModel):
 
 
 @router.post("/login/2fa", response_model=token_schema.Token)
-def login_2fa(data: Login2FARequest, db: Session = Depends(deps.get_db)):
+def login_2fa(
+    data: Login2FARequest, request: Request, db: Session = Depends(deps.get_db)
+):
     """
     Valida código 2FA e retorna token.
     """
+    # Limitar tentativas (impede adivinhar o código por força bruta)
+    check_rate_limit("login-2fa", request, data.email)
+
     user = user_crud.get_user_by_email(db, email=data.email)
     if not user:
+        record_attempt("login-2fa", request, data.email)
         raise HTTPException(status_code=404, detail="Utilizador não encontrado")
 
     # Verificar validade do código
     from datetime import datetime
 
     if not user.otp_code or user.otp_code != data.code:
+        record_attempt("login-2fa", request, data.email)
         raise HTTPException(status_code=400, detail="Código inválido")
 
     if not user.otp_expires_at or datetime.utcnow() > datetime.fromisoformat(
         user.otp_expires_at
     ):
+        record_attempt("login-2fa", request, data.email)
         raise HTTPException(status_code=400, detail="Código expirado")
 
     # Limpar código usado
@@ -173,12 +218,47 @@ def login_2fa(data: Login2FARequest, db: Session = Depends(deps.get_db)):
     db.add(user)
     db.commit()
 
-    # Criar Token JWT
+    # Criar Token JWT + refresh token
+    return _issue_tokens(db, user)
+
+
+@router.post("/refresh", response_model=token_schema.Token)
+def refresh_access_token(
+    data: token_schema.RefreshRequest, db: Session = Depends(deps.get_db)
+):
+    """
+    Renova o token de acesso com um refresh token (sem password).
+    O refresh token usado é revogado e substituído por um novo (rotação).
+    """
+    result = refresh_token_crud.rotate_refresh_token(db, data.refresh_token)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Sessão expirada. Inicia sessão novamente.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, refresh_token = result
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        subject=user.email, expires_delta=access_token_expires
+    access_token = security.create_user_access_token(
+        user, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/logout")
+def logout(data: token_schema.RefreshRequest, db: Session = Depends(deps.get_db)):
+    """
+    Termina a sessão: revoga o refresh token (e toda a sua família).
+    """
+    family_id = refresh_token_crud.get_family(db, data.refresh_token)
+    if family_id:
+        refresh_token_crud.revoke_family(db, family_id)
+    return {"message": "Sessão terminada."}
 
 
 @router.get("/me", response_model=user_schema.User)
@@ -201,12 +281,22 @@ class PasswordResetConfirm(user_schema.BaseModel):
 @router.post("/forgot-password")
 async def forgot_password(
     request: PasswordResetRequest,
+    http_request: Request,
     background_tasks: BackgroundTasks,
     db: Session = Depends(deps.get_db),
 ):
     """
     Envia email com token para redefinir password.
     """
+    # Limitar pedidos (por IP e email) antes de gerar tokens ou enviar emails
+    await run_in_threadpool(
+        check_rate_limit, "forgot-password", http_request, request.email
+    )
+    # Cada pedido aceite envia um email: conta para o limite por email
+    await run_in_threadpool(
+        record_attempt, "forgot-password", http_request, request.email
+    )
+
     user = user_crud.get_user_by_email(db, email=request.email)
     if user:
         # Gerar token válido por 1 hora
@@ -253,6 +343,9 @@ def reset_password(data: PasswordResetConfirm, db: Session = Depends(deps.get_db
     db.add(user)
     db.commit()
 
+    # Terminar as sessões abertas com a password antiga
+    refresh_token_crud.revoke_user_tokens(db, user.id)
+
     return {"message": "Password alterada com sucesso."}
 
 
@@ -306,7 +399,7 @@ async def auth_google_callback(request: Request, db: Session = Depends(deps.get_
         user_in = user_schema.UserCreate(
             email=email,
             full_name=name,
-            password=security.get_password_hash(
+            password=await security.get_password_hash_async(
                 "GOOGLE_OAUTH_RANDOM_" + security.create_access_token(email)
             ),  # Senha aleatória
             role="estudante",  # Default role
@@ -326,14 +419,15 @@ async def auth_google_callback(request: Request, db: Session = Depends(deps.get_
         db.commit()
         db.refresh(user)
 
-    # Gerar Token JWT
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        subject=user.email, expires_delta=access_token_expires
-    )
+    # Gerar Token JWT + refresh token
+    tokens = await run_in_threadpool(_issue_tokens, db, user)
 
-    # Redirecionar para o Frontend com o token na URL
-    # O Frontend vai ler o token da URL e guardar no LocalStorage
+    # Redirecionar para o Frontend com os tokens no fragmento da URL (#...):
+    # o fragmento não é enviado ao servidor nem no Referer, pelo que os tokens
+    # não ficam em logs de acesso/proxies. O Frontend lê-os e guarda-os.
+    fragment = urlencode(
+        {"token": tokens["access_token"], "refresh_token": tokens["refresh_token"]}
+    )
     return RedirectResponse(
-        url=f"http://localhost:5173/social-callback?token={access_token}"
+        url=f"{settings.FRONTEND_URL.rstrip('/')}/social-callback#{fragment}"
     )
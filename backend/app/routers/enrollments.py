@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.api import deps
 from app.schemas import Enrollment, EnrollmentCreate, EnrollmentUpdate
 from app.models.user import User
+from app.schemas.token import TokenData
 from app.crud import enrollment as enrollment_crud
 
 router = APIRouter()
@@ -36,7 +37,7 @@ def read_enrollments(
 def create_enrollment(
     enrollment_in: EnrollmentCreate,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Inscreve um aluno num curso. (Admin Only)
@@ -58,7 +59,7 @@ def update_enrollment(
     enrollment_id: int,
     enrollment_in: EnrollmentUpdate,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Atualiza estado ou nota final de uma inscrição.
@@ -74,7 +75,7 @@ def update_enrollment(
 def delete_enrollment(
     enrollment_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Remove uma inscrição (Cuidado: apaga histórico).
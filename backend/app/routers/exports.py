@@ -0,0 +1,299 @@
+"""
+Router de Exportação de Dados
+-----------------------------
+Exporta tabelas completas em CSV (Admin e Secretaria), sem paginação.
+
+As linhas são lidas da base de dados com um cursor do lado do servidor
+(stream_results + yield_per) e enviadas ao cliente em blocos, pelo que a
+memória usada é constante, independentemente do tamanho da tabela.
+"""
+
+import csv
+import io
+from datetime import date
+from typing import Any, Callable, Iterator, List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.crud import module_grade as module_grade_crud
+from app.db.session import SessionLocal
+from app.models.course import Course as CourseModel
+from app.models.course_module import CourseModule as CourseModuleModel
+from app.models.enrollment import Enrollment as EnrollmentModel
+from app.models.module import Module as ModuleModel
+from app.models.module_grade import ModuleGrade as ModuleGradeModel
+from app.models.user import User as UserModel
+from app.services.grade_statistics import PERCENTILES, build_grade_report
+
+router = APIRouter()
+
+# Nº de linhas lidas do cursor de cada vez / escritas por bloco
+CHUNK_SIZE = 1000
+
+
+def _format_value(value: Any) -> Any:
+    """Converte valores para a sua representação em CSV."""
+    if value is None:
+        return ""
+    if hasattr(value, "value"):  # Enums
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(
+    header: List[str], build_query: Callable[[Session], Any]
+) -> Iterator[str]:
+    """
+    Gera o CSV em blocos a partir de uma query.
+
+    A sessão é aberta aqui (e não via Depends) porque a resposta continua a ser
+    enviada depois de o endpoint retornar.
+    """
+    db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        # BOM para o Excel reconhecer UTF-8 (acentos)
+        buffer.write("\ufeff")
+        writer.writerow(header)
+
+        query = build_query(db).execution_options(stream_results=True)
+        for i, row in enumerate(query.yield_per(CHUNK_SIZE), start=1):
+            writer.writerow([_format_value(v) for v in row])
+            if i % CHUNK_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+def csv_response(
+    filename: str, header: List[str], build_query: Callable[[Session], Any]
+) -> StreamingResponse:
+    """Cria a resposta em streaming com o CSV como anexo."""
+    return StreamingResponse(
+        stream_csv(header, build_query),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/users.csv")
+def export_users(
+    role: Optional[str] = Query(None, description="Filtrar por role"),
+    current_user: Any = Depends(deps.get_current_admin_or_secretaria),
+):
+    """
+    Exporta todos os utilizadores (sem passwords).
+    """
+
+    def build_query(db: Session):
+        query = db.query(
+            UserModel.id,
+            UserModel.email,
+            UserModel.full_name,
+            UserModel.phone_number,
+            UserModel.role,
+            UserModel.is_active,
+            UserModel.is_superuser,
+            UserModel.auth_provider,
+            UserModel.created_at,
+        )
+        if role:
+            query = query.filter(UserModel.role == role)
+        return query.order_by(UserModel.id)
+
+    return csv_response(
+        "utilizadores.csv",
+        [
+            "id",
+            "email",
+            "full_name",
+            "phone_number",
+            "role",
+            "is_active",
+            "is_superuser",
+            "auth_provider",
+            "created_at",
+        ],
+        build_query,
+    )
+
+
+@router.get("/enrollments.csv")
+def export_enrollments(
+    course_id: Optional[int] = Query(None, description="Filtrar por curso"),
+    current_user: Any = Depends(deps.get_current_admin_or_secretaria),
+):
+    """
+    Exporta todas as inscrições, com os dados do aluno e do curso.
+    """
+
+    def build_query(db: Session):
+        query = (
+            db.query(
+                EnrollmentModel.id,
+                EnrollmentModel.user_id,
+                UserModel.email,
+                UserModel.full_name,
+                EnrollmentModel.course_id,
+                CourseModel.name,
+                CourseModel.area,
+                EnrollmentModel.enrollment_date,
+                EnrollmentModel.status,
+                EnrollmentModel.final_grade,
+            )
+            .join(UserModel, EnrollmentModel.user_id == UserModel.id)
+            .join(CourseModel, EnrollmentModel.course_id == CourseModel.id)
+        )
+        if course_id:
+            query = query.filter(EnrollmentModel.course_id == course_id)
+        return query.order_by(EnrollmentModel.id)
+
+    return csv_response(
+        "inscricoes.csv",
+        [
+            "id",
+            "user_id",
+            "email",
+            "full_name",
+            "course_id",
+            "course_name",
+            "area",
+            "enrollment_date",
+            "status",
+            "final_grade",
+        ],
+        build_query,
+    )
+
+
+@router.get("/module_grades.csv")
+def export_module_grades(
+    course_id: Optional[int] = Query(None, description="Filtrar por curso"),
+    current_user: Any = Depends(deps.get_current_admin_or_secretaria),
+):
+    """
+    Exporta o histórico completo de notas por módulo.
+    """
+
+    def build_query(db: Session):
+        query = (
+            db.query(
+                ModuleGradeModel.id,
+                ModuleGradeModel.enrollment_id,
+                UserModel.email,
+                UserModel.full_name,
+                CourseModel.id,
+                CourseModel.name,
+                ModuleGradeModel.course_module_id,
+                ModuleModel.name,
+                ModuleGradeModel.grade,
+                ModuleGradeModel.evaluated_at,
+                ModuleGradeModel.comments,
+            )
+            .join(
+                EnrollmentModel, ModuleGradeModel.enrollment_id == EnrollmentModel.id
+            )
+            .join(UserModel, EnrollmentModel.user_id == UserModel.id)
+            .join(
+                CourseModuleModel,
+                ModuleGradeModel.course_module_id == CourseModuleModel.id,
+            )
+            .join(CourseModel, CourseModuleModel.course_id == CourseModel.id)
+            .join(ModuleModel, CourseModuleModel.module_id == ModuleModel.id)
+        )
+        if course_id:
+            query = query.filter(CourseModel.id == course_id)
+        return query.order_by(ModuleGradeModel.id)
+
+    return csv_response(
+        "notas_modulos.csv",
+        [
+            "id",
+            "enrollment_id",
+            "email",
+            "full_name",
+            "course_id",
+            "course_name",
+            "course_module_id",
+            "module_name",
+            "grade",
+            "evaluated_at",
+            "comments",
+        ],
+        build_query,
+    )
+
+
+@router.get("/grade_statistics.csv")
+def export_grade_statistics(
+    course_id: Optional[int] = Query(None, description="Filtrar por curso"),
+    pass_mark: float = Query(10.0, ge=0, le=20, description="Nota mínima de aprovação"),
+    current_user: Any = Depends(deps.get_current_admin_or_secretaria),
+):
+    """
+    Exporta o resumo estatístico das notas por módulo (ver /statistics/grades).
+    """
+    header = [
+        "course_id",
+        "course_name",
+        "course_module_id",
+        "module_name",
+        "count",
+        "mean",
+        "median",
+        "std",
+        "min",
+        "max",
+        *[f"p{p}" for p in PERCENTILES],
+        "pass_rate",
+    ]
+
+    def generate() -> Iterator[str]:
+        db = SessionLocal()
+        try:
+            rows = module_grade_crud.get_grade_columns(db, course_id=course_id)
+        finally:
+            db.close()
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        buffer.write("\ufeff")
+        writer.writerow(header)
+        for course in build_grade_report(rows, pass_mark=pass_mark):
+            for module in course["modules"]:
+                writer.writerow(
+                    [
+                        course["course_id"],
+                        course["course_name"],
+                        module["course_module_id"],
+                        module["module_name"],
+                        module["count"],
+                        module["mean"],
+                        module["median"],
+                        module["std"],
+                        module["min"],
+                        module["max"],
+                        *[module["percentiles"][f"p{p}"] for p in PERCENTILES],
+                        module["pass_rate"],
+                    ]
+                )
+        yield buffer.getvalue()
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/csv; charset=utf-8",
+        headers={
+            "Content-Disposition": 'attachment; filename="estatisticas_notas.csv"'
+        },
+    )
@@ -29,9 +29,12 @@ from app.schemas.lesson import (
     LessonConflictError,
     LessonHoursInfo,
     LessonCreateResponse,
+    LessonShift,
+    LessonShiftResponse,
 )
 from app.crud import lesson as lesson_crud
 from app.crud import course_module as course_module_crud
+from app.services.lesson_notifications import LessonSlot, notify_lesson_changes
 
 router = APIRouter()
 
@@ -401,7 +404,15 @@ def update_lesson(
             },
         )
 
-    return lesson_crud.update(db, db_obj=lesson, obj_in=lesson_in)
+    before = LessonSlot.from_lesson(lesson)
+    lesson = lesson_crud.update(db, db_obj=lesson, obj_in=lesson_in)
+
+    # Avisar alunos e professor se a data, hora ou sala mudou
+    after = LessonSlot.from_lesson(lesson)
+    if after != before:
+        notify_lesson_changes(db, lesson.course_module_id, [(before, after)])
+
+    return lesson
 
 
 @router.delete("/{lesson_id}", response_model=Lesson)
@@ -416,7 +427,82 @@ def delete_lesson(
     if not lesson:
         raise HTTPException(status_code=404, detail="Aula não encontrada")
 
-    return lesson_crud.remove(db, id=lesson_id)
+    before = LessonSlot.from_lesson(lesson)
+    course_module_id = lesson.course_module_id
+    removed = Lesson.model_validate(lesson_crud.remove(db, id=lesson_id))
+
+    # Avisar alunos e professor do cancelamento
+    notify_lesson_changes(db, course_module_id, [(before, None)])
+
+    return removed
+
+
+@router.post("/shift", response_model=LessonShiftResponse)
+def shift_lessons(
+    shift_in: LessonShift,
+    db: Session = Depends(get_db),
+    current_user: Any = Depends(deps.get_current_active_superuser),
+):
+    """
+    Adia (ou antecipa) todas as aulas de um módulo a partir de uma data.
+    Valida conflitos de sala e professor nas novas datas e avisa alunos e
+    professor com um único email por pessoa.
+    """
+    if shift_in.days == 0:
+        raise HTTPException(status_code=400, detail="O nº de dias não pode ser 0")
+
+    lessons = [
+        lesson
+        for lesson in lesson_crud.get_by_course_module(
+            db, course_module_id=shift_in.course_module_id
+        )
+        if lesson.date >= shift_in.from_date
+    ]
+    if not lessons:
+        raise HTTPException(status_code=404, detail="Nenhuma aula a mover")
+
+    delta = timedelta(days=shift_in.days)
+    moved_ids = {lesson.id for lesson in lessons}
+
+    # Validar as novas datas (as aulas da própria série não contam como conflito)
+    for lesson in lessons:
+        errors = [
+            e
+            for e in validate_lesson(
+                db,
+                lesson.course_module_id,
+                lesson.date + delta,
+                lesson.start_time,
+                lesson.end_time,
+                lesson.classroom_id,
+                exclude_lesson_id=lesson.id,
+            )
+            if e.error_type in ("classroom", "trainer")
+            and e.conflicting_lesson_id not in moved_ids
+        ]
+        if errors:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "message": f"Conflito encontrado para {lesson.date + delta}",
+                    "errors": [e.model_dump() for e in errors],
+                },
+            )
+
+    changes = []
+    for lesson in lessons:
+        before = LessonSlot.from_lesson(lesson)
+        lesson.date = lesson.date + delta
+        changes.append((before, LessonSlot.from_lesson(lesson)))
+    db.commit()
+
+    notified = notify_lesson_changes(db, shift_in.course_module_id, changes)
+
+    return LessonShiftResponse(
+        lessons=[Lesson.model_validate(lesson) for lesson in lessons],
+        count=len(lessons),
+        notified=notified,
+    )
 
 
 # ============================================
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.api import deps
 from app.schemas import ModuleGrade, ModuleGradeCreate, ModuleGradeUpdate
 from app.models.user import User
+from app.schemas.token import TokenData
 from app.crud import module_grade as module_grade_crud
 
 router = APIRouter()
@@ -40,7 +41,7 @@ def read_module_grades(
 def create_module_grade(
     grade_in: ModuleGradeCreate,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Lança uma nota para um aluno num módulo. (Admin Only)
@@ -65,7 +66,7 @@ def update_module_grade(
     grade_id: int,
     grade_in: ModuleGradeUpdate,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Atualiza uma nota existente.
@@ -81,7 +82,7 @@ def update_module_grade(
 def delete_module_grade(
     grade_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Remove uma nota.
@@ -1,52 +1,69 @@
 """
 Router de Pesquisa - Admin e Secretaria
-Permite pesquisar cursos, estudantes e professores com paginação.
+Permite pesquisar cursos, estudantes e professores com paginação,
+ou todas as entidades de uma só vez (/search/all).
+
+Sugestões para campos de escolha (/search/autocomplete) são servidas por um
+índice em memória (ver app.services.autocomplete), sem acesso à base de dados.
+
+As pesquisas usam o índice full-text FTS5 (ver app.services.search_index),
+com resultados ordenados por relevância. Se o índice não estiver disponível,
+é usado ILIKE como alternativa.
+
+Quando a pesquisa exata não devolve resultados, é feita uma pesquisa aproximada
+pelo índice de trigramas (ignora acentos e tolera erros ortográficos).
+
+Os resultados das pesquisas ficam em cache (LRU + TTL) até à próxima escrita
+nas entidades pesquisadas; as métricas estão em /search/cache-stats.
 """
 
 from typing import List, Optional, Any
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import or_, func, tuple_
 from pydantic import BaseModel
+import base64
+import json
 import math
 
 from app.db.session import get_db
 from app.api import deps
-from app.models.user import User
+from app.core.cache import TTLCache, get_generation
+from app.core.text import normalize_text
+from app.models.user import User, UserRole
 from app.models.course import Course
+from app.models.module import Module
+from app.models.classroom import Classroom
+from app.schemas.token import TokenData
 from app.schemas.user import User as UserSchema
 from app.schemas.course import Course as CourseSchema
+from app.services.autocomplete import autocomplete_courses, autocomplete_users
+from app.services.search_index import (
+    SEARCH_GROUPS,
+    build_match_query,
+    fuzzy_subquery,
+    grouped_search,
+    is_search_index_available,
+    match_subquery,
+    rank_by_similarity,
+)
 
 router = APIRouter()
 
 
-# Schema para resposta paginada
-class PaginatedResponse(BaseModel):
-    items: List[Any]
-    total: int
-    page: int
-    pages: int
-    limit: int
-
-
-@router.get("/courses")
-def search_courses(
-    q: Optional[str] = Query(
-        None, min_length=2, description="Termo de pesquisa (opcional)"
-    ),
-    page: int = Query(1, ge=1, description="Página atual"),
-    limit: int = Query(20, ge=1, le=100, description="Items por página"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_admin_or_secretaria),
-):
+def apply_course_search(query, q: Optional[str]):
     """
-    Lista/Pesquisa cursos com paginação.
-    Apenas Admin e Secretaria.
+    Filtra cursos pelo termo pesquisado (nome, área, descrição),
+    ordenando por relevância.
+
+    Returns:
+        (query, colunas de ordenação) - as colunas servem de cursor na paginação.
     """
-    query = db.query(Course)
+    if not q:
+        return query.order_by(Course.id), (Course.id,)
 
-    # Aplicar filtro de pesquisa se fornecido
-    if q:
+    match_query = build_match_query(q) if is_search_index_available() else None
+    if match_query is None:
         search_term = f"%{q}%"
         query = query.filter(
             or_(
@@ -54,42 +71,26 @@ def search_courses(
                 Course.area.ilike(search_term),
             )
         )
+        return query.order_by(Course.id), (Course.id,)
 
-    # Contar total
-    total = query.count()
-    pages = math.ceil(total / limit) if total > 0 else 1
-
-    # Aplicar paginação
-    skip = (page - 1) * limit
-    items = query.offset(skip).limit(limit).all()
-
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "pages": pages,
-        "limit": limit,
-    }
+    hits = match_subquery("course", match_query)
+    query = query.join(hits, hits.c.entity_id == Course.id)
+    return query.order_by(hits.c.rank, Course.id), (hits.c.rank, Course.id)
 
 
-@router.get("/students")
-def search_students(
-    q: Optional[str] = Query(
-        None, min_length=2, description="Termo de pesquisa (opcional)"
-    ),
-    page: int = Query(1, ge=1, description="Página atual"),
-    limit: int = Query(20, ge=1, le=100, description="Items por página"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_admin_or_secretaria),
-):
+def apply_user_search(query, q: Optional[str]):
     """
-    Lista/Pesquisa estudantes com paginação.
-    Apenas Admin e Secretaria.
+    Filtra utilizadores pelo termo pesquisado (nome, email),
+    ordenando por relevância.
+
+    Returns:
+        (query, colunas de ordenação) - as colunas servem de cursor na paginação.
     """
-    query = db.query(User).filter(User.role == "estudante")
+    if not q:
+        return query.order_by(User.id), (User.id,)
 
-    # Aplicar filtro de pesquisa se fornecido
-    if q:
+    match_query = build_match_query(q) if is_search_index_available() else None
+    if match_query is None:
         search_term = f"%{q}%"
         query = query.filter(
             or_(
@@ -97,62 +98,430 @@ def search_students(
                 User.email.ilike(search_term),
             )
         )
+        return query.order_by(User.id), (User.id,)
 
-    # Contar total
-    total = query.count()
-    pages = math.ceil(total / limit) if total > 0 else 1
+    hits = match_subquery("user", match_query)
+    query = query.join(hits, hits.c.entity_id == User.id)
+    return query.order_by(hits.c.rank, User.id), (hits.c.rank, User.id)
 
-    # Aplicar paginação
-    skip = (page - 1) * limit
-    items = query.offset(skip).limit(limit).all()
+
+def filter_users(db: Session, role: UserRole, is_active: Optional[bool] = None):
+    """
+    Utilizadores de uma role (e, opcionalmente, de um estado).
+    O filtro por role é servido pelo índice (role, search_name).
+    """
+    query = db.query(User).filter(User.role == role)
+    if is_active is not None:
+        query = query.filter(User.is_active == is_active)
+    return query
+
+
+def fuzzy_search(query, model, entity: str, q: str) -> List[Any]:
+    """
+    Pesquisa aproximada: obtém candidatos do índice de trigramas e ordena-os
+    por semelhança com o termo (ver app.services.search_index).
+    """
+    if not is_search_index_available():
+        return []
+    hits = fuzzy_subquery(entity, q)
+    if hits is None:
+        return []
+    candidates = query.join(hits, hits.c.entity_id == model.id).all()
+    return rank_by_similarity(q, candidates, key=lambda item: item.search_name)
+
+
+def encode_cursor(values) -> str:
+    """Codifica os valores de ordenação do último resultado num cursor opaco."""
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode()
+
+
+def _cursor_value_ok(value: Any, column) -> bool:
+    """Verifica se um valor do cursor tem o tipo da coluna de ordenação."""
+    expected = column.type.python_type
+    if isinstance(value, bool) or value is None:
+        return False
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+
+def decode_cursor(cursor: str, sort_keys) -> List[Any]:
+    """
+    Descodifica um cursor (400 se for inválido): tem de ter um valor, do tipo
+    certo, por cada coluna de ordenação.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        values = None
+    if (
+        not isinstance(values, list)
+        or len(values) != len(sort_keys)
+        or not all(map(_cursor_value_ok, values, sort_keys))
+    ):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return values
+
+
+# Totais das pesquisas, válidos até à próxima escrita na entidade
+_count_cache = TTLCache(maxsize=1024)
+
+# Páginas de resultados já serializadas (a TTL limita o tempo em memória)
+_result_cache = TTLCache(maxsize=512, ttl=300)
+
+# Contador de geração (ver app.core.cache) de cada entidade pesquisável
+_GENERATIONS = {"course": "courses", "user": "users"}
+
+
+def query_cache_key(q: Optional[str]) -> str:
+    """
+    Chave de cache de um termo pesquisado.
+    Com o índice FTS5 a pesquisa ignora acentos, maiúsculas e pontuação, pelo
+    que termos com a mesma forma normalizada partilham a entrada da cache.
+    """
+    if not q:
+        return ""
+    if is_search_index_available() and build_match_query(q) is not None:
+        return normalize_text(q)
+    return q
+
+
+def cached_count(searched, entity: str, scope: str, q: Optional[str]) -> int:
+    """
+    Conta os resultados de uma pesquisa, reutilizando o valor já calculado
+    enquanto não houver escritas na entidade.
+    """
+    key = (scope, query_cache_key(q), get_generation(_GENERATIONS[entity]))
+    total = _count_cache.get(key)
+    if total is None:
+        total = searched.order_by(None).count()
+        _count_cache.set(key, total)
+    return total
+
+
+class SearchParams:
+    """
+    Parâmetros comuns aos endpoints de pesquisa paginada.
+
+    Paginação:
+    - Por página (page): compatível com a navegação numerada.
+    - Por cursor (cursor): usa o 'next_cursor' da resposta anterior e continua
+      a partir do último resultado, sem OFFSET (ignora 'page').
+
+    O total exige uma contagem extra; com include_total=false não é calculado
+    e o cliente usa 'has_more' para saber se há mais resultados.
+    """
+
+    def __init__(
+        self,
+        q: Optional[str] = Query(
+            None, min_length=2, description="Termo de pesquisa (opcional)"
+        ),
+        page: int = Query(1, ge=1, description="Página atual"),
+        limit: int = Query(20, ge=1, le=100, description="Items por página"),
+        cursor: Optional[str] = Query(
+            None, description="Cursor devolvido em 'next_cursor' (substitui 'page')"
+        ),
+        include_total: bool = Query(
+            True, description="Calcular o total de resultados"
+        ),
+        fuzzy: bool = Query(
+            True, description="Pesquisa aproximada se não houver resultados exatos"
+        ),
+    ):
+        self.q = q
+        self.page = page
+        self.limit = limit
+        self.cursor = cursor
+        self.include_total = include_total
+        self.fuzzy = fuzzy
+
+
+def paginate_search(
+    query, search, model, schema, entity: str, scope: str, params: SearchParams
+):
+    """
+    Aplica a pesquisa e a paginação, recorrendo à pesquisa aproximada
+    se a pesquisa exata não encontrar resultados.
+
+    É lido mais um registo do que o pedido (limit + 1) para saber se existe
+    uma página seguinte sem ter de contar os resultados.
+
+    A resposta (com os items serializados por `schema`) fica em cache até à
+    próxima escrita na entidade.
+    """
+    cache_key = (
+        scope,
+        query_cache_key(params.q),
+        params.page,
+        params.limit,
+        params.cursor,
+        params.include_total,
+        params.fuzzy,
+        get_generation(_GENERATIONS[entity]),
+    )
+    result = _result_cache.get(cache_key)
+    if result is None:
+        result = _paginate_search(query, search, model, entity, scope, params)
+        result["items"] = [
+            schema.model_validate(item, from_attributes=True).model_dump(
+                mode="json"
+            )
+            for item in result["items"]
+        ]
+        _result_cache.set(cache_key, result)
+    return result
+
+
+def _paginate_search(
+    query, search, model, entity: str, scope: str, params: SearchParams
+):
+    q, page, limit = params.q, params.page, params.limit
+    searched, sort_keys = search(query, q)
+
+    page_query = searched.add_columns(*sort_keys)
+    if params.cursor:
+        values = decode_cursor(params.cursor, sort_keys)
+        page_query = page_query.filter(tuple_(*sort_keys) > tuple_(*values))
+    else:
+        page_query = page_query.offset((page - 1) * limit)
+
+    rows = page_query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [row[0] for row in rows]
+    next_cursor = encode_cursor(rows[-1][1:]) if has_more else None
+
+    total = cached_count(searched, entity, scope, q) if params.include_total else None
+
+    if q and params.fuzzy and not items and not params.cursor:
+        no_exact_matches = total == 0 if total is not None else searched.first() is None
+        if no_exact_matches:
+            # Resultados aproximados: ordenados em memória, paginados apenas por página
+            matches = fuzzy_search(query, model, entity, q)
+            skip = (page - 1) * limit
+            items = matches[skip : skip + limit]
+            total = len(matches)
+            has_more = skip + limit < total
+            next_cursor = None
 
     return {
         "items": items,
         "total": total,
         "page": page,
-        "pages": pages,
+        "pages": (math.ceil(total / limit) if total > 0 else 1)
+        if total is not None
+        else None,
         "limit": limit,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
     }
 
 
-@router.get("/trainers")
-def search_trainers(
-    q: Optional[str] = Query(
-        None, min_length=2, description="Termo de pesquisa (opcional)"
-    ),
-    page: int = Query(1, ge=1, description="Página atual"),
-    limit: int = Query(20, ge=1, le=100, description="Items por página"),
+# Schema para resposta paginada
+class PaginatedResponse(BaseModel):
+    items: List[Any]
+    total: Optional[int]
+    page: int
+    pages: Optional[int]
+    limit: int
+    has_more: bool
+    next_cursor: Optional[str]
+
+
+def _grouped_search_fallback(db: Session, q: str, limit: int):
+    """
+    Pesquisa global com ILIKE (quando o índice FTS5 não está disponível):
+    uma contagem e uma query por grupo.
+    """
+    search_term = f"%{q}%"
+    user_filter = or_(User.full_name.ilike(search_term), User.email.ilike(search_term))
+    sources = {
+        "courses": (
+            Course,
+            or_(Course.name.ilike(search_term), Course.area.ilike(search_term)),
+            lambda c: (c.name, c.area),
+        ),
+        "students": (
+            User,
+            (User.role == UserRole.estudante) & user_filter,
+            lambda u: (u.full_name, u.email),
+        ),
+        "trainers": (
+            User,
+            (User.role == UserRole.professor) & user_filter,
+            lambda u: (u.full_name, u.email),
+        ),
+        "modules": (
+            Module,
+            or_(Module.name.ilike(search_term), Module.area.ilike(search_term)),
+            lambda m: (m.name, m.area),
+        ),
+        "classrooms": (
+            Classroom,
+            or_(Classroom.name.ilike(search_term), Classroom.type.ilike(search_term)),
+            lambda c: (c.name, c.type),
+        ),
+    }
+
+    groups = {}
+    for group in SEARCH_GROUPS:
+        model, condition, describe = sources[group]
+        query = db.query(model).filter(condition)
+        groups[group] = {
+            "total": query.count(),
+            "items": [
+                {"id": item.id, "title": title, "subtitle": subtitle, "rank": None}
+                for item in query.order_by(model.id).limit(limit).all()
+                for title, subtitle in [describe(item)]
+            ],
+        }
+    return groups
+
+
+# Entidades cujas escritas invalidam a pesquisa global
+_ALL_GENERATIONS = ("courses", "users", "modules", "classrooms")
+
+
+@router.get("/all")
+def search_all(
+    q: str = Query(..., min_length=2, description="Termo de pesquisa"),
+    limit: int = Query(5, ge=1, le=50, description="Resultados por grupo"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_admin_or_secretaria),
+    current_user: TokenData = Depends(deps.get_current_admin_or_secretaria),
 ):
     """
-    Lista/Pesquisa professores com paginação.
+    Pesquisa global em cursos, estudantes, professores, módulos e salas.
+    Devolve os resultados agrupados por tipo, ordenados por relevância,
+    com o total de cada grupo.
     Apenas Admin e Secretaria.
     """
-    query = db.query(User).filter(User.role == "professor")
+    cache_key = (
+        "all",
+        query_cache_key(q),
+        limit,
+        *(get_generation(name) for name in _ALL_GENERATIONS),
+    )
+    result = _result_cache.get(cache_key)
+    if result is not None:
+        return result
 
-    # Aplicar filtro de pesquisa se fornecido
-    if q:
-        search_term = f"%{q}%"
-        query = query.filter(
-            or_(
-                User.full_name.ilike(search_term),
-                User.email.ilike(search_term),
-            )
-        )
+    match_query = build_match_query(q) if is_search_index_available() else None
+    if match_query is None:
+        groups = _grouped_search_fallback(db, q, limit)
+    else:
+        groups = grouped_search(db, match_query, limit)
 
-    # Contar total
-    total = query.count()
-    pages = math.ceil(total / limit) if total > 0 else 1
+    result = {
+        "q": q,
+        "total": sum(group["total"] for group in groups.values()),
+        "groups": groups,
+    }
+    _result_cache.set(cache_key, result)
+    return result
 
-    # Aplicar paginação
-    skip = (page - 1) * limit
-    items = query.offset(skip).limit(limit).all()
 
+@router.get("/cache-stats")
+def search_cache_stats(
+    current_user: TokenData = Depends(deps.get_current_admin_or_secretaria),
+):
+    """
+    Métricas das caches de pesquisa (tamanho, hits, misses, hit rate).
+    Apenas Admin e Secretaria.
+    """
     return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "pages": pages,
-        "limit": limit,
+        "results": _result_cache.stats(),
+        "counts": _count_cache.stats(),
     }
+
+
+@router.get("/autocomplete")
+def autocomplete(
+    q: str = Query(..., min_length=1, description="Início do nome ou email"),
+    type: str = Query(
+        "users", pattern="^(users|courses)$", description="users ou courses"
+    ),
+    role: Optional[str] = Query(None, description="Filtrar utilizadores por role"),
+    status: Optional[str] = Query(None, description="Filtrar cursos por estado"),
+    include_inactive: bool = Query(
+        False, description="Incluir utilizadores inativos"
+    ),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: TokenData = Depends(deps.get_current_admin_or_secretaria),
+):
+    """
+    Sugestões de utilizadores ou cursos cujo nome (ou email) começa pelo termo.
+    Ignora acentos e maiúsculas. Apenas Admin e Secretaria.
+    """
+    if type == "courses":
+        items = autocomplete_courses(q, limit=limit, status=status)
+    else:
+        items = autocomplete_users(
+            q, limit=limit, role=role, active_only=not include_inactive
+        )
+    return {"items": items}
+
+
+@router.get("/courses")
+def search_courses(
+    params: SearchParams = Depends(),
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(deps.get_current_admin_or_secretaria),
+):
+    """
+    Lista/Pesquisa cursos com paginação.
+    Apenas Admin e Secretaria.
+    """
+    return paginate_search(
+        db.query(Course),
+        apply_course_search,
+        Course,
+        CourseSchema,
+        "course",
+        "courses",
+        params,
+    )
+
+
+@router.get("/students")
+def search_students(
+    params: SearchParams = Depends(),
+    is_active: Optional[bool] = Query(None, description="Filtrar por estado"),
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(deps.get_current_admin_or_secretaria),
+):
+    """
+    Lista/Pesquisa estudantes com paginação.
+    Apenas Admin e Secretaria.
+    """
+    return paginate_search(
+        filter_users(db, UserRole.estudante, is_active),
+        apply_user_search,
+        User,
+        UserSchema,
+        "user",
+        f"students:{is_active}",
+        params,
+    )
+
+
+@router.get("/trainers")
+def search_trainers(
+    params: SearchParams = Depends(),
+    is_active: Optional[bool] = Query(None, description="Filtrar por estado"),
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(deps.get_current_admin_or_secretaria),
+):
+    """
+    Lista/Pesquisa professores com paginação.
+    Apenas Admin e Secretaria.
+    """
+    return paginate_search(
+        filter_users(db, UserRole.professor, is_active),
+        apply_user_search,
+        User,
+        UserSchema,
+        "user",
+        f"trainers:{is_active}",
+        params,
+    )
@@ -4,30 +4,20 @@ Router de Estatísticas
 Endpoint para obter métricas agregadas do sistema para o Dashboard.
 """
 
-from typing import Any
-from datetime import date, datetime, time, timedelta
-from fastapi import APIRouter, Depends
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from app.db.session import get_db
 from app.api import deps
-from app.models.course import Course as CourseModel, CourseStatus
-from app.models.enrollment import Enrollment as EnrollmentModel, EnrollmentStatus
-from app.models.course_module import CourseModule as CourseModuleModel
-from app.models.lesson import Lesson as LessonModel
-from app.models.user import User as UserModel
+from app.crud import file_blob as file_blob_crud
+from app.crud import module_grade as module_grade_crud
+from app.services import dashboard
+from app.services.grade_statistics import build_grade_report
+from app.services.enrollment_statistics import get_enrollment_funnel
 
 router = APIRouter()
 
 
-def calculate_lesson_duration_hours(start_time: time, end_time: time) -> float:
-    """Calcula a duração de uma aula em horas."""
-    start_dt = datetime.combine(date.today(), start_time)
-    end_dt = datetime.combine(date.today(), end_time)
-    duration = (end_dt - start_dt).total_seconds() / 3600
-    return round(duration, 2)
-
-
 @router.get("/")
 def get_statistics(
     db: Session = Depends(get_db),
@@ -39,138 +29,126 @@ def get_statistics(
     i. Total de cursos terminados
     ii. Total de cursos a decorrer
     iii. Total de formandos a frequentar cursos no atual momento
-    iv. Nº de cursos por área
-    v. Top 10 de professores com maior nº de horas lecionadas (HORAS REAIS - aulas já dadas)
+    iv. Nº de cursos por área (snapshot)
+    v. Top 10 de professores com maior nº de horas lecionadas (HORAS REAIS - aulas já dadas) (snapshot)
     vi. Lista de cursos a decorrer (detalhes)
-    vii. Lista de cursos a iniciar nos próximos 60 dias
+    vii. Lista de cursos a iniciar nos próximos 60 dias (snapshot)
+    viii. Ocupação das salas nos próximos 7 dias (snapshot)
+
+    Os agregados marcados com (snapshot) são pré-calculados todas as noites;
+    'snapshot_at' indica quando foram calculados (recalcular: POST
+    /statistics/dashboard/refresh).
     """
+    snapshot_data, snapshot_at = dashboard.get_snapshot_panels(
+        db, list(dashboard.SNAPSHOT_PANELS)
+    )
 
-    today = date.today()
+    return {
+        **dashboard.compute_summary(db),
+        **snapshot_data,
+        "courses_running": dashboard.compute_courses_running(db),
+        "snapshot_at": snapshot_at.isoformat() if snapshot_at else None,
+    }
 
-    # i. Total de cursos terminados
-    courses_finished = (
-        db.query(CourseModel)
-        .filter(CourseModel.status == CourseStatus.finished)
-        .count()
-    )
 
-    # ii. Total de cursos a decorrer (ativos)
-    courses_active = (
-        db.query(CourseModel).filter(CourseModel.status == CourseStatus.active).count()
-    )
+@router.post("/dashboard/refresh")
+def refresh_dashboard_snapshots(
+    db: Session = Depends(get_db),
+    current_user: Any = Depends(deps.get_current_active_superuser),
+):
+    """
+    Recalcula já os snapshots do Dashboard, sem esperar pelo cálculo noturno
+    (Apenas Admin: é uma escrita e um cálculo pesado).
+    """
+    computed_at = dashboard.precompute_dashboard(db)
+    return {"snapshot_at": computed_at.isoformat()}
+
+
+@router.get("/dashboard")
+def get_dashboard_panels(
+    panels: str = Query(
+        ...,
+        description=(
+            "Painéis separados por vírgula (ex: summary,top_trainers,lessons_today)"
+        ),
+    ),
+    db: Session = Depends(get_db),
+    current_user: Any = Depends(deps.get_current_admin_or_secretaria),
+):
+    """
+    Devolve vários painéis do Dashboard num único pedido (Admin e Secretaria).
 
-    # iii. Total de formandos ativos (utilizadores únicos com role='estudante' e inscrições ativas)
-    students_active = (
-        db.query(func.count(func.distinct(EnrollmentModel.user_id)))
-        .join(UserModel, EnrollmentModel.user_id == UserModel.id)
-        .filter(
-            EnrollmentModel.status == EnrollmentStatus.active,
-            UserModel.role == "estudante",
+    Todos os painéis partilham a mesma autenticação e sessão de base de dados.
+    Painéis disponíveis: summary, courses_running, lessons_today,
+    enrollment_funnel, courses_by_area, top_trainers, courses_starting_soon,
+    classroom_occupancy.
+    """
+    requested = list(dict.fromkeys(p.strip() for p in panels.split(",") if p.strip()))
+    unknown = [p for p in requested if p not in dashboard.AVAILABLE_PANELS]
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": f"Painéis inválidos: {', '.join(unknown) or '(nenhum)'}",
+                "available": dashboard.AVAILABLE_PANELS,
+            },
         )
-        .scalar()
-    )
 
-    # iv. Nº de cursos por área
-    courses_by_area_query = (
-        db.query(CourseModel.area, func.count(CourseModel.id).label("count"))
-        .group_by(CourseModel.area)
-        .all()
-    )
+    return dashboard.get_panels(db, requested)
 
-    courses_by_area = {row.area: row.count for row in courses_by_area_query}
 
-    # v. Top 10 de professores com maior nº de horas REALMENTE lecionadas
-    # Agora calculamos com base nas aulas (lessons) que já aconteceram (date <= hoje)
+@router.get("/grades")
+def get_grade_distribution(
+    course_id: Optional[int] = Query(None, description="Filtrar por curso"),
+    course_module_id: Optional[int] = Query(
+        None, description="Filtrar por módulo do curso"
+    ),
+    pass_mark: float = Query(10.0, ge=0, le=20, description="Nota mínima de aprovação"),
+    bins: int = Query(20, ge=1, le=40, description="Nº de classes do histograma"),
+    db: Session = Depends(get_db),
+    current_user: Any = Depends(deps.get_current_admin_or_secretaria),
+):
+    """
+    Distribuição das notas por curso e por módulo do curso (Admin e Secretaria).
 
-    # Obter todas as aulas passadas com os dados do módulo
-    past_lessons = (
-        db.query(LessonModel, CourseModuleModel)
-        .join(CourseModuleModel, LessonModel.course_module_id == CourseModuleModel.id)
-        .filter(LessonModel.date <= today)
-        .all()
+    Para cada grupo devolve: média, mediana, desvio padrão, percentis,
+    taxa de aprovação e histograma. Um relatório de uma edição completa
+    é obtido num único pedido.
+    """
+    rows = module_grade_crud.get_grade_columns(
+        db, course_id=course_id, course_module_id=course_module_id
     )
+    return {
+        "pass_mark": pass_mark,
+        "courses": build_grade_report(rows, pass_mark=pass_mark, bins=bins),
+    }
 
-    # Calcular horas por professor
-    trainer_hours = {}
-    for lesson, course_module in past_lessons:
-        trainer_id = course_module.trainer_id
-        hours = calculate_lesson_duration_hours(lesson.start_time, lesson.end_time)
-
-        if trainer_id not in trainer_hours:
-            trainer_hours[trainer_id] = 0.0
-        trainer_hours[trainer_id] += hours
-
-    # Obter dados dos professores e ordenar
-    top_trainers = []
-    if trainer_hours:
-        trainer_ids = list(trainer_hours.keys())
-        trainers = db.query(UserModel).filter(UserModel.id.in_(trainer_ids)).all()
-        trainer_map = {t.id: t for t in trainers}
-
-        sorted_trainers = sorted(
-            trainer_hours.items(), key=lambda x: x[1], reverse=True
-        )[:10]
-
-        for trainer_id, hours in sorted_trainers:
-            trainer = trainer_map.get(trainer_id)
-            if trainer:
-                top_trainers.append(
-                    {
-                        "id": trainer_id,
-                        "name": trainer.full_name or trainer.email,
-                        "hours": round(hours, 1),
-                    }
-                )
-
-    # vi. Lista de cursos a decorrer (detalhes)
-    courses_running = (
-        db.query(CourseModel)
-        .filter(CourseModel.status == CourseStatus.active)
-        .order_by(CourseModel.start_date.desc())
-        .all()
-    )
 
-    courses_running_list = [
-        {
-            "id": c.id,
-            "name": c.name,
-            "area": c.area,
-            "start_date": c.start_date.isoformat() if c.start_date else None,
-            "end_date": c.end_date.isoformat() if c.end_date else None,
-        }
-        for c in courses_running
-    ]
-
-    # vii. Lista de cursos a iniciar nos próximos 60 dias
-    sixty_days_later = today + timedelta(days=60)
-    courses_starting_soon = (
-        db.query(CourseModel)
-        .filter(
-            CourseModel.status == CourseStatus.planned,
-            CourseModel.start_date >= today,
-            CourseModel.start_date <= sixty_days_later,
-        )
-        .order_by(CourseModel.start_date.asc())
-        .all()
-    )
+@router.get("/enrollments")
+def get_enrollment_statistics(
+    db: Session = Depends(get_db),
+    current_user: Any = Depends(deps.get_current_admin_or_secretaria),
+):
+    """
+    Funil de inscrições por curso e por área (Admin e Secretaria).
 
-    courses_starting_soon_list = [
-        {
-            "id": c.id,
-            "name": c.name,
-            "area": c.area,
-            "start_date": c.start_date.isoformat() if c.start_date else None,
-            "days_until_start": (c.start_date - today).days if c.start_date else None,
-        }
-        for c in courses_starting_soon
-    ]
+    Inclui contagens por estado (ativos, concluídos, desistentes), taxas de
+    conclusão e desistência, momento da desistência face ao início do curso
+    e média da nota final.
+    """
+    return get_enrollment_funnel(db)
 
-    return {
-        "courses_finished": courses_finished,
-        "courses_active": courses_active,
-        "students_active": students_active,
-        "courses_by_area": courses_by_area,
-        "top_trainers": top_trainers,
-        "courses_running": courses_running_list,
-        "courses_starting_soon": courses_starting_soon_list,
-    }
+
+@router.get("/storage")
+def get_storage_statistics(
+    db: Session = Depends(get_db),
+    current_user: Any = Depends(deps.get_current_active_superuser),
+):
+    """
+    Espaço ocupado pelos ficheiros dos utilizadores (Admin Only).
+
+    Compara o tamanho total dos ficheiros (logical_bytes) com o espaço real
+    em disco (stored_bytes): conteúdos repetidos são guardados uma só vez,
+    e a diferença é o espaço poupado (saved_bytes).
+    """
+    return file_blob_crud.get_storage_report(db)
@@ -5,32 +5,26 @@ Endpoints para upload, listagem, download e eliminação de ficheiros.
 """
 
 import os
-import shutil
-import uuid
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.api import deps
-from app.models.user import User
+from app.core.downloads import file_download
+from app.schemas.token import TokenData
 from app.schemas.user_file import UserFile
 from app.crud import user_file as user_file_crud
 from app.crud import user as user_crud
+from app.services import file_storage
 
 router = APIRouter()
 
-# Pasta base para uploads
-UPLOAD_DIR = os.path.join(
-    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads", "users"
-)
-
-
 @router.get("/{user_id}/files", response_model=List[UserFile])
 def list_user_files(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Lista todos os ficheiros de um utilizador. (Admin Only)
@@ -43,53 +37,54 @@ async def upload_user_file(
     user_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Faz upload de um ficheiro para o utilizador. (Admin Only)
     """
     # Verificar se utilizador existe
-    user = user_crud.get_user(db, user_id)
+    user = await run_in_threadpool(user_crud.get_user, db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Utilizador não encontrado")
 
-    # Criar pasta do utilizador se não existir
-    user_folder = os.path.join(UPLOAD_DIR, str(user_id))
-    os.makedirs(user_folder, exist_ok=True)
-
-    # Gerar nome único para evitar colisões
     file_ext = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4().hex}{file_ext}"
-    file_path = os.path.join(user_folder, unique_filename)
 
-    # Guardar ficheiro
+    # Guardar ficheiro (por blocos, com limite de tamanho e checksum)
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        temp_path, size, checksum = await file_storage.receive_upload(file)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Erro ao guardar ficheiro: {str(e)}"
         )
 
-    # Criar registo na BD usando o CRUD
-    return user_file_crud.create_for_user(
+    # Criar registo na BD (conteúdos repetidos são guardados uma só vez)
+    return await run_in_threadpool(
+        file_storage.store_user_file,
         db,
+        temp_path=temp_path,
+        size=size,
+        checksum=checksum,
         user_id=user_id,
         filename=file.filename,
-        file_path=f"uploads/users/{user_id}/{unique_filename}",
         file_type=file.content_type or file_ext.lstrip("."),
     )
 
 
-@router.get("/{user_id}/files/{file_id}/download")
+@router.api_route("/{user_id}/files/{file_id}/download", methods=["GET", "HEAD"])
 def download_user_file(
     user_id: int,
     file_id: int,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Download de um ficheiro. (Admin Only)
+
+    Suporta pedidos parciais (Range), para retomar downloads interrompidos,
+    e pedidos condicionais (If-None-Match / If-Modified-Since -> 304).
     """
     db_file = user_file_crud.get_by_user_and_id(db, user_id=user_id, file_id=file_id)
 
@@ -101,15 +96,14 @@ def download_user_file(
         os.path.dirname(os.path.dirname(os.path.dirname(__file__))), db_file.file_path
     )
 
-    if not os.path.exists(file_path):
-        raise HTTPException(
-            status_code=404, detail="Ficheiro não encontrado no servidor"
-        )
-
-    return FileResponse(
-        path=file_path,
+    # Ficheiros anteriores ao armazenamento por conteúdo não têm FileBlob
+    # (o checksum pode não corresponder ao ficheiro em disco)
+    return file_download(
+        request,
+        file_path,
         filename=db_file.filename,
         media_type=db_file.file_type or "application/octet-stream",
+        checksum=db_file.checksum if db_file.blob is not None else None,
     )
 
 
@@ -118,7 +112,7 @@ def delete_user_file(
     user_id: int,
     file_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Elimina um ficheiro do utilizador. (Admin Only)
@@ -128,12 +122,5 @@ def delete_user_file(
     if not db_file:
         raise HTTPException(status_code=404, detail="Ficheiro não encontrado")
 
-    # Eliminar ficheiro físico
-    file_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), db_file.file_path
-    )
-    if os.path.exists(file_path):
-        os.remove(file_path)
-
-    # Eliminar registo da BD usando o CRUD
-    return user_file_crud.remove(db, id=file_id)
+    # Eliminar registo (e o ficheiro físico, se mais nenhum o usar)
+    return file_storage.delete_user_file(db, db_file)
@@ -1,10 +1,12 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud import user as user_crud
 from app.schemas import user as user_schema
-from app.models.user import User
+from app.schemas.token import TokenData
+from app.models.user import User, UserRole
+from app.services import file_storage, user_import
 
 router = APIRouter(
     prefix="/users",
@@ -17,13 +19,18 @@ router = APIRouter(
 def read_users(
     skip: int = 0,
     limit: int = 100,
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Lista todos os utilizadores (Apenas Admin).
+    Pode filtrar por role e por estado (ativo/inativo).
     """
-    users = user_crud.get_users(db, skip=skip, limit=limit)
+    users = user_crud.get_users(
+        db, skip=skip, limit=limit, role=role, is_active=is_active
+    )
     return users
 
 
@@ -31,7 +38,7 @@ def read_users(
 def create_user(
     user_in: user_schema.UserCreate,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Cria novo utilizador (Apenas Admin).
@@ -43,6 +50,28 @@ def create_user(
     return user
 
 
+@router.post("/import")
+def import_users(
+    file: UploadFile = File(...),
+    db: Session = Depends(deps.get_db),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
+):
+    """
+    Importa utilizadores em massa a partir de um ficheiro CSV ou JSON (Apenas Admin).
+
+    Colunas/campos: email, full_name, role, phone_number, password, is_active.
+    As linhas inválidas ou com email repetido/já registado são reportadas
+    (por nº de linha) e as restantes são criadas.
+    """
+    try:
+        rows = user_import.read_rows(
+            file.file, file.filename or "", file.content_type
+        )
+    except user_import.ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return user_import.import_users(db, rows)
+
+
 @router.put("/me", response_model=user_schema.User)
 def update_user_me(
     user_in: user_schema.UserUpdate,
@@ -68,7 +97,7 @@ def update_user_me(
 def read_user_by_id(
     user_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Obtém detalhe de um utilizador (Apenas Admin).
@@ -84,7 +113,7 @@ def update_user(
     user_id: int,
     user_in: user_schema.UserUpdate,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Atualiza um utilizador (Apenas Admin).
@@ -100,7 +129,7 @@ def update_user(
 def delete_user(
     user_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_superuser),
+    current_user: TokenData = Depends(deps.get_current_active_superuser),
 ):
     """
     Remove um utilizador (Apenas Admin).
@@ -108,5 +137,7 @@ def delete_user(
     user = user_crud.get_user(db, user_id=user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Utilizador não encontrado")
+    # Libertar os conteúdos partilhados (o cascade só apagaria os registos)
+    file_storage.delete_user_files(db, user)
     user = user_crud.delete_user(db, user_id=user_id)
     return user
@@ -0,0 +1,24 @@
+"""
+Schemas para DashboardSnapshot (agregados pré-calculados do Dashboard)
+"""
+from datetime import datetime
+from typing import Any
+from pydantic import BaseModel
+
+
+class DashboardSnapshotCreate(BaseModel):
+    panel: str
+    data: Any
+
+
+class DashboardSnapshotUpdate(BaseModel):
+    data: Any
+    computed_at: datetime
+
+
+class DashboardSnapshot(DashboardSnapshotCreate):
+    id: int
+    computed_at: datetime
+
+    class Config:
+        from_attributes = True
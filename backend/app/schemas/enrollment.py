@@ -12,6 +12,7 @@ class EnrollmentBase(BaseModel):
     course_id: int
     enrollment_date: date
     status: EnrollmentStatus = EnrollmentStatus.active
+    dropped_at: Optional[date] = None
     final_grade: Optional[int] = None
     final_certificate_url: Optional[str] = None
 
@@ -24,6 +25,7 @@ class EnrollmentCreate(EnrollmentBase):
 # Update Schema
 class EnrollmentUpdate(BaseModel):
     status: Optional[EnrollmentStatus] = None
+    dropped_at: Optional[date] = None
     final_grade: Optional[int] = None
     final_certificate_url: Optional[str] = None
 
@@ -129,3 +129,23 @@ class LessonCreateResponse(BaseModel):
     created_lessons: List[Lesson]
     count: int
     hours_info: LessonHoursInfo
+
+
+class LessonShift(BaseModel):
+    """Adiar/antecipar uma série de aulas de um módulo."""
+
+    course_module_id: int = Field(..., description="ID do módulo do curso")
+    from_date: DateType = Field(
+        ..., description="Move as aulas a partir desta data (inclusive)"
+    )
+    days: int = Field(
+        ..., description="Nº de dias a mover (negativo para antecipar)"
+    )
+
+
+class LessonShiftResponse(BaseModel):
+    """Resposta ao mover uma série de aulas."""
+
+    lessons: List[Lesson]
+    count: int
+    notified: int = Field(..., description="Nº de notificações enviadas")
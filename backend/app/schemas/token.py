@@ -5,7 +5,17 @@ from pydantic import BaseModel
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+    # Claims de autorização (ver security.create_user_access_token)
+    role: Optional[str] = None
+    is_superuser: bool = False
+    is_active: bool = False
+    version: int = 0
@@ -1,5 +1,6 @@
 from typing import Optional
 from pydantic import BaseModel, EmailStr
+from app.models.user import UserRole
 
 
 # Propriedades partilhadas (Base)
@@ -8,7 +9,7 @@ class UserBase(BaseModel):
     is_active: Optional[bool] = False  # Por omissão, inativo até validar email
     is_superuser: bool = False
     full_name: Optional[str] = None
-    role: str = "estudante"
+    role: UserRole = UserRole.estudante
 
 
 # Propriedades para receber na criação de conta (API input)
@@ -24,7 +25,7 @@ class UserUpdate(BaseModel):
     is_superuser: Optional[bool] = None
     is_2fa_enabled: Optional[bool] = None
     full_name: Optional[str] = None
-    role: Optional[str] = None
+    role: Optional[UserRole] = None
 
 
 # Propriedades para devolver ao cliente (API output)
@@ -41,3 +42,14 @@ class User(UserBase):
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
+
+
+# Linha de uma importação em massa (CSV/JSON). Sem password, a conta fica sem
+# password até o utilizador a definir em "Esqueci-me da password".
+class UserImportRow(BaseModel):
+    email: EmailStr
+    full_name: Optional[str] = None
+    role: UserRole = UserRole.estudante
+    phone_number: Optional[str] = None
+    password: Optional[str] = None
+    is_active: bool = False
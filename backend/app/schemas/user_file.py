@@ -21,6 +21,8 @@ class UserFile(UserFileBase):
     id: int
     user_id: int
     file_path: str
+    size: Optional[int] = None
+    checksum: Optional[str] = None
     uploaded_at: datetime
 
     class Config:
@@ -0,0 +1,219 @@
+"""
+Índice de Autocomplete em Memória
+---------------------------------
+Sugestões instantâneas para campos de pesquisa ("typeahead"), como escolher
+o professor de um módulo ou o aluno de uma inscrição.
+
+Os nomes e emails normalizados (ver app.core.text) são guardados numa lista
+ordenada; uma pesquisa por prefixo é uma pesquisa binária (bisect) seguida de
+uma leitura sequencial, sem acesso à base de dados.
+
+Cada nome é indexado a partir de cada palavra ("joao da silva", "da silva",
+"silva"), pelo que "sil" encontra "João da Silva".
+
+O índice é carregado no arranque da aplicação e atualizado incrementalmente
+por eventos do SQLAlchemy a cada escrita em utilizadores e cursos, depois do
+commit (ver app.db.events).
+
+Nota: o índice é local a cada processo (worker do uvicorn).
+"""
+
+import bisect
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.text import normalize_text
+from app.db.events import run_after_commit
+from app.models.course import Course
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Nº máximo de entradas lidas por pesquisa (limita o custo de filtros muito seletivos)
+MAX_SCAN = 2000
+
+
+class PrefixIndex:
+    """
+    Índice de prefixos: lista ordenada de (chave, id) + dados de cada entidade.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[str, int]] = []
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._entry_keys: Dict[int, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, items: List[Tuple[int, List[str], Dict[str, Any]]]) -> None:
+        """Substitui o conteúdo do índice por (id, chaves, dados) de cada entidade."""
+        keys = sorted(
+            (key, entity_id) for entity_id, item_keys, _ in items for key in item_keys
+        )
+        with self._lock:
+            self._keys = keys
+            self._entries = {entity_id: data for entity_id, _, data in items}
+            self._entry_keys = {entity_id: keys for entity_id, keys, _ in items}
+
+    def upsert(self, entity_id: int, keys: List[str], data: Dict[str, Any]) -> None:
+        """Adiciona ou atualiza uma entidade."""
+        with self._lock:
+            self._remove(entity_id)
+            for key in keys:
+                bisect.insort(self._keys, (key, entity_id))
+            self._entries[entity_id] = data
+            self._entry_keys[entity_id] = keys
+
+    def remove(self, entity_id: int) -> None:
+        """Remove uma entidade."""
+        with self._lock:
+            self._remove(entity_id)
+
+    def _remove(self, entity_id: int) -> None:
+        for key in self._entry_keys.pop(entity_id, []):
+            i = bisect.bisect_left(self._keys, (key, entity_id))
+            if i < len(self._keys) and self._keys[i] == (key, entity_id):
+                del self._keys[i]
+        self._entries.pop(entity_id, None)
+
+    def search(
+        self,
+        prefix: str,
+        limit: int,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Devolve até `limit` entidades com uma chave que começa por `prefix`
+        (já normalizado), por ordem alfabética da chave.
+        """
+        results = []
+        seen = set()
+        with self._lock:
+            i = bisect.bisect_left(self._keys, (prefix,))
+            end = min(len(self._keys), i + MAX_SCAN)
+            while i < end and len(results) < limit:
+                key, entity_id = self._keys[i]
+                if not key.startswith(prefix):
+                    break
+                i += 1
+                if entity_id in seen:
+                    continue
+                seen.add(entity_id)
+                data = self._entries[entity_id]
+                if predicate is None or predicate(data):
+                    results.append(data)
+        return results
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _name_keys(name: Optional[str], email: Optional[str] = None) -> List[str]:
+    """
+    Chaves de uma entidade: o nome normalizado a partir de cada palavra e,
+    se existir, o email completo (o domínio sozinho não é indexado).
+    """
+    words = normalize_text(name).split()
+    keys = {" ".join(words[i:]) for i in range(len(words))}
+    if email:
+        keys.add(normalize_text(email))
+    return sorted(keys)
+
+
+def _user_item(user: User) -> Tuple[int, List[str], Dict[str, Any]]:
+    return (
+        user.id,
+        _name_keys(user.full_name, user.email),
+        {
+            "id": user.id,
+            "full_name": user.full_name,
+            "email": user.email,
+            "role": user.role,
+            "is_active": user.is_active,
+        },
+    )
+
+
+def _course_item(course: Course) -> Tuple[int, List[str], Dict[str, Any]]:
+    status = course.status.value if hasattr(course.status, "value") else course.status
+    return (
+        course.id,
+        _name_keys(course.name),
+        {
+            "id": course.id,
+            "name": course.name,
+            "area": course.area,
+            "status": status,
+        },
+    )
+
+
+users_index = PrefixIndex()
+courses_index = PrefixIndex()
+
+# Índice e função de conversão de cada modelo
+_INDEXES = {
+    User: (users_index, _user_item),
+    Course: (courses_index, _course_item),
+}
+
+
+def load_autocomplete_index(db: Session) -> None:
+    """Carrega todos os utilizadores e cursos para o índice (no arranque)."""
+    for model, (index, to_item) in _INDEXES.items():
+        index.load([to_item(obj) for obj in db.query(model).all()])
+    logger.info(
+        f"Índice de autocomplete carregado: {len(users_index)} utilizadores, "
+        f"{len(courses_index)} cursos"
+    )
+
+
+def autocomplete_users(
+    q: str,
+    limit: int = 10,
+    role: Optional[str] = None,
+    active_only: bool = True,
+) -> List[Dict[str, Any]]:
+    """Sugestões de utilizadores cujo nome ou email começa por `q`."""
+
+    def predicate(data: Dict[str, Any]) -> bool:
+        if role and data["role"] != role:
+            return False
+        return data["is_active"] or not active_only
+
+    return users_index.search(normalize_text(q), limit, predicate)
+
+
+def autocomplete_courses(
+    q: str, limit: int = 10, status: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Sugestões de cursos cujo nome começa por `q`."""
+    predicate = (lambda data: data["status"] == status) if status else None
+    return courses_index.search(normalize_text(q), limit, predicate)
+
+
+def _register_listeners() -> None:
+    """
+    Mantém o índice atualizado a cada escrita (insert/update/delete).
+    Os dados são lidos no flush, mas só entram no índice depois do commit
+    (uma transação revertida não deixa entradas fantasma).
+    """
+    for model, (index, to_item) in _INDEXES.items():
+
+        def _upsert(mapper, connection, target, index=index, to_item=to_item):
+            item = to_item(target)
+            run_after_commit(object_session(target), lambda: index.upsert(*item))
+
+        def _remove(mapper, connection, target, index=index):
+            entity_id = target.id
+            run_after_commit(object_session(target), lambda: index.remove(entity_id))
+
+        event.listen(model, "after_insert", _upsert)
+        event.listen(model, "after_update", _upsert)
+        event.listen(model, "after_delete", _remove)
+
+
+_register_listeners()
@@ -8,11 +8,9 @@ Verifica periodicamente os cursos e atualiza o status baseado nas datas:
 Cursos com status 'cancelled' não são alterados automaticamente.
 """
 
-import asyncio
 import logging
 from datetime import date
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
 from app.models.course import Course, CourseStatus
 
 logger = logging.getLogger(__name__)
@@ -59,33 +57,3 @@ def update_course_statuses(db: Session) -> dict:
 
     db.commit()
     return updated
-
-
-async def course_status_scheduler(interval_minutes: int = 60):
-    """
-    Loop assíncrono que verifica status dos cursos periodicamente.
-
-    Args:
-        interval_minutes: Intervalo entre verificações (default: 60 minutos)
-    """
-    logger.info(
-        f"Course status scheduler iniciado (intervalo: {interval_minutes} minutos)"
-    )
-
-    while True:
-        try:
-            db = SessionLocal()
-            result = update_course_statuses(db)
-
-            if result["to_active"] or result["to_finished"]:
-                logger.info(
-                    f"Status de cursos atualizado: "
-                    f"{result['to_active']} -> active, "
-                    f"{result['to_finished']} -> finished"
-                )
-            db.close()
-        except Exception as e:
-            logger.error(f"Erro ao atualizar status dos cursos: {e}")
-
-        # Aguardar até próxima verificação
-        await asyncio.sleep(interval_minutes * 60)
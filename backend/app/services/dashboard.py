@@ -0,0 +1,382 @@
+"""
+Serviço do Dashboard
+--------------------
+Cálculo dos painéis de estatísticas do Dashboard e gestão dos snapshots
+pré-calculados.
+
+Os painéis mais pesados (SNAPSHOT_PANELS) são materializados todas as noites
+na tabela 'dashboard_snapshots' (ver precompute_dashboard). Durante o dia,
+get_snapshot_panels devolve esses resultados com uma simples consulta,
+juntamente com a data/hora do cálculo.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.crud import dashboard_snapshot as snapshot_crud
+from app.models.classroom import Classroom as ClassroomModel
+from app.models.course import Course as CourseModel, CourseStatus
+from app.models.course_module import CourseModule as CourseModuleModel
+from app.models.enrollment import Enrollment as EnrollmentModel, EnrollmentStatus
+from app.models.lesson import Lesson as LessonModel
+from app.models.module import Module as ModuleModel
+from app.models.user import User as UserModel
+from app.services.enrollment_statistics import get_enrollment_funnel
+
+logger = logging.getLogger(__name__)
+
+# Janela para "cursos a iniciar" (dias)
+STARTING_SOON_DAYS = 60
+
+# Janela e capacidade usadas no cálculo da ocupação das salas
+OCCUPANCY_WINDOW_DAYS = 7
+CLASSROOM_HOURS_PER_WEEK = 60  # Segunda a Sexta, 8h-20h
+
+
+def calculate_lesson_duration_hours(start_time: time, end_time: time) -> float:
+    """Calcula a duração de uma aula em horas."""
+    start_dt = datetime.combine(date.today(), start_time)
+    end_dt = datetime.combine(date.today(), end_time)
+    duration = (end_dt - start_dt).total_seconds() / 3600
+    return round(duration, 2)
+
+
+# ============================================
+# PAINÉIS
+# ============================================
+
+
+def compute_summary(db: Session) -> Dict[str, int]:
+    """
+    Indicadores principais: cursos terminados, cursos a decorrer e
+    formandos ativos (utilizadores únicos com role='estudante' e inscrições ativas).
+    """
+    courses_finished = (
+        db.query(CourseModel)
+        .filter(CourseModel.status == CourseStatus.finished)
+        .count()
+    )
+    courses_active = (
+        db.query(CourseModel).filter(CourseModel.status == CourseStatus.active).count()
+    )
+    students_active = (
+        db.query(func.count(func.distinct(EnrollmentModel.user_id)))
+        .join(UserModel, EnrollmentModel.user_id == UserModel.id)
+        .filter(
+            EnrollmentModel.status == EnrollmentStatus.active,
+            UserModel.role == "estudante",
+        )
+        .scalar()
+    )
+    return {
+        "courses_finished": courses_finished,
+        "courses_active": courses_active,
+        "students_active": students_active,
+    }
+
+
+def compute_courses_by_area(db: Session) -> Dict[str, int]:
+    """Nº de cursos por área."""
+    rows = (
+        db.query(CourseModel.area, func.count(CourseModel.id).label("count"))
+        .group_by(CourseModel.area)
+        .all()
+    )
+    return {row.area: row.count for row in rows}
+
+
+def compute_top_trainers(db: Session) -> List[Dict[str, Any]]:
+    """
+    Top 10 de professores com maior nº de horas REALMENTE lecionadas
+    (aulas com data <= hoje).
+    """
+    today = date.today()
+
+    # Apenas as colunas necessárias (professor, início e fim de cada aula)
+    past_lessons = (
+        db.query(
+            CourseModuleModel.trainer_id, LessonModel.start_time, LessonModel.end_time
+        )
+        .join(CourseModuleModel, LessonModel.course_module_id == CourseModuleModel.id)
+        .filter(LessonModel.date <= today)
+        .all()
+    )
+
+    trainer_hours: Dict[int, float] = {}
+    for trainer_id, start_time, end_time in past_lessons:
+        hours = calculate_lesson_duration_hours(start_time, end_time)
+        trainer_hours[trainer_id] = trainer_hours.get(trainer_id, 0.0) + hours
+
+    if not trainer_hours:
+        return []
+
+    sorted_trainers = sorted(trainer_hours.items(), key=lambda x: x[1], reverse=True)[
+        :10
+    ]
+    trainers = (
+        db.query(UserModel.id, UserModel.full_name, UserModel.email)
+        .filter(UserModel.id.in_([trainer_id for trainer_id, _ in sorted_trainers]))
+        .all()
+    )
+    trainer_map = {t.id: t for t in trainers}
+
+    top_trainers = []
+    for trainer_id, hours in sorted_trainers:
+        trainer = trainer_map.get(trainer_id)
+        if trainer:
+            top_trainers.append(
+                {
+                    "id": trainer_id,
+                    "name": trainer.full_name or trainer.email,
+                    "hours": round(hours, 1),
+                }
+            )
+    return top_trainers
+
+
+def compute_courses_running(db: Session) -> List[Dict[str, Any]]:
+    """Lista de cursos a decorrer (detalhes)."""
+    courses = (
+        db.query(CourseModel)
+        .filter(CourseModel.status == CourseStatus.active)
+        .order_by(CourseModel.start_date.desc())
+        .all()
+    )
+    return [
+        {
+            "id": c.id,
+            "name": c.name,
+            "area": c.area,
+            "start_date": c.start_date.isoformat() if c.start_date else None,
+            "end_date": c.end_date.isoformat() if c.end_date else None,
+        }
+        for c in courses
+    ]
+
+
+def compute_courses_starting_soon(db: Session) -> List[Dict[str, Any]]:
+    """Lista de cursos a iniciar nos próximos 60 dias."""
+    today = date.today()
+    courses = (
+        db.query(CourseModel)
+        .filter(
+            CourseModel.status == CourseStatus.planned,
+            CourseModel.start_date >= today,
+            CourseModel.start_date <= today + timedelta(days=STARTING_SOON_DAYS),
+        )
+        .order_by(CourseModel.start_date.asc())
+        .all()
+    )
+    return [
+        {
+            "id": c.id,
+            "name": c.name,
+            "area": c.area,
+            "start_date": c.start_date.isoformat() if c.start_date else None,
+            "days_until_start": (c.start_date - today).days if c.start_date else None,
+        }
+        for c in courses
+    ]
+
+
+def compute_classroom_occupancy(db: Session) -> List[Dict[str, Any]]:
+    """
+    Ocupação das salas nos próximos 7 dias: horas agendadas face à
+    capacidade semanal (CLASSROOM_HOURS_PER_WEEK).
+    Aulas sem sala própria usam a sala padrão do módulo.
+    """
+    today = date.today()
+    classroom_id = func.coalesce(
+        LessonModel.classroom_id, CourseModuleModel.classroom_id
+    )
+
+    lessons = (
+        db.query(classroom_id, LessonModel.start_time, LessonModel.end_time)
+        .join(CourseModuleModel, LessonModel.course_module_id == CourseModuleModel.id)
+        .filter(
+            LessonModel.date >= today,
+            LessonModel.date < today + timedelta(days=OCCUPANCY_WINDOW_DAYS),
+            classroom_id.isnot(None),
+        )
+        .all()
+    )
+
+    booked: Dict[int, Tuple[int, float]] = {}
+    for room_id, start_time, end_time in lessons:
+        count, hours = booked.get(room_id, (0, 0.0))
+        booked[room_id] = (
+            count + 1,
+            hours + calculate_lesson_duration_hours(start_time, end_time),
+        )
+
+    classrooms = (
+        db.query(ClassroomModel.id, ClassroomModel.name, ClassroomModel.is_available)
+        .order_by(ClassroomModel.name)
+        .all()
+    )
+
+    occupancy = []
+    for room in classrooms:
+        count, hours = booked.get(room.id, (0, 0.0))
+        occupancy.append(
+            {
+                "id": room.id,
+                "name": room.name,
+                "is_available": room.is_available,
+                "lessons": count,
+                "hours": round(hours, 1),
+                "occupancy_rate": round(hours / CLASSROOM_HOURS_PER_WEEK, 4),
+            }
+        )
+    return occupancy
+
+
+def compute_lessons_today(db: Session) -> List[Dict[str, Any]]:
+    """
+    Horário do dia: todas as aulas de hoje com curso, módulo, professor e sala,
+    obtidas numa única query com joins.
+    """
+    classroom_id = func.coalesce(
+        LessonModel.classroom_id, CourseModuleModel.classroom_id
+    )
+    rows = (
+        db.query(
+            LessonModel.id,
+            LessonModel.start_time,
+            LessonModel.end_time,
+            CourseModel.id.label("course_id"),
+            CourseModel.name.label("course_name"),
+            ModuleModel.name.label("module_name"),
+            UserModel.full_name.label("trainer_name"),
+            UserModel.email.label("trainer_email"),
+            ClassroomModel.name.label("classroom_name"),
+        )
+        .join(CourseModuleModel, LessonModel.course_module_id == CourseModuleModel.id)
+        .join(CourseModel, CourseModuleModel.course_id == CourseModel.id)
+        .join(ModuleModel, CourseModuleModel.module_id == ModuleModel.id)
+        .join(UserModel, CourseModuleModel.trainer_id == UserModel.id)
+        .outerjoin(ClassroomModel, ClassroomModel.id == classroom_id)
+        .filter(LessonModel.date == date.today())
+        .order_by(LessonModel.start_time)
+        .all()
+    )
+    return [
+        {
+            "id": row.id,
+            "start_time": row.start_time.strftime("%H:%M"),
+            "end_time": row.end_time.strftime("%H:%M"),
+            "course_id": row.course_id,
+            "course_name": row.course_name,
+            "module_name": row.module_name,
+            "trainer_name": row.trainer_name or row.trainer_email,
+            "classroom_name": row.classroom_name,
+        }
+        for row in rows
+    ]
+
+
+# ============================================
+# SNAPSHOTS
+# ============================================
+
+# Painéis pesados materializados todas as noites
+SNAPSHOT_PANELS: Dict[str, Callable[[Session], Any]] = {
+    "courses_by_area": compute_courses_by_area,
+    "top_trainers": compute_top_trainers,
+    "courses_starting_soon": compute_courses_starting_soon,
+    "classroom_occupancy": compute_classroom_occupancy,
+}
+
+
+def precompute_dashboard(db: Session) -> datetime:
+    """
+    Calcula todos os painéis de SNAPSHOT_PANELS e guarda-os na base de dados
+    (uma única transação, todos com a mesma data de cálculo).
+    """
+    computed_at = datetime.now()
+    for panel, compute in SNAPSHOT_PANELS.items():
+        snapshot_crud.save(
+            db, panel=panel, data=compute(db), computed_at=computed_at, commit=False
+        )
+    db.commit()
+    return computed_at
+
+
+def get_last_precompute(db: Session) -> Optional[datetime]:
+    """Data/hora do snapshot mais antigo (None se ainda não existir nenhum)."""
+    snapshots = snapshot_crud.get_by_panels(db, panels=list(SNAPSHOT_PANELS))
+    if len(snapshots) < len(SNAPSHOT_PANELS):
+        return None
+    return min(s.computed_at for s in snapshots)
+
+
+def get_snapshot_panels(
+    db: Session, panels: List[str]
+) -> Tuple[Dict[str, Any], Optional[datetime]]:
+    """
+    Obtém os painéis pedidos a partir dos snapshots.
+    Painéis sem snapshot (ex: primeira execução, antes do scheduler) são
+    calculados na hora, sem os guardar: só o scheduler (ou um refresh
+    explícito) escreve snapshots.
+
+    Returns:
+        (dados por painel, data/hora do snapshot mais antigo usado)
+    """
+    snapshots = {
+        s.panel: s for s in snapshot_crud.get_by_panels(db, panels=panels)
+    }
+    data: Dict[str, Any] = {}
+    computed_at = []
+
+    for panel in panels:
+        snapshot = snapshots.get(panel)
+        if snapshot is None:
+            data[panel] = SNAPSHOT_PANELS[panel](db)
+            computed_at.append(datetime.now())
+        else:
+            data[panel] = snapshot.data
+            computed_at.append(snapshot.computed_at)
+
+    return data, min(computed_at) if computed_at else None
+
+
+# ============================================
+# PAINÉIS EM LOTE
+# ============================================
+
+# Painéis calculados no momento do pedido
+LIVE_PANELS: Dict[str, Callable[[Session], Any]] = {
+    "summary": compute_summary,
+    "courses_running": compute_courses_running,
+    "lessons_today": compute_lessons_today,
+    "enrollment_funnel": get_enrollment_funnel,
+}
+
+AVAILABLE_PANELS = list(LIVE_PANELS) + list(SNAPSHOT_PANELS)
+
+
+def get_panels(db: Session, panels: List[str]) -> Dict[str, Any]:
+    """
+    Calcula vários painéis numa só sessão: os painéis com snapshot são lidos
+    numa única query, os restantes são calculados na hora.
+
+    Returns:
+        {"panels": {nome: dados}, "snapshot_at": data do snapshot mais antigo usado}
+    """
+    snapshot_names = [p for p in panels if p in SNAPSHOT_PANELS]
+    data, snapshot_at = (
+        get_snapshot_panels(db, snapshot_names) if snapshot_names else ({}, None)
+    )
+
+    for panel in panels:
+        if panel in LIVE_PANELS:
+            data[panel] = LIVE_PANELS[panel](db)
+
+    return {
+        "panels": {panel: data[panel] for panel in panels},
+        "snapshot_at": snapshot_at.isoformat() if snapshot_at else None,
+    }
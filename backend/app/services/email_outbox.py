@@ -0,0 +1,273 @@
+"""
+Worker da Caixa de Saída de Email
+---------------------------------
+Loop assíncrono iniciado no lifespan da aplicação que envia os emails da
+tabela email_outbox (ver app.models.email_outbox):
+
+1. Reserva um lote de emails pendentes (UPDATE atómico com um token de reserva,
+   pelo que vários processos podem correr o worker em simultâneo).
+2. Envia o lote numa única ligação SMTP, mantida aberta enquanto houver
+   trabalho (sem um handshake TLS + login por mensagem).
+3. Regista o resultado: enviado, nova tentativa com backoff exponencial
+   (erros temporários) ou falhado (erro permanente / tentativas esgotadas).
+
+Reservas com mais de CLAIM_TIMEOUT (ex: o processo morreu a meio do envio)
+voltam a ficar disponíveis. Quando um email é colocado na fila, o worker é
+acordado de imediato (wake_outbox_worker); caso contrário verifica a tabela
+a cada EMAIL_OUTBOX_POLL_SECONDS.
+
+O trabalho de base de dados corre numa thread para não bloquear o event loop.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Dict, List, Optional, Tuple
+
+import aiosmtplib
+from sqlalchemy import or_
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.email_outbox import EmailOutbox, EmailStatus
+
+logger = logging.getLogger(__name__)
+
+# Reservas mais antigas do que isto são consideradas abandonadas
+CLAIM_TIMEOUT = timedelta(minutes=5)
+# Backoff das novas tentativas: 30 s, 1 min, 2 min, ... até 1 hora
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+_wakeup: Optional[asyncio.Event] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def wake_outbox_worker() -> None:
+    """Acorda o worker (pode ser chamado de qualquer thread)."""
+    if _loop is not None and _wakeup is not None and not _loop.is_closed():
+        _loop.call_soon_threadsafe(_wakeup.set)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Espera antes da tentativa seguinte (backoff exponencial)."""
+    return timedelta(
+        seconds=min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+    )
+
+
+def claim_batch(limit: int) -> List[Dict]:
+    """
+    Reserva até `limit` emails prontos a enviar e devolve os seus dados.
+    """
+    now = datetime.utcnow()
+    token = uuid.uuid4().hex
+    db = SessionLocal()
+    try:
+        ready = (
+            db.query(EmailOutbox.id)
+            .filter(
+                or_(
+                    (EmailOutbox.status == EmailStatus.pending)
+                    & (EmailOutbox.next_attempt_at <= now),
+                    (EmailOutbox.status == EmailStatus.sending)
+                    & (EmailOutbox.claimed_at < now - CLAIM_TIMEOUT),
+                )
+            )
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        # A condição repete-se no UPDATE: outro processo pode ter reservado entretanto
+        db.query(EmailOutbox).filter(
+            EmailOutbox.id.in_(ready),
+            or_(
+                EmailOutbox.status == EmailStatus.pending,
+                EmailOutbox.claimed_at < now - CLAIM_TIMEOUT,
+            ),
+        ).update(
+            {
+                EmailOutbox.status: EmailStatus.sending,
+                EmailOutbox.claim_token: token,
+                EmailOutbox.claimed_at: now,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        rows = (
+            db.query(
+                EmailOutbox.id,
+                EmailOutbox.recipient,
+                EmailOutbox.subject,
+                EmailOutbox.body,
+                EmailOutbox.attempts,
+            )
+            .filter(EmailOutbox.claim_token == token)
+            .order_by(EmailOutbox.id)
+            .all()
+        )
+        return [row._asdict() for row in rows]
+    finally:
+        db.close()
+
+
+def record_results(results: List[Tuple[Dict, Optional[str], bool]]) -> None:
+    """
+    Guarda o resultado de um lote: (email, erro ou None, erro permanente).
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        for item, error, permanent in results:
+            values = {EmailOutbox.claim_token: None, EmailOutbox.claimed_at: None}
+            attempts = item["attempts"] + 1
+            values[EmailOutbox.attempts] = attempts
+            if error is None:
+                values[EmailOutbox.status] = EmailStatus.sent
+                values[EmailOutbox.sent_at] = now
+                values[EmailOutbox.last_error] = None
+            elif permanent or attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                values[EmailOutbox.status] = EmailStatus.failed
+                values[EmailOutbox.last_error] = error
+                logger.error(
+                    f"Email {item['id']} para {item['recipient']} falhou: {error}"
+                )
+            else:
+                values[EmailOutbox.status] = EmailStatus.pending
+                values[EmailOutbox.next_attempt_at] = now + retry_delay(attempts)
+                values[EmailOutbox.last_error] = error
+            db.query(EmailOutbox).filter(EmailOutbox.id == item["id"]).update(
+                values, synchronize_session=False
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def build_message(item: Dict) -> EmailMessage:
+    """Mensagem MIME (HTML) de um email da caixa de saída."""
+    message = EmailMessage()
+    message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+    message["To"] = item["recipient"]
+    message["Subject"] = item["subject"]
+    message.set_content(item["body"], subtype="html")
+    return message
+
+
+class SMTPConnection:
+    """
+    Ligação SMTP reutilizada entre envios (aberta na primeira mensagem e
+    fechada quando a caixa de saída fica vazia ou a ligação falha).
+    """
+
+    def __init__(self):
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            use_tls=settings.MAIL_SSL_TLS,
+            start_tls=settings.MAIL_STARTTLS,
+            validate_certs=False,
+        )
+        await smtp.connect()
+        if settings.MAIL_USERNAME and settings.MAIL_PASSWORD:
+            await smtp.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
+        return smtp
+
+    async def send(self, message: EmailMessage) -> None:
+        """Envia uma mensagem, restabelecendo a ligação uma vez se tiver caído."""
+        if self._smtp is None or not self._smtp.is_connected:
+            self._smtp = await self._connect()
+        try:
+            await self._smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            self._smtp = await self._connect()
+            await self._smtp.send_message(message)
+
+    async def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                if self._smtp.is_connected:
+                    await self._smtp.quit()
+            except aiosmtplib.SMTPException:
+                pass
+            self._smtp = None
+
+
+async def send_batch(connection: SMTPConnection, batch: List[Dict]) -> List:
+    """
+    Envia um lote pela ligação partilhada. Devolve os resultados
+    (email, erro ou None, erro permanente) para record_results.
+    """
+    results = []
+    for index, item in enumerate(batch):
+        try:
+            await connection.send(build_message(item))
+            results.append((item, None, False))
+        except aiosmtplib.SMTPResponseException as e:
+            # 5xx: erro permanente (ex: destinatário inexistente)
+            results.append((item, f"{e.code} {e.message}", 500 <= e.code < 600))
+        except aiosmtplib.SMTPRecipientsRefused as e:
+            results.append((item, str(e), True))
+        except (aiosmtplib.SMTPException, OSError) as e:
+            # Falha de ligação: o resto do lote fica para nova tentativa
+            await connection.close()
+            error = f"Falha na ligação SMTP: {e}"
+            results.extend((pending, error, False) for pending in batch[index:])
+            break
+    return results
+
+
+async def process_outbox_once(connection: SMTPConnection) -> int:
+    """Reserva e envia um lote. Devolve o nº de emails processados."""
+    batch = await asyncio.to_thread(claim_batch, settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not batch:
+        return 0
+    results = await send_batch(connection, batch)
+    await asyncio.to_thread(record_results, results)
+    return len(batch)
+
+
+async def email_outbox_worker(poll_seconds: Optional[float] = None):
+    """
+    Loop assíncrono que envia os emails pendentes.
+
+    Args:
+        poll_seconds: Intervalo entre verificações quando a fila está vazia
+            (default: settings.EMAIL_OUTBOX_POLL_SECONDS)
+    """
+    global _loop, _wakeup
+    _loop = asyncio.get_running_loop()
+    _wakeup = asyncio.Event()
+    poll_seconds = poll_seconds or settings.EMAIL_OUTBOX_POLL_SECONDS
+    connection = SMTPConnection()
+    logger.info("Worker da caixa de saída de email iniciado")
+
+    try:
+        while True:
+            # Limpar antes de reservar: um email colocado na fila durante o
+            # envio acorda o loop logo a seguir
+            _wakeup.clear()
+            try:
+                processed = await process_outbox_once(connection)
+            except Exception as e:
+                logger.error(f"Erro no worker da caixa de saída de email: {e}")
+                processed = 0
+
+            if processed:
+                continue
+
+            # Fila vazia: fechar a ligação e esperar por trabalho
+            await connection.close()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await connection.close()
+        _loop = _wakeup = None
@@ -0,0 +1,114 @@
+"""
+Serviço de Estatísticas de Inscrições (Funil)
+---------------------------------------------
+Agrega as inscrições por curso e por área:
+- Inscritos, ativos, concluídos e desistentes
+- Taxa de desistência e momento da desistência face ao início do curso
+- Média da nota final
+
+O resultado é calculado numa única query agrupada e fica em cache até à
+próxima escrita em inscrições ou cursos (ver app.core.cache).
+"""
+
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache, get_generation
+from app.crud import enrollment as enrollment_crud
+
+# Campos somados ao agregar cursos por área
+_SUM_FIELDS = (
+    "enrolled",
+    "active",
+    "completed",
+    "dropped",
+    "graded",
+    "final_grade_sum",
+    "dropout_dated",
+    "dropout_days_sum",
+    "dropped_before_start",
+    "dropped_first_30_days",
+    "dropped_31_90_days",
+    "dropped_after_90_days",
+)
+
+_funnel_cache = TTLCache(maxsize=1)
+
+
+def _finalize(totals: Dict) -> Dict:
+    """Converte as somas de uma linha/grupo nas métricas finais."""
+    enrolled = totals["enrolled"]
+    return {
+        "enrolled": enrolled,
+        "active": totals["active"],
+        "completed": totals["completed"],
+        "dropped": totals["dropped"],
+        "completion_rate": (
+            round(totals["completed"] / enrolled, 4) if enrolled else None
+        ),
+        "dropout_rate": round(totals["dropped"] / enrolled, 4) if enrolled else None,
+        "average_final_grade": round(totals["final_grade_sum"] / totals["graded"], 2)
+        if totals["graded"]
+        else None,
+        "dropout_timing": {
+            "average_days_after_start": round(
+                totals["dropout_days_sum"] / totals["dropout_dated"], 1
+            )
+            if totals["dropout_dated"]
+            else None,
+            "before_start": totals["dropped_before_start"],
+            "first_30_days": totals["dropped_first_30_days"],
+            "days_31_90": totals["dropped_31_90_days"],
+            "after_90_days": totals["dropped_after_90_days"],
+            "unknown_date": totals["dropped"] - totals["dropout_dated"],
+        },
+    }
+
+
+def compute_enrollment_funnel(db: Session) -> Dict[str, List[Dict]]:
+    """
+    Calcula o funil de inscrições por curso e por área (sem cache).
+    """
+    courses = []
+    areas: Dict[str, Dict] = {}
+
+    for row in enrollment_crud.get_funnel_rows(db):
+        totals = {field: getattr(row, field) for field in _SUM_FIELDS}
+        courses.append(
+            {
+                "course_id": row.course_id,
+                "course_name": row.course_name,
+                "area": row.area,
+                "start_date": row.start_date.isoformat() if row.start_date else None,
+                **_finalize(totals),
+            }
+        )
+
+        area_totals = areas.setdefault(
+            row.area, {"courses": 0, **{field: 0 for field in _SUM_FIELDS}}
+        )
+        area_totals["courses"] += 1
+        for field in _SUM_FIELDS:
+            area_totals[field] += totals[field]
+
+    return {
+        "by_course": courses,
+        "by_area": [
+            {"area": area, "courses": totals["courses"], **_finalize(totals)}
+            for area, totals in areas.items()
+        ],
+    }
+
+
+def get_enrollment_funnel(db: Session) -> Dict[str, List[Dict]]:
+    """
+    Devolve o funil de inscrições, reutilizando o último resultado enquanto
+    não houver escritas em inscrições ou cursos.
+    """
+    key = (get_generation("enrollments"), get_generation("courses"))
+    result = _funnel_cache.get(key)
+    if result is None:
+        result = compute_enrollment_funnel(db)
+        _funnel_cache.set(key, result)
+    return result
@@ -0,0 +1,230 @@
+"""
+Serviço de Armazenamento de Ficheiros
+-------------------------------------
+Gravação dos ficheiros enviados pelos utilizadores (uploads) na pasta
+backend/uploads/.
+
+O ficheiro é copiado em blocos (UPLOAD_CHUNK_SIZE), com a escrita em disco e
+o cálculo do checksum SHA-256 numa thread, sem bloquear o event loop. O
+tamanho máximo (settings.MAX_UPLOAD_SIZE) é verificado durante a cópia: um
+ficheiro demasiado grande é interrompido e apagado. A cópia é feita para um
+ficheiro temporário (".part") que só é renomeado no fim, pelo que nunca fica
+um ficheiro incompleto no destino.
+
+Armazenamento por conteúdo: cada conteúdo distinto é guardado uma única vez
+em uploads/blobs/<ab>/<sha256> (ver app.models.file_blob). Um upload igual a
+um já existente só cria o registo UserFile e incrementa a contagem de
+referências; o ficheiro físico só é apagado quando a última referência é
+removida.
+
+Nota: as operações sobre os conteúdos são serializadas por um lock local ao
+processo (worker do uvicorn).
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, UploadFile, status
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import file_blob as file_blob_crud
+from app.crud import user_file as user_file_crud
+from app.models.user import User
+from app.models.user_files import UserFile
+
+# Pasta base dos uploads (backend/uploads/)
+UPLOADS_ROOT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "uploads",
+)
+# Conteúdos (um ficheiro por checksum) e uploads ainda em curso
+BLOBS_DIR = os.path.join(UPLOADS_ROOT, "blobs")
+TMP_DIR = os.path.join(UPLOADS_ROOT, "tmp")
+# Tamanho de cada bloco lido/escrito
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Espaço livre mínimo a manter no disco dos uploads
+MIN_FREE_DISK_SPACE = 100 * 1024 * 1024
+
+# Serializa contagem de referências + ficheiro físico de cada conteúdo
+_blob_lock = threading.Lock()
+
+
+def upload_too_large() -> HTTPException:
+    limit_mb = settings.MAX_UPLOAD_SIZE / (1024 * 1024)
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Ficheiro demasiado grande (máximo {limit_mb:g} MB)",
+    )
+
+
+def _check_disk_space(folder: str, size: int) -> None:
+    if shutil.disk_usage(folder).free - size < MIN_FREE_DISK_SPACE:
+        raise HTTPException(
+            status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+            detail="Espaço em disco insuficiente para guardar o ficheiro",
+        )
+
+
+def _write_chunk(out, digest, chunk: bytes) -> None:
+    out.write(chunk)
+    digest.update(chunk)
+
+
+async def save_upload(upload: UploadFile, destination: str) -> Tuple[int, str]:
+    """
+    Guarda o upload em `destination` (caminho absoluto), por blocos.
+    Devolve (tamanho em bytes, checksum SHA-256 em hex).
+
+    Lança 413 se o ficheiro exceder settings.MAX_UPLOAD_SIZE e 507 se não
+    houver espaço em disco.
+    """
+    max_size = settings.MAX_UPLOAD_SIZE
+    if upload.size is not None and upload.size > max_size:
+        raise upload_too_large()
+
+    folder = os.path.dirname(destination)
+    os.makedirs(folder, exist_ok=True)
+    _check_disk_space(folder, upload.size or 0)
+
+    temp_path = f"{destination}.part"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        out = await anyio.to_thread.run_sync(open, temp_path, "wb")
+        try:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise upload_too_large()
+                await anyio.to_thread.run_sync(_write_chunk, out, digest, chunk)
+        finally:
+            await anyio.to_thread.run_sync(out.close)
+        await anyio.to_thread.run_sync(os.replace, temp_path, destination)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return size, digest.hexdigest()
+
+
+def _absolute_path(relative_path: str) -> str:
+    """Caminho relativo à pasta backend/ (ex: 'uploads/blobs/..') -> absoluto."""
+    return os.path.join(os.path.dirname(UPLOADS_ROOT), relative_path)
+
+
+def blob_relative_path(checksum: str) -> str:
+    """Caminho (relativo à pasta backend/) do conteúdo com este checksum."""
+    return f"uploads/blobs/{checksum[:2]}/{checksum}"
+
+
+async def receive_upload(upload: UploadFile) -> Tuple[str, int, str]:
+    """
+    Recebe o upload para um ficheiro temporário (ver save_upload).
+    Devolve (caminho temporário, tamanho, checksum SHA-256).
+    """
+    temp_path = os.path.join(TMP_DIR, uuid.uuid4().hex)
+    size, checksum = await save_upload(upload, temp_path)
+    return temp_path, size, checksum
+
+
+def store_user_file(
+    db: Session,
+    *,
+    temp_path: str,
+    size: int,
+    checksum: str,
+    user_id: int,
+    filename: str,
+    file_type: Optional[str] = None,
+) -> UserFile:
+    """
+    Cria o registo UserFile para um upload recebido com receive_upload.
+    Se o conteúdo já existir, o ficheiro temporário é descartado e apenas a
+    contagem de referências é incrementada.
+    """
+    relative_path = blob_relative_path(checksum)
+    blob_path = _absolute_path(relative_path)
+    with _blob_lock:
+        placed = False
+        try:
+            file_blob_crud.acquire(
+                db, checksum=checksum, size=size, file_path=relative_path
+            )
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.replace(temp_path, blob_path)
+                placed = True
+            # Commit do conteúdo e do registo do ficheiro
+            return user_file_crud.create_for_user(
+                db,
+                user_id=user_id,
+                filename=filename,
+                file_path=relative_path,
+                file_type=file_type,
+                size=size,
+                checksum=checksum,
+            )
+        except BaseException:
+            db.rollback()
+            # Sem commit, o conteúdo colocado por esta chamada fica sem referências
+            if placed and os.path.exists(blob_path):
+                os.remove(blob_path)
+            raise
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def _release_user_file(db: Session, db_file: UserFile) -> Optional[str]:
+    """
+    Remove o registo do ficheiro (sem commit) e devolve o caminho do ficheiro
+    físico que deixa de ter referências (None se o conteúdo ainda for usado).
+    """
+    # Ficheiros anteriores ao armazenamento por conteúdo não têm FileBlob
+    if db_file.blob is None:
+        orphan_path = db_file.file_path
+    else:
+        released = file_blob_crud.release(db, checksum=db_file.checksum)
+        orphan_path = released.file_path if released else None
+    db.delete(db_file)
+    return orphan_path
+
+
+def _remove_orphans(orphan_paths) -> None:
+    for orphan_path in orphan_paths:
+        if orphan_path and os.path.exists(_absolute_path(orphan_path)):
+            os.remove(_absolute_path(orphan_path))
+
+
+def delete_user_file(db: Session, db_file: UserFile) -> UserFile:
+    """
+    Elimina o registo do ficheiro e, se for a última referência ao
+    conteúdo, o ficheiro físico.
+    """
+    with _blob_lock:
+        orphan_path = _release_user_file(db, db_file)
+        db.commit()
+        _remove_orphans([orphan_path])
+    return db_file
+
+
+def delete_user_files(db: Session, user: User) -> int:
+    """
+    Elimina todos os ficheiros de um utilizador (antes de o remover): sem
+    isto, o cascade do ORM apagava os registos sem libertar os conteúdos.
+    Devolve o nº de ficheiros eliminados.
+    """
+    with _blob_lock:
+        files = list(user.files)
+        orphan_paths = [_release_user_file(db, db_file) for db_file in files]
+        db.commit()
+        _remove_orphans(orphan_paths)
+    return len(files)
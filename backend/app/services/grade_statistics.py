@@ -0,0 +1,130 @@
+"""
+Serviço de Estatísticas de Notas
+--------------------------------
+Calcula a distribuição das notas (escala 0-20) por módulo do curso e por curso:
+- Média, mediana e percentis
+- Taxa de aprovação
+- Histograma
+
+Todas as notas são obtidas numa única query colunar e processadas de forma
+vetorizada com numpy, em vez de paginar notas individuais.
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# Escala de avaliação
+GRADE_MIN = 0.0
+GRADE_MAX = 20.0
+
+# Percentis calculados para cada grupo
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def summarize_grades(
+    grades: np.ndarray, pass_mark: float = 10.0, bins: int = 20
+) -> Dict:
+    """
+    Calcula as métricas de distribuição para um vetor de notas.
+    """
+    if grades.size == 0:
+        return {
+            "count": 0,
+            "mean": None,
+            "median": None,
+            "std": None,
+            "min": None,
+            "max": None,
+            "percentiles": {f"p{p}": None for p in PERCENTILES},
+            "pass_rate": None,
+            "histogram": {"edges": [], "counts": []},
+        }
+
+    percentile_values = np.percentile(grades, PERCENTILES)
+    counts, edges = np.histogram(grades, bins=bins, range=(GRADE_MIN, GRADE_MAX))
+
+    return {
+        "count": int(grades.size),
+        "mean": round(float(grades.mean()), 2),
+        "median": round(float(np.median(grades)), 2),
+        "std": round(float(grades.std()), 2),
+        "min": round(float(grades.min()), 2),
+        "max": round(float(grades.max()), 2),
+        "percentiles": {
+            f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, percentile_values)
+        },
+        "pass_rate": round(
+            float(np.count_nonzero(grades >= pass_mark)) / grades.size, 4
+        ),
+        "histogram": {
+            "edges": [round(float(e), 2) for e in edges],
+            "counts": counts.tolist(),
+        },
+    }
+
+
+def _group_boundaries(keys: np.ndarray) -> np.ndarray:
+    """
+    Devolve os índices onde começa cada grupo num vetor de chaves ordenado.
+    """
+    if keys.size == 0:
+        return np.array([], dtype=int)
+    return np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+
+def build_grade_report(
+    rows: Sequence[tuple], pass_mark: float = 10.0, bins: int = 20
+) -> List[Dict]:
+    """
+    Constrói o relatório de distribuição de notas.
+
+    Args:
+        rows: Tuplos (course_id, course_name, course_module_id, module_name, grade)
+              ordenados por curso e módulo (ver CRUDModuleGrade.get_grade_columns)
+        pass_mark: Nota mínima para aprovação
+        bins: Número de classes do histograma
+
+    Returns:
+        Lista de cursos, cada um com o resumo global e o resumo por módulo.
+    """
+    if not rows:
+        return []
+
+    course_ids, course_names, cm_ids, module_names, grades = zip(*rows)
+    course_ids = np.asarray(course_ids)
+    cm_ids = np.asarray(cm_ids)
+    grades = np.asarray(grades, dtype=float)
+
+    report = []
+    course_starts = _group_boundaries(course_ids)
+    course_ends = np.append(course_starts[1:], course_ids.size)
+
+    for c_start, c_end in zip(course_starts, course_ends):
+        course_grades = grades[c_start:c_end]
+        course_cm_ids = cm_ids[c_start:c_end]
+
+        modules = []
+        module_starts = _group_boundaries(course_cm_ids)
+        module_ends = np.append(module_starts[1:], course_cm_ids.size)
+        for m_start, m_end in zip(module_starts, module_ends):
+            modules.append(
+                {
+                    "course_module_id": int(course_cm_ids[m_start]),
+                    "module_name": module_names[c_start + m_start],
+                    **summarize_grades(
+                        course_grades[m_start:m_end], pass_mark=pass_mark, bins=bins
+                    ),
+                }
+            )
+
+        report.append(
+            {
+                "course_id": int(course_ids[c_start]),
+                "course_name": course_names[c_start],
+                **summarize_grades(course_grades, pass_mark=pass_mark, bins=bins),
+                "modules": modules,
+            }
+        )
+
+    return report
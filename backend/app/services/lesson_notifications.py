@@ -0,0 +1,119 @@
+"""
+Serviço de Notificações de Alterações de Horário
+------------------------------------------------
+Quando uma aula é alterada (data, hora ou sala), removida ou quando uma série
+de aulas é adiada/antecipada, avisa por email todos os alunos com inscrição
+ativa no curso e o professor do módulo.
+
+- Os destinatários são obtidos numa única query (utilizadores + inscrições).
+- As mensagens são colocadas na caixa de saída num único commit e enviadas
+  pelo worker em lotes numa só ligação SMTP (ver app.services.email_outbox):
+  o pedido não espera pelo envio.
+- Numa alteração de várias aulas, cada destinatário recebe um único email
+  com todas as alterações.
+"""
+
+from dataclasses import dataclass
+from datetime import date, time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import exists, or_
+from sqlalchemy.orm import Session, joinedload
+
+from app.core import email
+from app.core.email_templates import render_email
+from app.models.course_module import CourseModule
+from app.models.enrollment import Enrollment, EnrollmentStatus
+from app.models.lesson import Lesson
+from app.models.user import User
+
+
+@dataclass
+class LessonSlot:
+    """Data, horário e sala de uma aula (antes ou depois da alteração)."""
+
+    date: date
+    start_time: time
+    end_time: time
+    classroom: Optional[str] = None
+
+    @classmethod
+    def from_lesson(cls, lesson: Lesson) -> "LessonSlot":
+        classroom = lesson.classroom or lesson.course_module.classroom
+        return cls(
+            date=lesson.date,
+            start_time=lesson.start_time,
+            end_time=lesson.end_time,
+            classroom=classroom.name if classroom else None,
+        )
+
+    def describe(self) -> str:
+        text = (
+            f"{self.date:%d/%m/%Y}, "
+            f"{self.start_time:%H:%M}-{self.end_time:%H:%M}"
+        )
+        return f"{text} ({self.classroom})" if self.classroom else text
+
+
+# Alteração de uma aula: (antes, depois). "depois" é None se a aula foi removida.
+LessonChange = Tuple[LessonSlot, Optional[LessonSlot]]
+
+
+def get_recipients(db: Session, course_module_id: int) -> List[Tuple[str, str]]:
+    """
+    (email, nome) dos alunos com inscrição ativa no curso do módulo e do
+    professor do módulo, numa única query.
+    """
+    active_enrollment = exists().where(
+        Enrollment.user_id == User.id,
+        Enrollment.course_id == CourseModule.course_id,
+        Enrollment.status == EnrollmentStatus.active,
+    )
+    rows = (
+        db.query(User.email, User.full_name)
+        .join(CourseModule, CourseModule.id == course_module_id)
+        .filter(
+            User.is_active.is_(True),
+            or_(User.id == CourseModule.trainer_id, active_enrollment),
+        )
+        .distinct()
+        .all()
+    )
+    return [(row.email, row.full_name or row.email) for row in rows]
+
+
+def notify_lesson_changes(
+    db: Session, course_module_id: int, changes: List[LessonChange]
+) -> int:
+    """
+    Coloca na caixa de saída um email por destinatário com as alterações
+    indicadas. Devolve o nº de emails.
+    """
+    if not changes:
+        return 0
+    course_module = (
+        db.query(CourseModule)
+        .options(joinedload(CourseModule.course), joinedload(CourseModule.module))
+        .filter(CourseModule.id == course_module_id)
+        .first()
+    )
+    if course_module is None:
+        return 0
+
+    course = course_module.course.name if course_module.course else ""
+    module = course_module.module.name if course_module.module else ""
+
+    def message(recipient: str, name: str) -> Tuple[str, str, str]:
+        subject, html = render_email(
+            "lesson_change.html",
+            name=name,
+            course=course,
+            module=module,
+            changes=changes,
+        )
+        return recipient, subject, html
+
+    recipients = get_recipients(db, course_module_id)
+    return email.enqueue_emails(
+        db, (message(recipient, name) for recipient, name in recipients)
+    )
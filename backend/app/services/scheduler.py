@@ -0,0 +1,80 @@
+"""
+Scheduler de Tarefas em Background
+----------------------------------
+Loop assíncrono iniciado no lifespan da aplicação que executa periodicamente:
+1. Atualização do status dos cursos (a cada ciclo)
+2. Pré-cálculo noturno dos agregados do Dashboard (uma vez por dia, a partir
+   de settings.DASHBOARD_PRECOMPUTE_HOUR, ou de imediato se não houver snapshots)
+
+O trabalho de base de dados corre numa thread para não bloquear o event loop.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, time
+from typing import Optional
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.course_status_updater import update_course_statuses
+from app.services.dashboard import get_last_precompute, precompute_dashboard
+
+logger = logging.getLogger(__name__)
+
+
+def is_precompute_due(last_run: Optional[datetime], now: datetime, hour: int) -> bool:
+    """
+    Indica se os snapshots do Dashboard devem ser recalculados:
+    nunca foram calculados, ou já passou a hora agendada de hoje desde o último cálculo.
+    """
+    if last_run is None:
+        return True
+    scheduled_today = datetime.combine(now.date(), time(hour=hour))
+    return now >= scheduled_today and last_run < scheduled_today
+
+
+def run_scheduled_jobs() -> None:
+    """
+    Executa um ciclo de tarefas agendadas (síncrono, numa sessão própria).
+    """
+    db = SessionLocal()
+    try:
+        # 1. Status dos cursos
+        result = update_course_statuses(db)
+        if result["to_active"] or result["to_finished"]:
+            logger.info(
+                f"Status de cursos atualizado: "
+                f"{result['to_active']} -> active, "
+                f"{result['to_finished']} -> finished"
+            )
+
+        # 2. Snapshots do Dashboard (depois dos status, para refletir o dia atual)
+        now = datetime.now()
+        if is_precompute_due(
+            get_last_precompute(db), now, settings.DASHBOARD_PRECOMPUTE_HOUR
+        ):
+            computed_at = precompute_dashboard(db)
+            logger.info(
+                f"Snapshots do Dashboard recalculados ({computed_at:%Y-%m-%d %H:%M})"
+            )
+    finally:
+        db.close()
+
+
+async def background_scheduler(interval_minutes: int = 60):
+    """
+    Loop assíncrono que executa as tarefas agendadas periodicamente.
+
+    Args:
+        interval_minutes: Intervalo entre ciclos (default: 60 minutos)
+    """
+    logger.info(f"Scheduler iniciado (intervalo: {interval_minutes} minutos)")
+
+    while True:
+        try:
+            await asyncio.to_thread(run_scheduled_jobs)
+        except Exception as e:
+            logger.error(f"Erro ao executar tarefas agendadas: {e}")
+
+        # Aguardar até próximo ciclo
+        await asyncio.sleep(interval_minutes * 60)
@@ -0,0 +1,365 @@
+"""
+Índice de Pesquisa Full-Text (SQLite FTS5)
+------------------------------------------
+Mantém duas tabelas virtuais FTS5, sincronizadas por triggers SQL
+(insert/update/delete), pelo que qualquer escrita nas tabelas de origem
+atualiza os índices:
+
+1. 'search_index' - texto pesquisável de cursos (nome, área, descrição),
+   utilizadores (nome, email), módulos (nome, área) e salas (nome, tipo).
+   O tokenizer 'unicode61 remove_diacritics 2' ignora maiúsculas e acentos
+   ("joao" encontra "João"). Os resultados são ordenados por relevância
+   (bm25), com o título (nome) a pesar mais do que o corpo (área, descrição,
+   email).
+
+2. 'search_trigram_index' - trigramas do nome normalizado (coluna search_name,
+   ver app.core.text). Permite pesquisa aproximada, tolerante a erros
+   ortográficos ("goncalo" encontra "Gonçalo", "joao slva" encontra
+   "João Silva"), com ordenação por semelhança.
+
+Cada linha dos índices usa como rowid:
+id_da_entidade * ENTITY_SLOTS + código_da_entidade, o que permite
+apagar/atualizar uma entrada diretamente pelo rowid.
+
+Como o índice 'search_index' guarda todas as entidades, a pesquisa global
+(grouped_search) obtém os resultados de todos os grupos, e as respetivas
+contagens, numa única query.
+
+Se a base de dados não suportar FTS5 (ex: outro motor que não SQLite),
+is_search_index_available devolve False e os routers usam ILIKE.
+"""
+
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import Float, Integer, text
+from sqlalchemy.engine import Engine
+
+from app.core.text import normalize_text, trigram_similarity, trigrams
+
+logger = logging.getLogger(__name__)
+
+# Nº de "slots" por id no rowid (máximo de tipos de entidade diferentes)
+ENTITY_SLOTS = 16
+
+ENTITY_CODES: Dict[str, int] = {
+    "course": 1,
+    "user": 2,
+    "module": 3,
+    "classroom": 4,
+}
+
+# Versão da definição dos índices. Ao alterar entidades ou colunas indexadas,
+# incrementar para que os índices sejam reconstruídos no próximo arranque
+# (guardada no PRAGMA user_version do SQLite).
+SEARCH_INDEX_VERSION = 3
+
+# Grupos devolvidos pela pesquisa global (os utilizadores dividem-se por role)
+SEARCH_GROUPS = ("courses", "students", "trainers", "modules", "classrooms")
+
+# Peso das colunas no ranking bm25 (title, body)
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+# Pesquisa aproximada: nº máximo de candidatos obtidos do índice de trigramas
+# e semelhança mínima para um resultado ser aceite
+FUZZY_CANDIDATES = 200
+FUZZY_MIN_SIMILARITY = 0.3
+
+# Tabelas de origem: tabela, colunas que disparam a atualização
+_SOURCE_TABLES = {
+    "course": ("courses", ("name", "area", "description", "search_name")),
+    "user": ("users", ("full_name", "email", "search_name")),
+    "module": ("modules", ("name", "area")),
+    "classroom": ("classrooms", ("name", "type")),
+}
+
+# Definição de cada índice: tokenizer, colunas e expressões SQL por entidade
+# (uma entidade pode não estar presente em todos os índices)
+_INDEXES = {
+    "search_index": {
+        "tokenize": "unicode61 remove_diacritics 2",
+        "columns": ("title", "body"),
+        "values": {
+            "course": (
+                "new.name",
+                "coalesce(new.area, '') || ' ' || coalesce(new.description, '')",
+            ),
+            "user": ("coalesce(new.full_name, '')", "new.email"),
+            "module": ("new.name", "coalesce(new.area, '')"),
+            "classroom": ("new.name", "coalesce(new.type, '')"),
+        },
+    },
+    "search_trigram_index": {
+        "tokenize": "trigram",
+        "columns": ("name",),
+        "values": {
+            "course": ("coalesce(new.search_name, '')",),
+            "user": ("coalesce(new.search_name, '')",),
+        },
+    },
+}
+
+_available: Optional[bool] = None
+
+
+def _rowid(alias: str, entity: str) -> str:
+    return f"{alias}.id * {ENTITY_SLOTS} + {ENTITY_CODES[entity]}"
+
+
+def _insert_sql(index: str, entity: str) -> str:
+    definition = _INDEXES[index]
+    columns = ", ".join(definition["columns"])
+    values = ", ".join(definition["values"][entity])
+    return (
+        f"INSERT INTO {index}(rowid, {columns}) "
+        f"VALUES ({_rowid('new', entity)}, {values});"
+    )
+
+
+def _indexes_for(entity: str) -> List[str]:
+    """Índices onde a entidade está presente."""
+    return [index for index, d in _INDEXES.items() if entity in d["values"]]
+
+
+def _ddl_statements():
+    """Gera o DDL das tabelas virtuais e dos triggers de sincronização."""
+    for index, definition in _INDEXES.items():
+        yield (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+            f"{', '.join(definition['columns'])}, "
+            f"tokenize = '{definition['tokenize']}')"
+        )
+
+    for entity, (table, columns) in _SOURCE_TABLES.items():
+        indexes = _indexes_for(entity)
+        inserts = " ".join(_insert_sql(index, entity) for index in indexes)
+        deletes = " ".join(
+            f"DELETE FROM {index} WHERE rowid = {_rowid('old', entity)};"
+            for index in indexes
+        )
+        # Recriar sempre os triggers, para refletir alterações na definição
+        for suffix in ("ai", "au", "ad"):
+            yield f"DROP TRIGGER IF EXISTS search_index_{table}_{suffix}"
+        yield (
+            f"CREATE TRIGGER search_index_{table}_ai "
+            f"AFTER INSERT ON {table} BEGIN {inserts} END"
+        )
+        yield (
+            f"CREATE TRIGGER search_index_{table}_au "
+            f"AFTER UPDATE OF {', '.join(columns)} ON {table} "
+            f"BEGIN {deletes} {inserts} END"
+        )
+        yield (
+            f"CREATE TRIGGER search_index_{table}_ad "
+            f"AFTER DELETE ON {table} BEGIN {deletes} END"
+        )
+
+
+def rebuild_search_index(engine: Engine) -> None:
+    """
+    Reconstrói os índices a partir das tabelas de origem.
+    """
+    with engine.begin() as conn:
+        for index, definition in _INDEXES.items():
+            conn.execute(text(f"DELETE FROM {index}"))
+            for entity, values in definition["values"].items():
+                table = _SOURCE_TABLES[entity][0]
+                columns = ", ".join(definition["columns"])
+                conn.execute(
+                    text(
+                        f"INSERT INTO {index}(rowid, {columns}) "
+                        f"SELECT {_rowid('new', entity)}, "
+                        f"{', '.join(values)} FROM {table} AS new"
+                    )
+                )
+
+
+def ensure_search_index(engine: Engine) -> bool:
+    """
+    Cria as tabelas FTS5 e os triggers e preenche os índices na primeira execução
+    (ou quando SEARCH_INDEX_VERSION muda). Chamado no arranque da aplicação.
+
+    Returns:
+        True se os índices estão disponíveis.
+    """
+    global _available
+
+    if engine.dialect.name != "sqlite":
+        _available = False
+        return False
+
+    try:
+        with engine.begin() as conn:
+            existing = {
+                row[0]
+                for row in conn.execute(
+                    text("SELECT name FROM sqlite_master WHERE type = 'table'")
+                )
+            }
+            version = conn.execute(text("PRAGMA user_version")).scalar()
+            for statement in _ddl_statements():
+                conn.execute(text(statement))
+        if not set(_INDEXES) <= existing or version < SEARCH_INDEX_VERSION:
+            rebuild_search_index(engine)
+            with engine.begin() as conn:
+                conn.execute(text(f"PRAGMA user_version = {SEARCH_INDEX_VERSION}"))
+            logger.info("Índices de pesquisa FTS5 criados e preenchidos")
+        _available = True
+    except Exception as e:
+        logger.warning(f"Índice FTS5 indisponível, a usar ILIKE: {e}")
+        _available = False
+
+    return _available
+
+
+def is_search_index_available() -> bool:
+    """Indica se os índices FTS5 foram criados com sucesso."""
+    return bool(_available)
+
+
+def build_match_query(q: str) -> Optional[str]:
+    """
+    Converte o termo pesquisado numa expressão MATCH do FTS5:
+    cada palavra é pesquisada como prefixo ("gon" encontra "Gonçalo").
+    Devolve None se o termo não tiver palavras pesquisáveis.
+    """
+    tokens = re.findall(r"\w+", q, flags=re.UNICODE)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def match_subquery(entity: str, match_query: str):
+    """
+    Subquery com (entity_id, rank) das entradas de `entity` que correspondem
+    à pesquisa. Rank menor = mais relevante (bm25).
+
+    Uso:
+        hits = match_subquery("course", build_match_query(q))
+        db.query(Course).join(hits, hits.c.entity_id == Course.id).order_by(hits.c.rank)
+    """
+    return (
+        text(
+            f"SELECT rowid / {ENTITY_SLOTS} AS entity_id, "
+            f"bm25(search_index, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS rank "
+            f"FROM search_index "
+            f"WHERE search_index MATCH :match_query "
+            f"AND rowid % {ENTITY_SLOTS} = :entity_code"
+        )
+        .bindparams(match_query=match_query, entity_code=ENTITY_CODES[entity])
+        .columns(entity_id=Integer, rank=Float)
+        .subquery(f"{entity}_hits")
+    )
+
+
+def fuzzy_subquery(entity: str, q: str):
+    """
+    Subquery com (entity_id, rank) dos candidatos mais prováveis para uma
+    pesquisa aproximada: entradas do índice de trigramas que partilham
+    trigramas com o termo, ordenadas por bm25 e limitadas a FUZZY_CANDIDATES.
+    Devolve None se o termo não tiver trigramas (menos de 3 letras).
+    """
+    # Apenas trigramas interiores às palavras (o índice não tem os delimitadores)
+    query_trigrams = {t for t in trigrams(normalize_text(q)) if " " not in t}
+    if not query_trigrams:
+        return None
+
+    match_query = " OR ".join(f'"{t}"' for t in sorted(query_trigrams))
+    return (
+        text(
+            f"SELECT rowid / {ENTITY_SLOTS} AS entity_id, "
+            f"bm25(search_trigram_index) AS rank "
+            f"FROM search_trigram_index "
+            f"WHERE search_trigram_index MATCH :match_query "
+            f"AND rowid % {ENTITY_SLOTS} = :entity_code "
+            f"ORDER BY rank LIMIT :limit"
+        )
+        .bindparams(
+            match_query=match_query,
+            entity_code=ENTITY_CODES[entity],
+            limit=FUZZY_CANDIDATES,
+        )
+        .columns(entity_id=Integer, rank=Float)
+        .subquery(f"{entity}_fuzzy_hits")
+    )
+
+
+def rank_by_similarity(
+    q: str, items: List[Any], key: Callable[[Any], Optional[str]]
+) -> List[Any]:
+    """
+    Ordena os candidatos por semelhança de trigramas com o termo pesquisado,
+    descartando os que ficam abaixo de FUZZY_MIN_SIMILARITY.
+    """
+    normalized = normalize_text(q)
+    scored = [(trigram_similarity(normalized, key(item) or ""), item) for item in items]
+    scored = [pair for pair in scored if pair[0] >= FUZZY_MIN_SIMILARITY]
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return [item for _, item in scored]
+
+
+def grouped_search(db, match_query: str, limit: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Pesquisa global: devolve, para cada grupo de SEARCH_GROUPS, o nº total de
+    resultados e os `limit` mais relevantes.
+
+    Tudo é resolvido numa única query ao índice: o grupo de cada entrada é
+    derivado do código da entidade (e da role, no caso dos utilizadores), e as
+    contagens e posições por grupo são calculadas com window functions.
+    """
+    rows = db.execute(
+        text(
+            f"""
+            SELECT grp, entity_id, title, body, rank, group_total
+            FROM (
+                SELECT hits.*,
+                       count(*) OVER (PARTITION BY grp) AS group_total,
+                       row_number() OVER (
+                           PARTITION BY grp ORDER BY rank, entity_id
+                       ) AS position
+                FROM (
+                    SELECT
+                        CASE search_index.rowid % {ENTITY_SLOTS}
+                            WHEN {ENTITY_CODES['course']} THEN 'courses'
+                            WHEN {ENTITY_CODES['module']} THEN 'modules'
+                            WHEN {ENTITY_CODES['classroom']} THEN 'classrooms'
+                            WHEN {ENTITY_CODES['user']} THEN
+                                CASE users.role
+                                    WHEN 'estudante' THEN 'students'
+                                    WHEN 'professor' THEN 'trainers'
+                                END
+                        END AS grp,
+                        search_index.rowid / {ENTITY_SLOTS} AS entity_id,
+                        search_index.title AS title,
+                        search_index.body AS body,
+                        bm25(search_index, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS rank
+                    FROM search_index
+                    LEFT JOIN users
+                        ON search_index.rowid % {ENTITY_SLOTS} = {ENTITY_CODES['user']}
+                        AND users.id = search_index.rowid / {ENTITY_SLOTS}
+                    WHERE search_index MATCH :match_query
+                ) AS hits
+                WHERE grp IS NOT NULL
+            )
+            WHERE position <= :limit
+            ORDER BY grp, position
+            """
+        ),
+        {"match_query": match_query, "limit": limit},
+    ).all()
+
+    groups = {group: {"total": 0, "items": []} for group in SEARCH_GROUPS}
+    for row in rows:
+        group = groups[row.grp]
+        group["total"] = row.group_total
+        group["items"].append(
+            {
+                "id": row.entity_id,
+                "title": row.title,
+                "subtitle": row.body.strip() or None,
+                "rank": row.rank,
+            }
+        )
+    return groups
@@ -0,0 +1,236 @@
+"""
+Serviço de Importação de Utilizadores
+-------------------------------------
+Importação em massa de utilizadores a partir de um ficheiro CSV ou JSON
+(ex: a lista de alunos de uma nova turma).
+
+Passos:
+1. Leitura e validação de todas as linhas (erros reportados por linha).
+2. Emails repetidos no ficheiro ou já registados (uma única query) são recusados.
+3. As passwords fornecidas são encriptadas em paralelo num pool de processos
+   (o Argon2 é pesado em CPU; ver PASSWORD_HASH_CONCURRENCY).
+4. Inserção em lotes (um commit por lote, em vez de um por utilizador). Um
+   lote que falhe é revertido e gravado linha a linha: a resposta indica
+   sempre exatamente que linhas foram criadas e quais falharam.
+
+Linhas sem password criam a conta sem password (sem custo de hashing): o
+utilizador define-a através de "Esqueci-me da password".
+"""
+
+import csv
+import io
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.schemas.user import UserImportRow
+
+# Nº máximo de linhas por importação
+MAX_IMPORT_ROWS = 5000
+# Utilizadores inseridos por commit
+BATCH_SIZE = 500
+# Abaixo deste nº de passwords não compensa arrancar o pool de processos
+POOL_MIN_PASSWORDS = 8
+
+
+class ImportFormatError(ValueError):
+    """O ficheiro não é um CSV/JSON válido."""
+
+
+def _read_csv(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Linhas de um CSV (separador ',' ou ';', com cabeçalho)."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;")
+    except csv.Error:
+        dialect = csv.excel
+    for row in csv.DictReader(text, dialect=dialect):
+        # Células vazias contam como valor em falta
+        yield {
+            key.strip(): (value.strip() or None) if isinstance(value, str) else value
+            for key, value in row.items()
+            if key
+        }
+
+
+def _read_json(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Linhas de um JSON (lista de objetos)."""
+    try:
+        data = json.load(stream)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ImportFormatError(f"JSON inválido: {e}")
+    if not isinstance(data, list):
+        raise ImportFormatError("O JSON deve ser uma lista de utilizadores")
+    for row in data:
+        yield row if isinstance(row, dict) else {}
+
+
+def read_rows(stream: BinaryIO, filename: str = "", content_type: str = "") -> List:
+    """
+    Lê as linhas do ficheiro (JSON se a extensão/tipo o indicar, CSV caso
+    contrário).
+    """
+    is_json = filename.lower().endswith(".json") or "json" in (content_type or "")
+    reader = _read_json(stream) if is_json else _read_csv(stream)
+    rows = []
+    try:
+        for row in reader:
+            rows.append(row)
+            if len(rows) > MAX_IMPORT_ROWS:
+                raise ImportFormatError(
+                    f"Máximo de {MAX_IMPORT_ROWS} utilizadores por importação"
+                )
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise ImportFormatError(f"CSV inválido: {e}")
+    return rows
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Encripta as passwords em paralelo (pool de processos), pela mesma ordem.
+    """
+    workers = min(settings.PASSWORD_HASH_CONCURRENCY, len(passwords))
+    if len(passwords) < POOL_MIN_PASSWORDS or workers <= 1:
+        return [get_password_hash(password) for password in passwords]
+    # "spawn": o processo da API tem threads (fork não é seguro)
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        return list(executor.map(get_password_hash, passwords, chunksize=chunksize))
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+def _new_user(item: UserImportRow, hashes: Dict[int, str]) -> User:
+    return User(
+        email=item.email,
+        full_name=item.full_name,
+        role=item.role,
+        phone_number=item.phone_number,
+        hashed_password=hashes.get(id(item)),
+        is_active=item.is_active,
+        is_superuser=False,
+    )
+
+
+def _database_message(error: SQLAlchemyError) -> str:
+    if isinstance(error, IntegrityError):
+        return "Email já registado"
+    return "Erro ao gravar na base de dados"
+
+
+def import_users(db: Session, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Valida e cria os utilizadores. Devolve o nº de criados e os erros por
+    linha (numeradas a partir de 1, sem contar o cabeçalho do CSV).
+    """
+    errors: List[Dict[str, Any]] = []
+    valid: List[Tuple[int, UserImportRow]] = []
+    seen = set()
+
+    # 1. Validação + emails repetidos no próprio ficheiro
+    for number, row in enumerate(rows, start=1):
+        try:
+            item = UserImportRow.model_validate(row)
+        except ValidationError as e:
+            errors.append(
+                {
+                    "row": number,
+                    "email": row.get("email"),
+                    "error": _validation_message(e),
+                }
+            )
+            continue
+        key = item.email.lower()
+        if key in seen:
+            errors.append(
+                {
+                    "row": number,
+                    "email": item.email,
+                    "error": "Email repetido no ficheiro",
+                }
+            )
+            continue
+        seen.add(key)
+        valid.append((number, item))
+
+    # 2. Emails já registados (uma única query)
+    if seen:
+        existing = {
+            email
+            for (email,) in db.query(func.lower(User.email)).filter(
+                func.lower(User.email).in_(seen)
+            )
+        }
+        if existing:
+            for number, item in valid:
+                if item.email.lower() in existing:
+                    errors.append(
+                        {
+                            "row": number,
+                            "email": item.email,
+                            "error": "Email já registado",
+                        }
+                    )
+            valid = [
+                (number, item)
+                for number, item in valid
+                if item.email.lower() not in existing
+            ]
+
+    # 3. Passwords (em paralelo)
+    with_password = [item for _, item in valid if item.password]
+    hashes = dict(
+        zip(
+            map(id, with_password),
+            hash_passwords([item.password for item in with_password]),
+        )
+    )
+
+    # 4. Inserção em lotes (um commit por lote). Se um lote falhar (ex: email
+    # registado entretanto por outro pedido), é revertido e as suas linhas são
+    # gravadas uma a uma, para reportar apenas as que falham.
+    created = 0
+    for start in range(0, len(valid), BATCH_SIZE):
+        batch = valid[start : start + BATCH_SIZE]
+        try:
+            db.add_all([_new_user(item, hashes) for _, item in batch])
+            db.commit()
+            created += len(batch)
+            continue
+        except SQLAlchemyError:
+            db.rollback()
+        for number, item in batch:
+            try:
+                db.add(_new_user(item, hashes))
+                db.commit()
+                created += 1
+            except SQLAlchemyError as e:
+                db.rollback()
+                errors.append(
+                    {
+                        "row": number,
+                        "email": item.email,
+                        "error": _database_message(e),
+                    }
+                )
+
+    errors.sort(key=lambda error: error["row"])
+    return {"total": len(rows), "created": created, "errors": errors}
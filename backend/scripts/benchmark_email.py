@@ -0,0 +1,167 @@
+"""
+Benchmark: Envio de Emails (Ligação por Mensagem vs Caixa de Saída)
+-------------------------------------------------------------------
+Compara, contra um servidor SMTP local de teste (arrancado pelo próprio
+script), o débito de:
+
+- "direto": uma ligação SMTP nova por mensagem (comportamento antigo);
+- "outbox": mensagens colocadas na caixa de saída e enviadas pelo worker,
+  em lotes numa única ligação SMTP.
+
+O servidor de teste pode simular o custo de abrir uma ligação (handshake TLS
++ login num servidor real) com --connect-delay.
+
+Uso (a partir da pasta backend/):
+    python -m scripts.benchmark_email
+    python -m scripts.benchmark_email --messages 1000 --connect-delay 50
+
+Usa uma base de dados SQLite temporária (não toca na base de dados real).
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# Configuração mínima para importar a aplicação, antes de qualquer import de app.*
+_tmp_dir = tempfile.mkdtemp(prefix="benchmark_email_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'benchmark.db')}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["MAIL_USERNAME"] = ""
+os.environ["MAIL_PASSWORD"] = ""
+os.environ["MAIL_FROM"] = "benchmark@example.com"
+os.environ["MAIL_SERVER"] = "127.0.0.1"
+os.environ["MAIL_STARTTLS"] = "false"
+os.environ["MAIL_SSL_TLS"] = "false"
+
+from app.core.config import settings  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.email_outbox import EmailOutbox, EmailStatus  # noqa: E402
+from app.services import email_outbox  # noqa: E402
+from app import models  # noqa: E402,F401
+
+
+class SMTPStandIn:
+    """Servidor SMTP mínimo que aceita e descarta as mensagens."""
+
+    def __init__(self, connect_delay: float):
+        self.connect_delay = connect_delay
+        self.connections = 0
+        self.messages = 0
+
+    async def handle(self, reader, writer) -> None:
+        self.connections += 1
+        await asyncio.sleep(self.connect_delay)
+        writer.write(b"220 localhost SMTP stand-in\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                writer.write(b"250-localhost\r\n250 8BITMIME\r\n")
+            elif command == "DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                while (await reader.readline()) not in (b".\r\n", b""):
+                    pass
+                self.messages += 1
+                writer.write(b"250 OK\r\n")
+            elif command == "QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+
+def message(i: int) -> dict:
+    return {
+        "id": i,
+        "recipient": f"aluno{i}@example.com",
+        "subject": "Alteração de horário",
+        "body": f"<p>Olá aluno {i}, a aula foi alterada.</p>",
+        "attempts": 0,
+    }
+
+
+async def run_direct(count: int) -> None:
+    """Uma ligação por mensagem (como o FastMail por email enviado)."""
+    for i in range(count):
+        connection = email_outbox.SMTPConnection()
+        await connection.send(email_outbox.build_message(message(i)))
+        await connection.close()
+
+
+async def run_outbox(count: int) -> None:
+    """Caixa de saída + worker (lotes numa única ligação)."""
+    db = SessionLocal()
+    try:
+        db.add_all(
+            EmailOutbox(recipient=m["recipient"], subject=m["subject"], body=m["body"])
+            for m in map(message, range(count))
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    worker = asyncio.create_task(email_outbox.email_outbox_worker(poll_seconds=0.05))
+    while True:
+        await asyncio.sleep(0.05)
+        db = SessionLocal()
+        try:
+            pending = (
+                db.query(EmailOutbox)
+                .filter(EmailOutbox.status != EmailStatus.sent)
+                .count()
+            )
+        finally:
+            db.close()
+        if not pending:
+            break
+    worker.cancel()
+    try:
+        await worker
+    except asyncio.CancelledError:
+        pass
+
+
+async def main_async(count: int, connect_delay: float) -> None:
+    for mode, runner in (("direto", run_direct), ("outbox", run_outbox)):
+        server_state = SMTPStandIn(connect_delay)
+        server = await asyncio.start_server(server_state.handle, "127.0.0.1", 0)
+        settings.MAIL_PORT = server.sockets[0].getsockname()[1]
+        async with server:
+            start = time.perf_counter()
+            await runner(count)
+            elapsed = time.perf_counter() - start
+        print(
+            f"{mode:<7} {count} emails em {elapsed:6.2f} s "
+            f"({count / elapsed:7.1f} emails/s, "
+            f"{server_state.connections} ligações SMTP, "
+            f"{server_state.messages} recebidos)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--messages", type=int, default=300, help="Nº de emails")
+    parser.add_argument(
+        "--connect-delay",
+        type=float,
+        default=20,
+        help="Custo simulado de abrir uma ligação SMTP (ms)",
+    )
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    print(f"Lote do worker: {settings.EMAIL_OUTBOX_BATCH_SIZE} emails")
+    asyncio.run(main_async(args.messages, args.connect_delay / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark: Login vs Latência de Outros Endpoints
+------------------------------------------------
+Simula uma "tempestade" de logins (verificação Argon2) e mede, em simultâneo,
+a latência de um endpoint leve (GET /) servido pelo mesmo processo.
+
+Com o hashing fora do event loop (modo por omissão), o endpoint leve mantém
+a latência baixa; com --blocking, o hashing corre no event loop (comportamento
+antigo) e cada login bloqueia todos os outros pedidos.
+
+Uso (a partir da pasta backend/):
+    python -m scripts.benchmark_login
+    python -m scripts.benchmark_login --blocking
+    python -m scripts.benchmark_login --logins 400 --concurrency 32
+
+Usa uma base de dados SQLite temporária (não toca na base de dados real).
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+# Configuração mínima para importar a aplicação, antes de qualquer import de app.*
+_tmp_dir = tempfile.mkdtemp(prefix="benchmark_login_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'benchmark.db')}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("MAIL_USERNAME", "benchmark")
+os.environ.setdefault("MAIL_PASSWORD", "benchmark")
+os.environ.setdefault("MAIL_FROM", "benchmark@example.com")
+os.environ.setdefault("MAIL_SERVER", "localhost")
+# Todos os logins usam o mesmo email: desligar a limitação de tentativas
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+
+from app.core import security  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+EMAIL = "benchmark@example.com"
+PASSWORD = "Benchmark123!"
+
+
+def create_user() -> None:
+    db = SessionLocal()
+    try:
+        db.add(
+            User(
+                email=EMAIL,
+                full_name="Benchmark",
+                hashed_password=security.get_password_hash(PASSWORD),
+                is_active=True,
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(logins: int, concurrency: int, probe_interval: float) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login_latencies = []
+        probe_latencies = []
+        statuses = {}
+        semaphore = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+
+        async def login() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/auth/login", data={"username": EMAIL, "password": PASSWORD}
+                )
+                login_latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def probe() -> None:
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/")
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(probe_interval)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    ms = lambda seconds: f"{seconds * 1000:.1f} ms"  # noqa: E731
+    print(f"Logins: {logins} em {elapsed:.2f} s ({logins / elapsed:.1f} logins/s)")
+    print(f"Respostas: {statuses}")
+    print(
+        f"Latência do login: p50={ms(statistics.median(login_latencies))} "
+        f"p99={ms(percentile(login_latencies, 99))}"
+    )
+    print(
+        f"Latência de GET / durante os logins ({len(probe_latencies)} pedidos): "
+        f"p50={ms(statistics.median(probe_latencies))} "
+        f"p99={ms(percentile(probe_latencies, 99))} "
+        f"max={ms(max(probe_latencies))}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--logins", type=int, default=200, help="Nº de logins")
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="Logins em simultâneo"
+    )
+    parser.add_argument(
+        "--probe-interval",
+        type=float,
+        default=0.005,
+        help="Intervalo entre pedidos a GET / (segundos)",
+    )
+    parser.add_argument(
+        "--blocking",
+        action="store_true",
+        help="Verificar a password no event loop (comportamento antigo)",
+    )
+    args = parser.parse_args()
+
+    if args.blocking:
+
+        async def verify_blocking(plain_password, hashed_password):
+            return security.verify_and_update_password(plain_password, hashed_password)
+
+        security.verify_and_update_password_async = verify_blocking
+
+    create_user()
+    mode = "bloqueante (event loop)" if args.blocking else "threads (não bloqueante)"
+    print(f"Modo: {mode}")
+    asyncio.run(run(args.logins, args.concurrency, args.probe_interval))
+
+
+if __name__ == "__main__":
+    main()
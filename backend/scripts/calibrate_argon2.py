@@ -0,0 +1,125 @@
+"""
+Calibração do Custo do Argon2
+-----------------------------
+Mede, nesta máquina, o tempo de cálculo de uma hash Argon2 para cada perfil
+de custo (ARGON2_PROFILES em app/core/security.py) e, opcionalmente, procura
+o nº de iterações (time_cost) que mais se aproxima de um tempo alvo.
+
+O tempo de uma hash é o tempo mínimo de um login; com PASSWORD_HASH_CONCURRENCY
+hashes em simultâneo, o débito máximo é aprox. concorrência / tempo da hash.
+Cada hash em curso ocupa memory_cost KiB de memória.
+
+Uso (a partir da pasta backend/):
+    python -m scripts.calibrate_argon2
+    python -m scripts.calibrate_argon2 --target-ms 250
+    python -m scripts.calibrate_argon2 --target-ms 250 --memory-cost 65536
+
+O resultado sugere os valores a colocar no .env (ARGON2_*).
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+# Configuração mínima para importar app.core (não usa a base de dados)
+os.environ.setdefault("SECRET_KEY", "calibrate")
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import (  # noqa: E402
+    ARGON2_PROFILES,
+    argon2_params,
+    build_pwd_context,
+)
+
+PASSWORD = "Calibrate123!"
+
+
+def measure(params: dict, samples: int) -> float:
+    """Tempo mediano (segundos) de uma hash com os parâmetros indicados."""
+    context = build_pwd_context(params)
+    context.hash(PASSWORD)  # aquecimento
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash(PASSWORD)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def describe(name: str, params: dict, seconds: float) -> str:
+    concurrency = settings.PASSWORD_HASH_CONCURRENCY
+    return (
+        f"{name:<10} t={params['time_cost']:<3} m={params['memory_cost']:>7} KiB "
+        f"p={params['parallelism']:<2} -> {seconds * 1000:7.1f} ms/hash, "
+        f"~{concurrency / seconds:6.1f} logins/s "
+        f"({concurrency} em simultâneo, {concurrency * params['memory_cost'] // 1024} MiB)"
+    )
+
+
+def calibrate(target_ms: float, memory_cost: int, parallelism: int, samples: int):
+    """
+    Aumenta o time_cost até o tempo da hash ultrapassar o alvo e devolve o
+    valor mais próximo do alvo (com o tempo medido).
+    """
+    best = None
+    time_cost = 1
+    while True:
+        params = {
+            "time_cost": time_cost,
+            "memory_cost": memory_cost,
+            "parallelism": parallelism,
+        }
+        seconds = measure(params, samples)
+        print(describe(f"t={time_cost}", params, seconds))
+        if best is None or abs(seconds * 1000 - target_ms) < abs(
+            best[1] * 1000 - target_ms
+        ):
+            best = (params, seconds)
+        if seconds * 1000 >= target_ms or time_cost >= 50:
+            return best
+        time_cost += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--samples", type=int, default=5, help="Nº de hashes medidas por configuração"
+    )
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        help="Tempo alvo por hash (ms): procura o time_cost mais próximo",
+    )
+    parser.add_argument(
+        "--memory-cost", type=int, help="Memória (KiB) a usar na procura do time_cost"
+    )
+    parser.add_argument(
+        "--parallelism", type=int, help="Paralelismo a usar na procura do time_cost"
+    )
+    args = parser.parse_args()
+
+    current = argon2_params()
+    print(f"CPUs: {os.cpu_count()}  |  perfil atual: {settings.ARGON2_PROFILE} {current}")
+    print()
+    print("Perfis:")
+    for name, params in ARGON2_PROFILES.items():
+        print(describe(name, params, measure(params, args.samples)))
+
+    if args.target_ms:
+        memory_cost = args.memory_cost or current["memory_cost"]
+        parallelism = args.parallelism or current["parallelism"]
+        print()
+        print(f"Procura do time_cost para ~{args.target_ms:.0f} ms:")
+        params, seconds = calibrate(
+            args.target_ms, memory_cost, parallelism, args.samples
+        )
+        print()
+        print(f"Sugestão ({seconds * 1000:.1f} ms/hash) para o .env:")
+        print(f"ARGON2_TIME_COST={params['time_cost']}")
+        print(f"ARGON2_MEMORY_COST={params['memory_cost']}")
+        print(f"ARGON2_PARALLELISM={params['parallelism']}")
+
+
+if __name__ == "__main__":
+    main()
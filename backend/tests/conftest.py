@@ -0,0 +1,35 @@
+"""
+Configuração dos Testes
+-----------------------
+Os testes usam uma base de dados SQLite temporária: as variáveis de ambiente
+são definidas antes de importar a app.
+
+Executar a partir da pasta backend: python -m pytest
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_TEST_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_DIR, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "memory")
+
+
+@pytest.fixture
+def db():
+    """Sessão numa base de dados vazia (tabelas recriadas em cada teste)."""
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    import app.models  # noqa: F401 (regista os modelos no Base.metadata)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
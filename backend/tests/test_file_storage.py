@@ -0,0 +1,56 @@
+"""Testes do armazenamento de ficheiros por conteúdo (app.services.file_storage)."""
+
+import hashlib
+import os
+
+import pytest
+
+from app.models.file_blob import FileBlob
+from app.models.user import User
+from app.routers import users as users_router
+from app.services import file_storage
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_storage, "UPLOADS_ROOT", str(tmp_path / "uploads"))
+    return tmp_path
+
+
+def _store(db, uploads, user, content: bytes):
+    temp_path = uploads / f"upload-{user.id}.part"
+    temp_path.write_bytes(content)
+    return file_storage.store_user_file(
+        db,
+        temp_path=str(temp_path),
+        size=len(content),
+        checksum=hashlib.sha256(content).hexdigest(),
+        user_id=user.id,
+        filename="cv.pdf",
+    )
+
+
+def test_deleting_a_user_releases_shared_blobs(db, uploads):
+    ana = User(email="ana@x.pt", full_name="Ana", is_active=True)
+    rui = User(email="rui@x.pt", full_name="Rui", is_active=True)
+    admin = User(email="admin@x.pt", is_active=True, is_superuser=True)
+    db.add_all([ana, rui, admin])
+    db.commit()
+
+    shared = _store(db, uploads, ana, b"mesmo conteudo")
+    _store(db, uploads, rui, b"mesmo conteudo")
+    own = _store(db, uploads, ana, b"so da ana")
+    shared_path = uploads / shared.file_path
+    own_path = uploads / own.file_path
+
+    users_router.delete_user(ana.id, db=db, current_user=admin)
+
+    # O conteúdo partilhado fica (ainda é usado pelo Rui); o outro é apagado
+    assert db.get(FileBlob, shared.checksum).ref_count == 1
+    assert shared_path.exists()
+    assert db.get(FileBlob, own.checksum) is None
+    assert not own_path.exists()
+
+    users_router.delete_user(rui.id, db=db, current_user=admin)
+    assert db.query(FileBlob).count() == 0
+    assert not os.path.exists(shared_path)
@@ -0,0 +1,60 @@
+"""Testes do limitador de pedidos (app.core.rate_limit)."""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import rate_limit
+from app.core.rate_limit import MemoryBackend, check_rate_limit, record_attempt
+
+
+def test_memory_backend_prunes_keys_emptied_by_retry_after(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+    backend = MemoryBackend()
+    backend.MAX_KEYS = 3
+
+    backend.add("login:ip:1", window=60)
+    now[0] += 120
+    # A tentativa saiu da janela: a chave é removida em vez de ficar vazia
+    assert backend.retry_after("login:ip:1", limit=5, window=60) == 0.0
+
+    for ip in range(2, 6):
+        backend.add(f"login:ip:{ip}", window=60)
+
+    assert backend.retry_after("login:ip:5", limit=1, window=60) > 0
+    assert "login:ip:1" not in backend._hits
+
+
+def test_memory_backend_limits_within_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+    backend = MemoryBackend()
+
+    for _ in range(3):
+        backend.add("login:ip:1", window=60)
+    assert backend.retry_after("login:ip:1", limit=3, window=60) == 60
+    now[0] += 61
+    assert backend.retry_after("login:ip:1", limit=3, window=60) == 0.0
+
+
+def _request(ip):
+    return SimpleNamespace(client=SimpleNamespace(host=ip))
+
+
+def test_failed_attempts_from_many_ips_lock_the_account(monkeypatch):
+    monkeypatch.setattr(rate_limit, "backend", MemoryBackend())
+    monkeypatch.setattr(rate_limit.settings, "RATE_LIMIT_PER_EMAIL", 5)
+    monkeypatch.setattr(rate_limit.settings, "RATE_LIMIT_PER_ACCOUNT", 10)
+
+    # Uma tentativa falhada por IP: nenhum par (IP, email) chega ao limite
+    for ip in range(10):
+        check_rate_limit("login", _request(f"10.0.0.{ip}"), "Ana@x.pt")
+        record_attempt("login", _request(f"10.0.0.{ip}"), "Ana@x.pt")
+
+    with pytest.raises(HTTPException) as error:
+        check_rate_limit("login", _request("10.0.1.1"), "ana@x.pt")
+    assert error.value.status_code == 429
+    # Outras contas não são afetadas
+    check_rate_limit("login", _request("10.0.1.1"), "rui@x.pt")
@@ -0,0 +1,47 @@
+"""Testes da rotação de refresh tokens (app.crud.refresh_token)."""
+
+from app.crud import refresh_token as refresh_token_crud
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+def _user(db):
+    user = User(email="ana@x.pt", full_name="Ana", is_active=True)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_reusing_a_rotated_token_revokes_the_family(db):
+    user = _user(db)
+    token = refresh_token_crud.create_refresh_token(db, user)
+
+    _, new_token = refresh_token_crud.rotate_refresh_token(db, token)
+    assert refresh_token_crud.rotate_refresh_token(db, token) is None
+
+    # A família foi revogada: o token novo também deixa de servir
+    assert refresh_token_crud.rotate_refresh_token(db, new_token) is None
+    assert db.query(RefreshToken).filter(RefreshToken.revoked.is_(False)).count() == 0
+
+
+def test_revoked_family_is_refused_without_a_query(db, monkeypatch):
+    user = _user(db)
+    token = refresh_token_crud.create_refresh_token(db, user)
+    family_id = refresh_token_crud.get_family(db, token)
+    refresh_token_crud.revoke_family(db, family_id)
+
+    def no_query(*args, **kwargs):
+        raise AssertionError("consulta à BD inesperada")
+
+    monkeypatch.setattr(db, "query", no_query)
+    assert refresh_token_crud.rotate_refresh_token(db, token) is None
+
+
+def test_load_revoked_tokens_skips_rotated_tokens_of_active_families(db):
+    user = _user(db)
+    token = refresh_token_crud.create_refresh_token(db, user)
+    refresh_token_crud.rotate_refresh_token(db, token)
+
+    assert refresh_token_crud.load_revoked_tokens(db) == 0
+    assert refresh_token_crud.rotate_refresh_token(db, token) is None
+    assert db.query(RefreshToken).filter(RefreshToken.revoked.is_(False)).count() == 0
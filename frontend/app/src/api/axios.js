@@ -19,4 +19,46 @@ api.interceptors.request.use(
     (error) => Promise.reject(error)
 );
 
+// Interceptor para renovar o token de acesso expirado com o refresh token
+// (uma única renovação em curso, partilhada pelos pedidos que falharam)
+let refreshPromise = null;
+const NO_REFRESH_URLS = ['/auth/login', '/auth/refresh', '/auth/logout'];
+
+api.interceptors.response.use(
+    (response) => response,
+    async (error) => {
+        const original = error.config;
+        const refreshToken = localStorage.getItem('refresh_token');
+        if (
+            error.response?.status !== 401 ||
+            !refreshToken ||
+            original._retry ||
+            NO_REFRESH_URLS.some((url) => original.url?.startsWith(url))
+        ) {
+            return Promise.reject(error);
+        }
+        original._retry = true;
+
+        try {
+            if (!refreshPromise) {
+                refreshPromise = axios
+                    .post(`${api.defaults.baseURL}/auth/refresh`, {
+                        refresh_token: refreshToken,
+                    })
+                    .finally(() => {
+                        refreshPromise = null;
+                    });
+            }
+            const { data } = await refreshPromise;
+            localStorage.setItem('token', data.access_token);
+            localStorage.setItem('refresh_token', data.refresh_token);
+            return api(original);
+        } catch {
+            localStorage.removeItem('token');
+            localStorage.removeItem('refresh_token');
+            return Promise.reject(error);
+        }
+    }
+);
+
 export default api;
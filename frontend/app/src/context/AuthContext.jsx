@@ -20,6 +20,7 @@ export const AuthProvider = ({ children }) => {
         } catch (error) {
           console.error("Sessão inválida", error);
           localStorage.removeItem("token");
+          localStorage.removeItem("refresh_token");
           setUser(null);
           setIsAuthenticated(false);
         }
@@ -49,8 +50,9 @@ export const AuthProvider = ({ children }) => {
       throw new Error("Login failed");
     }
 
-    const { access_token } = response.data;
+    const { access_token, refresh_token } = response.data;
     localStorage.setItem("token", access_token);
+    localStorage.setItem("refresh_token", refresh_token);
 
     const userKwargs = await api.get("/auth/me");
     setUser(userKwargs.data);
@@ -60,8 +62,9 @@ export const AuthProvider = ({ children }) => {
 
   const verify2FA = async (email, code) => {
     const response = await api.post("/auth/login/2fa", { email, code });
-    const { access_token } = response.data;
+    const { access_token, refresh_token } = response.data;
     localStorage.setItem("token", access_token);
+    localStorage.setItem("refresh_token", refresh_token);
 
     const userKwargs = await api.get("/auth/me");
     setUser(userKwargs.data);
@@ -75,7 +78,15 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    // Revogar o refresh token no servidor (sem bloquear o logout local)
+    const refreshToken = localStorage.getItem("refresh_token");
+    if (refreshToken) {
+      api
+        .post("/auth/logout", { refresh_token: refreshToken })
+        .catch(() => {});
+    }
     localStorage.removeItem("token");
+    localStorage.removeItem("refresh_token");
     setUser(null);
     setIsAuthenticated(false);
   };
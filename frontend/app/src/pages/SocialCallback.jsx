@@ -1,16 +1,26 @@
-import { useEffect } from "react";
-import { useSearchParams, useNavigate } from "react-router-dom";
+import { useEffect, useState } from "react";
+import { useNavigate } from "react-router-dom";
 import api from "../api/axios";
 
 const SocialCallback = () => {
-  const [searchParams] = useSearchParams();
-  const token = searchParams.get("token");
+  // Os tokens chegam no fragmento da URL (#token=...&refresh_token=...), que
+  // não é enviado ao servidor nem no Referer. Lidos uma vez, ao montar.
+  const [hashParams] = useState(
+    () => new URLSearchParams(window.location.hash.slice(1))
+  );
+  const token = hashParams.get("token");
+  const refreshToken = hashParams.get("refresh_token");
   const navigate = useNavigate();
 
   useEffect(() => {
     const processLogin = async () => {
+      // Remover os tokens da URL (e do histórico do browser)
+      window.history.replaceState(null, "", window.location.pathname);
       if (token) {
         localStorage.setItem("token", token);
+        if (refreshToken) {
+          localStorage.setItem("refresh_token", refreshToken);
+        }
         try {
           // Validar token - se falhar vai para o catch
           await api.get("/auth/me");
@@ -25,7 +35,7 @@ const SocialCallback = () => {
       }
     };
     processLogin();
-  }, [token, navigate]);
+  }, [token, refreshToken, navigate]);
 
   return (
     <div className="flex items-center justify-center min-h-screen">
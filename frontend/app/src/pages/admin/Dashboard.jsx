@@ -30,6 +30,15 @@ ChartJS.register(
   BarElement,
 );
 
+// Painéis pedidos ao endpoint /statistics/dashboard
+const DASHBOARD_PANELS = [
+  "summary",
+  "courses_running",
+  "courses_starting_soon",
+  "courses_by_area",
+  "top_trainers",
+];
+
 const Dashboard = () => {
   const { user } = useAuth();
   const location = useLocation();
@@ -41,11 +50,23 @@ const Dashboard = () => {
   const canViewFullDashboard =
     user?.is_superuser || user?.role === "admin" || user?.role === "secretaria";
 
-  const fetchStats = useCallback(async () => {
+  const fetchStats = useCallback(async (refresh = false) => {
     setLoading(true);
     try {
-      const response = await api.get("/statistics/");
-      setStats(response.data);
+      // Forçar recálculo dos snapshots antes de pedir os painéis (só Admin)
+      if (refresh) {
+        await api.post("/statistics/dashboard/refresh");
+      }
+      // Todos os painéis num único pedido
+      const response = await api.get("/statistics/dashboard", {
+        params: { panels: DASHBOARD_PANELS.join(",") },
+      });
+      const { summary, ...panels } = response.data.panels;
+      setStats({
+        ...summary,
+        ...panels,
+        snapshot_at: response.data.snapshot_at,
+      });
       setError(null);
     } catch (err) {
       console.error("Erro ao carregar estatísticas:", err);
@@ -101,6 +122,18 @@ const Dashboard = () => {
     );
   }
 
+  // Idade dos agregados pré-calculados (snapshot noturno)
+  const formatSnapshotAge = (snapshotAt) => {
+    if (!snapshotAt) return null;
+    const minutes = Math.floor((Date.now() - new Date(snapshotAt)) / 60000);
+    if (minutes < 1) return "agora mesmo";
+    if (minutes < 60) return `há ${minutes} min`;
+    const hours = Math.floor(minutes / 60);
+    if (hours < 24) return `há ${hours} h`;
+    return `há ${Math.floor(hours / 24)} dias`;
+  };
+  const snapshotAge = formatSnapshotAge(stats?.snapshot_at);
+
   // Dados para gráfico de Cursos por Área
   const areaLabels = Object.keys(stats?.courses_by_area || {});
   const areaData = Object.values(stats?.courses_by_area || {});
@@ -151,6 +184,20 @@ const Dashboard = () => {
         <p className="text-gray-500 mt-1">
           Visão geral do sistema de gestão escolar
         </p>
+        {snapshotAge && (
+          <p className="text-xs text-gray-400 mt-2 flex items-center">
+            <Clock className="w-3 h-3 mr-1" />
+            Horas, áreas e cursos a iniciar calculados {snapshotAge}
+            {user?.is_superuser && (
+              <button
+                onClick={() => fetchStats(true)}
+                className="ml-2 text-blue-600 hover:underline"
+              >
+                Recalcular
+              </button>
+            )}
+          </p>
+        )}
       </div>
 
       {/* KPI Cards */}
@@ -12,7 +12,18 @@ const AdminSearch = () => {
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
   const [totalItems, setTotalItems] = useState(0);
+  const [groups, setGroups] = useState(null);
   const ITEMS_PER_PAGE = 20;
+  const ALL_GROUP_LIMIT = 5;
+
+  // Grupos devolvidos por /search/all (ordem de apresentação)
+  const SEARCH_GROUPS = [
+    { key: "courses", label: "Cursos" },
+    { key: "students", label: "Estudantes" },
+    { key: "trainers", label: "Professores" },
+    { key: "modules", label: "Módulos" },
+    { key: "classrooms", label: "Salas" },
+  ];
 
   // Fetch data
   const fetchData = useCallback(async (type, page, query = "") => {
@@ -20,6 +31,24 @@ const AdminSearch = () => {
     setError("");
 
     try {
+      // Pesquisa global: todos os grupos num só pedido
+      if (type === "all") {
+        if (!query || query.length < 2) {
+          setGroups(null);
+          setResults([]);
+          setTotalPages(1);
+          setTotalItems(0);
+          return;
+        }
+        const response = await api.get("/search/all", {
+          params: { q: query, limit: ALL_GROUP_LIMIT },
+        });
+        setGroups(response.data.groups);
+        setTotalItems(response.data.total || 0);
+        setTotalPages(1);
+        return;
+      }
+
       const params = { page, limit: ITEMS_PER_PAGE };
       if (query && query.length >= 2) {
         params.q = query;
@@ -37,6 +66,7 @@ const AdminSearch = () => {
         setError("Erro ao carregar dados. Tenta novamente.");
       }
       setResults([]);
+      setGroups(null);
       setTotalPages(1);
       setTotalItems(0);
     } finally {
@@ -82,6 +112,8 @@ const AdminSearch = () => {
   };
 
   const handleTypeChange = (type) => {
+    setResults([]);
+    setGroups(null);
     setSearchType(type);
     setSearchQuery("");
     setCurrentPage(1);
@@ -127,6 +159,57 @@ const AdminSearch = () => {
       );
     }
 
+    if (searchType === "all") {
+      if (!groups) {
+        return (
+          <div className="text-center py-8 text-gray-500">
+            Escreve pelo menos 2 caracteres para pesquisar em tudo
+          </div>
+        );
+      }
+      if (totalItems === 0) {
+        return (
+          <div className="text-center py-8 text-gray-500">
+            {`Nenhum resultado encontrado para "${searchQuery}"`}
+          </div>
+        );
+      }
+      return (
+        <div className="divide-y divide-gray-200">
+          {SEARCH_GROUPS.filter(({ key }) => groups[key]?.total > 0).map(
+            ({ key, label }) => (
+              <div key={key} className="p-6">
+                <div className="flex justify-between items-center mb-3">
+                  <h2 className="text-lg font-semibold text-gray-800">
+                    {label}
+                  </h2>
+                  <span className="text-sm text-gray-500">
+                    {groups[key].total} resultado
+                    {groups[key].total !== 1 ? "s" : ""}
+                  </span>
+                </div>
+                <ul className="space-y-2">
+                  {groups[key].items.map((item) => (
+                    <li key={item.id} className="text-sm">
+                      <span className="text-gray-500 mr-2">#{item.id}</span>
+                      <span className="font-medium text-gray-900">
+                        {item.title || "Sem nome"}
+                      </span>
+                      {item.subtitle && (
+                        <span className="text-gray-500 ml-2 truncate">
+                          {item.subtitle}
+                        </span>
+                      )}
+                    </li>
+                  ))}
+                </ul>
+              </div>
+            ),
+          )}
+        </div>
+      );
+    }
+
     if (results.length === 0) {
       return (
         <div className="text-center py-8 text-gray-500">
@@ -281,8 +364,18 @@ const AdminSearch = () => {
             </label>
             <div className="flex rounded-lg overflow-hidden border shadow">
               <button
-                onClick={() => handleTypeChange("courses")}
+                onClick={() => handleTypeChange("all")}
                 className={`px-4 py-3 transition-colors ${
+                  searchType === "all"
+                    ? "bg-blue-600 text-white"
+                    : "bg-white text-gray-700 hover:bg-gray-100"
+                }`}
+              >
+                Tudo
+              </button>
+              <button
+                onClick={() => handleTypeChange("courses")}
+                className={`px-4 py-3 transition-colors border-l ${
                   searchType === "courses"
                     ? "bg-blue-600 text-white"
                     : "bg-white text-gray-700 hover:bg-gray-100"
@@ -377,7 +470,7 @@ const AdminSearch = () => {
       )}
 
       {/* Total count */}
-      {!loading && results.length > 0 && totalPages === 1 && (
+      {!loading && searchType !== "all" && results.length > 0 && totalPages === 1 && (
         <div className="mt-4 text-sm text-gray-500 text-right">
           {totalItems} resultado{totalItems !== 1 ? "s" : ""}
         </div>